@@ -1,4 +1,4 @@
-#! /usr/bin/env python
+#! /usr/bin/env python3
 
 import sys
 import numpy as np
@@ -69,8 +69,8 @@ cosr  = np.cos(2 * np.pi * u * l)          # Interferometer cosine response, R_c
 #     Look at the bottom of page 4 of my personal notes for details.
 #
 if 'print' in usrInp:
-    print "%5s  %6s  %6s"%('n', 'rad', 'deg')
-    print ""
+    print("%5s  %6s  %6s"%('n', 'rad', 'deg'))
+    print("")
     firstPass = True
     for i in range(-u, u+1):
 
@@ -79,17 +79,17 @@ if 'print' in usrInp:
 
         if firstPass:                  # Print "max" , "min" fin the first instance
             maxima = np.arcsin(i/u)    # Values of Theta where R_c is max
-            print "%5d  %6.2f  %6.2f         max"%(i, maxima, np.degrees(maxima))
+            print("%5d  %6.2f  %6.2f         max"%(i, maxima, np.degrees(maxima)))
             if i < u:
                 minima = np.arcsin((2*i+1)/(2*u))    # Values of Theta where R_c is min
-                print "%10s  %6.2f  %6.2f    min"%(" ", minima, np.degrees(minima))
+                print("%10s  %6.2f  %6.2f    min"%(" ", minima, np.degrees(minima)))
             firstPass = False
         else:
             maxima = np.arcsin(i/u)
-            print "%5d  %6.2f  %6.2f           "%(i, maxima, np.degrees(maxima))
+            print("%5d  %6.2f  %6.2f           "%(i, maxima, np.degrees(maxima)))
             if i < u:
                 minima = np.arcsin((2*i+1)/(2*u))    # Values of Theta where R_c is min
-                print "%10s  %6.2f  %6.2f      "%(" ", minima, np.degrees(minima))
+                print("%10s  %6.2f  %6.2f      "%(" ", minima, np.degrees(minima)))
 #=====================================================================
 
 
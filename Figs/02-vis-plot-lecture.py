@@ -1,9 +1,14 @@
-#! /usr/bin/env python
+#! /usr/bin/env python3
 
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.patches import Polygon
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+import decimate
+
 # Written by Vasaant S/O Krishnan on Saturday, 03 February 2018
 
 # 02-vis-plot.py "visibility plot" replicates figures from page 31 of
@@ -23,6 +28,7 @@ u             = 3           # Baseline length                             (wavel
 field_of_view = 180         # Total range of field of view centred on zero    (degrees)
 steps         = 10000
 textsize      = 14
+outputDpi     = 300         # Resolution the .eps lines are decimated to (None = all points)
 #=====================================================================
 
 
@@ -66,7 +72,7 @@ ax2 = ax1.twiny()                # Create twin 'x' axis to show radians and degr
 ax1.plot(theta, cosEnv)          # Plot [I_v(s) * cos] and give x-axis radians
 ax2.plot(xaxis, source)          # Plot [I_v(s)]       and give x-axis degrees
 
-cosInt = Polygon(zip(theta, cosEnv), facecolor='g', edgecolor='g')    # Integrated region of I_v(s) * cos
+cosInt = Polygon(np.column_stack((theta, cosEnv)), facecolor='g', edgecolor='g')    # Integrated region of I_v(s) * cos
 ax1.add_patch(cosInt)
 
 ax1.set_title( 'I$_v$($\\ell $) * cos(2$\pi $ * ' + str(int(u)) + ' * $\\ell $)', y = 1.09, fontsize= textsize)
@@ -84,7 +90,7 @@ ax4 = ax3.twiny()                # Create twin 'x' axis to show radians and degr
 ax3.plot(theta, sinEnv)          # Plot   I_v(s) * sin   with x-axis in radians
 ax4.plot(xaxis, source)          # Plot   I_v(s)]        with x-axis in degrees
 
-sinInt = Polygon(zip(theta,sinEnv), facecolor='g', edgecolor='g')    # Integrated region of I_v(s) * sin
+sinInt = Polygon(np.column_stack((theta, sinEnv)), facecolor='g', edgecolor='g')    # Integrated region of I_v(s) * sin
 ax3.add_patch(sinInt)
 
 ax4.set_title('I$_v$($\\ell $) * sin(2$\pi $ * ' + str(int(u)) + ' * $\\ell $)', y = 1.09, fontsize= textsize)
@@ -92,5 +98,7 @@ ax3.tick_params(axis='both', which='both', labelsize= textsize)
 ax4.tick_params(axis='both', which='both', labelsize= textsize)
 ax3.get_yaxis().set_ticklabels([])
 
+if outputDpi:
+    decimate.decimateFigure(fig, dpi= outputDpi)
 plt.savefig('02-vis-plot.eps', transparent=True, format='eps')
 # plt.show()
@@ -1,8 +1,13 @@
-#! /usr/bin/env python
+#! /usr/bin/env python3
 
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+import visibility
+
 # Written by Vasaant S/O Krishnan on Tuesday, 06 March 2018
 
 # 03-dirac-vis.py "dirac visibility" plots aim to replicates figures from
@@ -73,6 +78,22 @@ textsize = 13
 
 
 
+#=====================================================================
+#     Code begins here
+#
+# Every row has the same u grid, so V(u) of all rows is computed at
+# once (and memoised) by visibility.py.
+rows = [(l,   0),                                      # (position, width) of each row's delta function
+        (l+2, 0),
+        (l+7, 0)]
+u, rowVis = visibility.visibilities('dirac', rows, ulim, steps)
+uDeg = np.degrees(u)
+#=====================================================================
+
+
+
+
+
 #=====================================================================
 #     Plot
 #
@@ -86,16 +107,12 @@ plt.subplots_adjust(hspace= 0.5, wspace= 0.3)
 #=====================================================================
 #     Code begins here
 #
-u    = np.linspace(ulim, -ulim, steps)                 # Baseline span
-uDeg = np.degrees(u)
-l    = l
+l    = rows[0][0]
 
-cosr = [np.cos(2 * np.pi * k/np.pi * l) for k in u]    # Real component
-sinr = [np.sin(2 * np.pi * k/np.pi * l) for k in u]    # Imag component
+cosr, sinr = rowVis[0].real, rowVis[0].imag             # Real and Imag components
 
 # These compute the amp and phase manually:
-amp = [np.sqrt(i**2 + j**2) for i, j in zip(cosr, sinr)]
-pha = [      np.arctan(j/i) for i, j in zip(cosr, sinr)]
+amp, pha = visibility.ampPhase(rowVis[0])
 # pha = [     np.arctan2(j,i) for i, j in zip(cosr, sinr)]    # This is akin to using np.angle as below
 
 # These use the numpy's built in functions instead:
@@ -156,16 +173,12 @@ ax5.tick_params(axis='both', which='both', labelsize= textsize)
 #=====================================================================
 #     Code begins here
 #
-u    = np.linspace(ulim, -ulim, steps)                 # Baseline span
-uDeg = np.degrees(u)
-l    = l+2
+l    = rows[1][0]
 
-cosr = [np.cos(2 * np.pi * k/np.pi * l) for k in u]    # Real component
-sinr = [np.sin(2 * np.pi * k/np.pi * l) for k in u]    # Imag component
+cosr, sinr = rowVis[1].real, rowVis[1].imag             # Real and Imag components
 
 # These compute the amp and phase manually:
-amp = [np.sqrt(i**2 + j**2) for i, j in zip(cosr, sinr)]
-pha = [      np.arctan(j/i) for i, j in zip(cosr, sinr)]
+amp, pha = visibility.ampPhase(rowVis[1])
 # pha = [     np.arctan2(j,i) for i, j in zip(cosr, sinr)]    # This is akin to using np.angle as below
 
 # These use the numpy's built in functions instead:
@@ -221,16 +234,12 @@ ax10.tick_params(axis='both', which='both', labelsize= textsize)
 #=====================================================================
 #     Code begins here
 #
-u    = np.linspace(ulim, -ulim, steps)                 # Baseline span
-uDeg = np.degrees(u)
-l    = l+5
+l    = rows[2][0]
 
-cosr = [np.cos(2 * np.pi * k/np.pi * l) for k in u]    # Real component
-sinr = [np.sin(2 * np.pi * k/np.pi * l) for k in u]    # Imag component
+cosr, sinr = rowVis[2].real, rowVis[2].imag             # Real and Imag components
 
 # These compute the amp and phase manually:
-amp = [np.sqrt(i**2 + j**2) for i, j in zip(cosr, sinr)]
-pha = [      np.arctan(j/i) for i, j in zip(cosr, sinr)]
+amp, pha = visibility.ampPhase(rowVis[2])
 # pha = [     np.arctan2(j,i) for i, j in zip(cosr, sinr)]    # This is akin to using np.angle as below
 
 # These use the numpy's built in functions instead:
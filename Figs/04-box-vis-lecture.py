@@ -1,8 +1,12 @@
-#! /usr/bin/env python2.7
+#! /usr/bin/env python3
 
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
-import scipy.integrate as integrate
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+import visibility
 
 # Written by Vasaant S/O Krishnan on Tuesday, 06 March 2018
 
@@ -54,6 +58,24 @@ textsize = 13
 
 
 
+#=====================================================================
+#     Code begins here
+#
+# Every row has the same u grid, so V(u) of all rows is computed at
+# once (and memoised) by visibility.py, rather than with integrate.quad
+# per baseline in each row.
+rows = [( 0, 2),                                      # (offset, width) of each row
+        ( 0, 6),
+        ( 3, 2),
+        (-4, 6)]
+u, rowVis = visibility.visibilities('box', rows, ulim, steps)
+uDeg = np.degrees(u)
+#=====================================================================
+
+
+
+
+
 #=====================================================================
 #     Plot
 #
@@ -67,24 +89,17 @@ plt.subplots_adjust(hspace= 0.6, wspace= 0.5)
 #=====================================================================
 #     Code begins here
 #
-offset = 0           # Distance of source from origin
-width  = 2           # Source width                (dimensionless)
-
-u    = np.linspace(ulim, -ulim, steps)                 # Baseline span
-uDeg = np.degrees(u)
+offset, width = rows[0]
 
 lUpp =  width/2. + offset
 lLow = -width/2. + offset
 l    = np.linspace(lUpp,  lLow, steps)
 
-# For each baseline, u, integrate "Re[V(u)] = I(l)*cos(2pi u  l)"  for all, l.
-# Here I(l) is the box function for the range [lUpp, lLow]:
-cosr = [(1./(np.abs(lLow-lUpp))) * integrate.quad(lambda l: np.cos(2 * np.pi * k/np.pi * l), lLow, lUpp)[0] for k in u]    # Real component
-sinr = [(1./(np.abs(lLow-lUpp))) * integrate.quad(lambda l: np.sin(2 * np.pi * k/np.pi * l), lLow, lUpp)[0] for k in u]    # Imag component
+# V(u) of this row, from the single evaluation of all rows above:
+cosr, sinr = rowVis[0].real, rowVis[0].imag
 
 # These compute the amp and phase manually:
-amp = [np.sqrt(i**2 + j**2) for i, j in zip(cosr, sinr)]
-pha = [      np.arctan(j/i) for i, j in zip(cosr, sinr)]
+amp, pha = visibility.ampPhase(rowVis[0])
 # pha = [     np.arctan2(j,i) for i, j in zip(cosr, sinr)]    # This is akin to using np.angle as below
 
 # These use the numpy's built in functions instead:
@@ -110,7 +125,7 @@ ax3.plot(uDeg, sinr, color = 'b')
 ax2.set_xlabel('Baseline (Spatial frequency)', fontsize= 11)
 ax3.set_xlabel('(degrees)', fontsize= 11)
 # ax2.set_title( '$\\mathcal{V}$(u): Real (red) and Imag (blue)\n', y=1.11, fontsize= textsize)
-ax2.set_title( '$\mathcal{V}(u) = \int I_\\nu (\\ell )\, e^{-i \, 2\\pi \, u \, \\ell } \, d\,\\ell}$\n Real (red) and Imag (blue)\n', y=1.11, fontsize= textsize)
+ax2.set_title( '$\mathcal{V}(u) = \int I_\\nu (\\ell )\, e^{-i \, 2\\pi \, u \, \\ell } \, d\,\\ell$\n Real (red) and Imag (blue)\n', y=1.11, fontsize= textsize)
 ax2.set_xlim([-ulim, ulim])
 ax2.set_ylim(-1.1, 1.1)
 ax1.tick_params(axis='both', which='both', labelsize= textsize)
@@ -139,24 +154,17 @@ ax5.tick_params(axis='both', which='both', labelsize= textsize)
 #=====================================================================
 #     Code begins here
 #
-offset = 0           # Distance of source from origin
-width  = 6           # Source width                (dimensionless)
-
-u    = np.linspace(ulim, -ulim, steps)                 # Baseline span
-uDeg = np.degrees(u)
+offset, width = rows[1]
 
 lUpp =  width/2. + offset
 lLow = -width/2. + offset
 l    = np.linspace(lUpp,  lLow, steps)
 
-# For each baseline, u, integrate "Re[V(u)] = I(l)*cos(2pi u  l)"  for all, l.
-# Here I(l) is the box function for the range [lUpp, lLow]:
-cosr = [(1./(np.abs(lLow-lUpp))) * integrate.quad(lambda l: np.cos(2 * np.pi * k/np.pi * l), lLow, lUpp)[0] for k in u]    # Real component
-sinr = [(1./(np.abs(lLow-lUpp))) * integrate.quad(lambda l: np.sin(2 * np.pi * k/np.pi * l), lLow, lUpp)[0] for k in u]    # Imag component
+# V(u) of this row, from the single evaluation of all rows above:
+cosr, sinr = rowVis[1].real, rowVis[1].imag
 
 # These compute the amp and phase manually:
-amp = [np.sqrt(i**2 + j**2) for i, j in zip(cosr, sinr)]
-pha = [      np.arctan(j/i) for i, j in zip(cosr, sinr)]
+amp, pha = visibility.ampPhase(rowVis[1])
 # pha = [     np.arctan2(j,i) for i, j in zip(cosr, sinr)]    # This is akin to using np.angle as below
 
 # These use the numpy's built in functions instead:
@@ -206,24 +214,17 @@ ax10.tick_params(axis='both', which='both', labelsize= textsize)
 #=====================================================================
 #     Code begins here
 #
-offset = 3           # Distance of source from origin
-width  = 2           # Source width                (dimensionless)
-
-u    = np.linspace(ulim, -ulim, steps)                 # Baseline span
-uDeg = np.degrees(u)
+offset, width = rows[2]
 
 lUpp =  width/2. + offset
 lLow = -width/2. + offset
 l    = np.linspace(lUpp,  lLow, steps)
 
-# For each baseline, u, integrate "Re[V(u)] = I(l)*cos(2pi u  l)"  for all, l.
-# Here I(l) is the box function for the range [lUpp, lLow]:
-cosr = [(1./(np.abs(lLow-lUpp))) * integrate.quad(lambda l: np.cos(2 * np.pi * k/np.pi * l), lLow, lUpp)[0] for k in u]    # Real component
-sinr = [(1./(np.abs(lLow-lUpp))) * integrate.quad(lambda l: np.sin(2 * np.pi * k/np.pi * l), lLow, lUpp)[0] for k in u]    # Imag component
+# V(u) of this row, from the single evaluation of all rows above:
+cosr, sinr = rowVis[2].real, rowVis[2].imag
 
 # These compute the amp and phase manually:
-amp = [np.sqrt(i**2 + j**2) for i, j in zip(cosr, sinr)]
-pha = [      np.arctan(j/i) for i, j in zip(cosr, sinr)]
+amp, pha = visibility.ampPhase(rowVis[2])
 # pha = [     np.arctan2(j,i) for i, j in zip(cosr, sinr)]    # This is akin to using np.angle as below
 
 # These use the numpy's built in functions instead:
@@ -273,24 +274,17 @@ ax15.tick_params(axis='both', which='both', labelsize= textsize)
 #=====================================================================
 #     Code begins here
 #
-offset = -4           # Distance of source from origin
-width  = 6           # Source width                (dimensionless)
-
-u    = np.linspace(ulim, -ulim, steps)                 # Baseline span
-uDeg = np.degrees(u)
+offset, width = rows[3]
 
 lUpp =  width/2. + offset
 lLow = -width/2. + offset
 l    = np.linspace(lUpp,  lLow, steps)
 
-# For each baseline, u, integrate "Re[V(u)] = I(l)*cos(2pi u  l)"  for all, l.
-# Here I(l) is the box function for the range [lUpp, lLow]:
-cosr = [(1./(np.abs(lLow-lUpp))) * integrate.quad(lambda l: np.cos(2 * np.pi * k/np.pi * l), lLow, lUpp)[0] for k in u]    # Real component
-sinr = [(1./(np.abs(lLow-lUpp))) * integrate.quad(lambda l: np.sin(2 * np.pi * k/np.pi * l), lLow, lUpp)[0] for k in u]    # Imag component
+# V(u) of this row, from the single evaluation of all rows above:
+cosr, sinr = rowVis[3].real, rowVis[3].imag
 
 # These compute the amp and phase manually:
-amp = [np.sqrt(i**2 + j**2) for i, j in zip(cosr, sinr)]
-pha = [      np.arctan(j/i) for i, j in zip(cosr, sinr)]
+amp, pha = visibility.ampPhase(rowVis[3])
 # pha = [     np.arctan2(j,i) for i, j in zip(cosr, sinr)]    # This is akin to using np.angle as below
 
 # These use the numpy's built in functions instead:
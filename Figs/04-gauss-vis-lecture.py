@@ -1,8 +1,12 @@
-#! /usr/bin/env python2.7
+#! /usr/bin/env python3
 
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
-import scipy.integrate as integrate
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+import visibility
 
 # Written by Vasaant S/O Krishnan on Saturday, 18 May 2019
 
@@ -108,6 +112,24 @@ textsize = 13
 
 
 #****
+#=====================================================================
+#     Code begins here
+#
+# Every row has the same u grid, so V(u) of all rows is computed at
+# once (and memoised) by visibility.py, rather than with integrate.quad
+# per baseline in each row.
+rows = [(   0, 0.08),                                  # (offset, width) of each row
+        (   0, 1.0 ),
+        (   3, 0.08),
+        (-1.5, 0.15)]
+u, rowVis = visibility.visibilities('gauss', rows, uLim, steps)
+uDeg = np.degrees(u)
+#=====================================================================
+
+
+
+
+
 #=====================================================================
 #     Plot
 #
@@ -121,11 +143,7 @@ plt.subplots_adjust(hspace= 0.6, wspace= 0.5)
 #=====================================================================
 #     Code begins here
 #
-offset = 0           # Distance of source from origin
-width  = 0.08        # Source width                (dimensionless)
-
-u    = np.linspace(uLim, -uLim, steps)                 # Baseline span
-uDeg = np.degrees(u)
+offset, width = rows[0]
 
 lLim = 10                                              # Limit of range of source position (dimensionless)
 lUpp =  lLim
@@ -135,14 +153,11 @@ theta = np.linspace(lLow, lUpp, steps)
 # Here I(l) is a Gaussian function for the range [lUpp, lLow]:
 Iv = [np.exp(-np.power(l-offset, 2)/(2*np.power(width, 2))) for l in theta]
 
-# For each baseline, u, integrate "Re[V(u)] = I(l)*cos(2pi u  l)"  for all, l.
-# Here I(l) is the Gaussian function for the range [lUpp, lLow]:
-cosr = [integrate.quad(lambda l: np.multiply((1/np.sqrt(2*np.pi*np.power(width, 2.)))*np.exp(-np.power(l-offset, 2)/(2*np.power(width, 2))), np.cos(2 * np.pi * k * l/np.pi)), theta[0], theta[-1])[0] for k in u]
-sinr = [integrate.quad(lambda l: np.multiply((1/np.sqrt(2*np.pi*np.power(width, 2.)))*np.exp(-np.power(l-offset, 2)/(2*np.power(width, 2))), np.sin(2 * np.pi * k * l/np.pi)), theta[0], theta[-1])[0] for k in u]
+# V(u) of this row, from the single evaluation of all rows above:
+cosr, sinr = rowVis[0].real, rowVis[0].imag
 
 # These compute the amp and phase manually:
-amp = [np.sqrt(i**2 + j**2) for i, j in zip(cosr, sinr)]
-pha = [      np.arctan(j/i) for i, j in zip(cosr, sinr)]
+amp, pha = visibility.ampPhase(rowVis[0])
 # pha = [     np.arctan2(j,i) for i, j in zip(cosr, sinr)]    # This is akin to using np.angle as below
 
 # These use the numpy's built in functions instead:
@@ -169,7 +184,7 @@ ax3.plot(uDeg, sinr, color = 'b')
 ax2.set_xlabel('Baseline (Spatial frequency)', fontsize= 11)
 ax3.set_xlabel('(degrees)', fontsize= 11)
 # ax2.set_title( '$\\mathcal{V}$(u): Real (red) and Imag (blue)\n', y=1.11, fontsize= textsize)
-ax2.set_title( '$\mathcal{V}(u) = \int I_\\nu (\\ell )\, e^{-i \, 2\\pi \, u \, \\ell } \, d\,\\ell}$\n Real (red) and Imag (blue)\n', y=1.11, fontsize= textsize)
+ax2.set_title( '$\mathcal{V}(u) = \int I_\\nu (\\ell )\, e^{-i \, 2\\pi \, u \, \\ell } \, d\,\\ell$\n Real (red) and Imag (blue)\n', y=1.11, fontsize= textsize)
 ax2.set_xlim([-uLim, uLim])
 ax2.set_ylim(-1.1, 1.1)
 ax1.tick_params(axis='both', which='both', labelsize= textsize)
@@ -198,11 +213,7 @@ ax5.tick_params(axis='both', which='both', labelsize= textsize)
 #=====================================================================
 #     Code begins here
 #
-offset = 0           # Distance of source from origin
-width  = 1.0         # Source width                (dimensionless)
-
-u    = np.linspace(uLim, -uLim, steps)                 # Baseline span
-uDeg = np.degrees(u)
+offset, width = rows[1]
 
 lLim = 10                                              # Limit of range of source position (dimensionless)
 lUpp =  lLim
@@ -212,14 +223,11 @@ theta = np.linspace(lLow, lUpp, steps)
 # Here I(l) is a Gaussian function for the range [lUpp, lLow]:
 Iv = [np.exp(-np.power(l-offset, 2)/(2*np.power(width, 2))) for l in theta]
 
-# For each baseline, u, integrate "Re[V(u)] = I(l)*cos(2pi u  l)"  for all, l.
-# Here I(l) is the Gaussian function for the range [lUpp, lLow]:
-cosr = [integrate.quad(lambda l: np.multiply((1/np.sqrt(2*np.pi*np.power(width, 2.)))*np.exp(-np.power(l-offset, 2)/(2*np.power(width, 2))), np.cos(2 * np.pi * k * l/np.pi)), theta[0], theta[-1])[0] for k in u]
-sinr = [integrate.quad(lambda l: np.multiply((1/np.sqrt(2*np.pi*np.power(width, 2.)))*np.exp(-np.power(l-offset, 2)/(2*np.power(width, 2))), np.sin(2 * np.pi * k * l/np.pi)), theta[0], theta[-1])[0] for k in u]
+# V(u) of this row, from the single evaluation of all rows above:
+cosr, sinr = rowVis[1].real, rowVis[1].imag
 
 # These compute the amp and phase manually:
-amp = [np.sqrt(i**2 + j**2) for i, j in zip(cosr, sinr)]
-pha = [      np.arctan(j/i) for i, j in zip(cosr, sinr)]
+amp, pha = visibility.ampPhase(rowVis[1])
 # pha = [     np.arctan2(j,i) for i, j in zip(cosr, sinr)]    # This is akin to using np.angle as below
 
 # These use the numpy's built in functions instead:
@@ -269,11 +277,7 @@ ax10.tick_params(axis='both', which='both', labelsize= textsize)
 #=====================================================================
 #     Code begins here
 #
-offset = 3           # Distance of source from origin
-width  = 0.08        # Source width                (dimensionless)
-
-u    = np.linspace(uLim, -uLim, steps)                 # Baseline span
-uDeg = np.degrees(u)
+offset, width = rows[2]
 
 lLim = 10                                              # Limit of range of source position (dimensionless)
 lUpp =  lLim
@@ -283,14 +287,11 @@ theta = np.linspace(lLow, lUpp, steps)
 # Here I(l) is a Gaussian function for the range [lUpp, lLow]:
 Iv = [np.exp(-np.power(l-offset, 2)/(2*np.power(width, 2))) for l in theta]
 
-# For each baseline, u, integrate "Re[V(u)] = I(l)*cos(2pi u  l)"  for all, l.
-# Here I(l) is the Gaussian function for the range [lUpp, lLow]:
-cosr = [integrate.quad(lambda l: np.multiply((1/np.sqrt(2*np.pi*np.power(width, 2.)))*np.exp(-np.power(l-offset, 2)/(2*np.power(width, 2))), np.cos(2 * np.pi * k * l/np.pi)), theta[0], theta[-1])[0] for k in u]
-sinr = [integrate.quad(lambda l: np.multiply((1/np.sqrt(2*np.pi*np.power(width, 2.)))*np.exp(-np.power(l-offset, 2)/(2*np.power(width, 2))), np.sin(2 * np.pi * k * l/np.pi)), theta[0], theta[-1])[0] for k in u]
+# V(u) of this row, from the single evaluation of all rows above:
+cosr, sinr = rowVis[2].real, rowVis[2].imag
 
 # These compute the amp and phase manually:
-amp = [np.sqrt(i**2 + j**2) for i, j in zip(cosr, sinr)]
-pha = [      np.arctan(j/i) for i, j in zip(cosr, sinr)]
+amp, pha = visibility.ampPhase(rowVis[2])
 # pha = [     np.arctan2(j,i) for i, j in zip(cosr, sinr)]    # This is akin to using np.angle as below
 
 # These use the numpy's built in functions instead:
@@ -341,11 +342,7 @@ ax15.tick_params(axis='both', which='both', labelsize= textsize)
 #=====================================================================
 #     Code begins here
 #
-offset = -1.5           # Distance of source from origin
-width  = 0.15          # Source width                (dimensionless)
-
-u    = np.linspace(uLim, -uLim, steps)                 # Baseline span
-uDeg = np.degrees(u)
+offset, width = rows[3]
 
 lLim = 10                                              # Limit of range of source position (dimensionless)
 lUpp =  lLim
@@ -355,14 +352,11 @@ theta = np.linspace(lLow, lUpp, steps)
 # Here I(l) is a Gaussian function for the range [lUpp, lLow]:
 Iv = [np.exp(-np.power(l-offset, 2)/(2*np.power(width, 2))) for l in theta]
 
-# For each baseline, u, integrate "Re[V(u)] = I(l)*cos(2pi u  l)"  for all, l.
-# Here I(l) is the Gaussian function for the range [lUpp, lLow]:
-cosr = [integrate.quad(lambda l: np.multiply((1/np.sqrt(2*np.pi*np.power(width, 2.)))*np.exp(-np.power(l-offset, 2)/(2*np.power(width, 2))), np.cos(2 * np.pi * k * l/np.pi)), theta[0], theta[-1])[0] for k in u]
-sinr = [integrate.quad(lambda l: np.multiply((1/np.sqrt(2*np.pi*np.power(width, 2.)))*np.exp(-np.power(l-offset, 2)/(2*np.power(width, 2))), np.sin(2 * np.pi * k * l/np.pi)), theta[0], theta[-1])[0] for k in u]
+# V(u) of this row, from the single evaluation of all rows above:
+cosr, sinr = rowVis[3].real, rowVis[3].imag
 
 # These compute the amp and phase manually:
-amp = [np.sqrt(i**2 + j**2) for i, j in zip(cosr, sinr)]
-pha = [      np.arctan(j/i) for i, j in zip(cosr, sinr)]
+amp, pha = visibility.ampPhase(rowVis[3])
 # pha = [     np.arctan2(j,i) for i, j in zip(cosr, sinr)]    # This is akin to using np.angle as below
 
 # These use the numpy's built in functions instead:
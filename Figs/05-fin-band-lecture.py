@@ -1,4 +1,4 @@
-#! /usr/bin/env python
+#! /usr/bin/env python3
 
 import sys
 import numpy as np
@@ -45,9 +45,9 @@ nu  = float( nu)                               # Make sure frequencies are float
 Dnu = float(Dnu)
 
 if ((1./u)/(Dnu/nu)) > 1.0:
-    print "Make (1/u) <= (Dnu/nu)"
-    print "   1/u = %.3f"%(1./u)
-    print "Dnu/nu = %.3f"%(Dnu/nu)
+    print("Make (1/u) <= (Dnu/nu)")
+    print("   1/u = %.3f"%(1./u))
+    print("Dnu/nu = %.3f"%(Dnu/nu))
     exit()
 
 fov    = field_of_view/2.0                     # FOV centred on zero (see plot for zero)
@@ -74,7 +74,7 @@ sinTheta  = (1./u)/(Dnu/nu)                    # Compute first null...
 firstNull = np.degrees(np.arcsin(sinTheta))
 numFringe = np.ceil(nu/Dnu)                    #... and number of fringes to that null
 
-print "%.1f degrees and %d fringes to the first null."%(np.degrees(np.arcsin(sinTheta)), numFringe)
+print("%.1f degrees and %d fringes to the first null."%(np.degrees(np.arcsin(sinTheta)), numFringe))
 #=====================================================================
 
 
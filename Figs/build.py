@@ -0,0 +1,184 @@
+#! /usr/bin/env python3
+
+import os
+import sys
+import ast
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# build.py rebuilds the lecture figures in Figs/ from their
+# *-lecture.py scripts, instead of running each one by hand.
+#
+# Each figure is keyed by a hash of its script, its arguments, the
+# output settings below, build.py itself and every module either of
+# them imports from ../scripts (found with ast, so every name of
+# "import a, b" and imports inside functions count).
+# Only figures whose hash differs from the last build, or whose output
+# is missing, are rebuilt. Independent figures are rendered in parallel
+# worker processes with the Agg backend, their lines are decimated to
+# outputDpi (see ../scripts/decimate.py) and they are written straight
+# to PDF, so pdflatex picks up e.g. 01-corr-resp.pdf for
+# \includegraphics{01-corr-resp} without an EPS conversion step.
+#
+# Usage:
+#   -->$ build.py [--jobs N] [--force] [--list] [script ...]
+
+
+
+
+
+#=====================================================================
+#     User variables
+#
+figures   = {'01-corr-resp-lecture.py'         : ('01-corr-resp',         []),    # script : (output, sys.argv[1:])
+             '02-vis-plot-lecture.py'          : ('02-vis-plot',          []),
+             '03-dirac-vis-lecture.py'         : ('03-dirac-vis',         []),
+             '04-box-vis-lecture.py'           : ('04-box-vis',           []),
+             '04-gauss-vis-lecture.py'         : ('04-gauss-vis',         []),
+             '05-fin-band-lecture.py'          : ('05-fin-band-lecture',  []),
+             '06-array2uv-meerkat-lecture.py'  : ('06-array2uv-meerkat',  []),
+             '06-array2uv-triangle-lecture.py' : ('06-array2uv-triangle', []),
+             '08-dirtybeam-lecture.py'         : ('08-dirtybeam',         [])}
+outputDpi = 300             # Resolution lines are decimated to (None = all points)
+stateFile = '.build-state.json'
+#=====================================================================
+
+
+
+
+
+#=====================================================================
+#     Functions
+figsDir    = os.path.dirname(os.path.abspath(__file__))
+scriptsDir = os.path.join(figsDir, '..', 'scripts')
+
+
+
+def localImports(path, seen=None):
+    # Modules from ../scripts imported (directly or not) by path
+    if seen is None:
+        seen = set()
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            mod = os.path.join(scriptsDir, name.split('.')[0] + '.py')
+            if mod not in seen and os.path.exists(mod):
+                seen.add(mod)
+                localImports(mod, seen)
+    return seen
+
+
+
+def figureHash(script, output, args):
+    # Hash of everything the figure depends on: the script and the
+    # modules it imports, and build.py itself, whose render() decimates
+    # the figure with ../scripts/decimate.py
+    import matplotlib
+    h = hashlib.sha256()
+    h.update(json.dumps([output, args, outputDpi, matplotlib.__version__]).encode())
+    source = os.path.join(figsDir, script)
+    build  = os.path.abspath(__file__)
+    for path in [source, build] + sorted(localImports(source, localImports(build))):
+        with open(path, 'rb') as f:
+            h.update(os.path.basename(path).encode())
+            h.update(f.read())
+    return h.hexdigest()
+
+
+
+def loadState():
+    try:
+        with open(os.path.join(figsDir, stateFile)) as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return {}
+
+
+
+def saveState(state):
+    tmp = os.path.join(figsDir, stateFile + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp, os.path.join(figsDir, stateFile))
+
+
+
+def render(script, output, args):
+    # Run one figure script headless and save its figure as PDF. Runs
+    # in a worker process, so the patches to pyplot stay there.
+    import runpy
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    sys.path.insert(0, scriptsDir)
+    import decimate
+
+    plt.show    = lambda *a, **k: None
+    plt.savefig = lambda *a, **k: None           # The script's own .eps output is replaced by ours
+    os.chdir(figsDir)
+    sys.argv = [script] + list(args)
+    runpy.run_path(script, run_name='__main__')
+
+    fig = plt.gcf()
+    if outputDpi:
+        decimate.decimateFigure(fig, dpi=outputDpi)
+    fig.savefig(output + '.pdf', transparent=True, format='pdf')
+    plt.close('all')
+    return output + '.pdf'
+#=====================================================================
+
+
+
+
+
+#=====================================================================
+#     Code begins here
+#
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rebuild stale lecture figures.')
+    parser.add_argument('scripts', nargs='*', help='only consider these scripts')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='worker processes')
+    parser.add_argument('-f', '--force', action='store_true', help='rebuild even if up to date')
+    parser.add_argument('-l', '--list', action='store_true', help='list stale figures and exit')
+    opts = parser.parse_args()
+
+    state  = loadState()
+    wanted = opts.scripts or sorted(figures)
+    stale  = {}
+    for script in wanted:
+        output, args = figures[os.path.basename(script)]
+        key = figureHash(os.path.basename(script), output, args)
+        pdf = os.path.join(figsDir, output + '.pdf')
+        if opts.force or state.get(output) != key or not os.path.exists(pdf):
+            stale[os.path.basename(script)] = (output, args, key)
+
+    if opts.list or not stale:
+        for script in sorted(stale):
+            print(script)
+        if not stale:
+            print('All figures are up to date.')
+        sys.exit(0)
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=max(1, min(opts.jobs, len(stale)))) as pool:
+        jobs = {pool.submit(render, s, o, a) : (s, o, k) for s, (o, a, k) in stale.items()}
+        for job in as_completed(jobs):
+            script, output, key = jobs[job]
+            try:
+                print('%-34s -> %s'%(script, job.result()))
+                state[output] = key
+                saveState(state)
+            except Exception as err:
+                print('%-34s FAILED: %s'%(script, err))
+                failed += 1
+    sys.exit(1 if failed else 0)
+#=====================================================================
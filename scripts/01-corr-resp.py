@@ -1,9 +1,12 @@
-#! /usr/bin/env python
+#! /usr/bin/env python3
 
 import sys
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
+import fringes
+import beams
+import antarray
+import fringemaps
+import sampling
 
 # Written by Vasaant S/O Krishnan on Tuesday, 30 January 2018
 
@@ -27,6 +30,10 @@ from mpl_toolkits.mplot3d import Axes3D
 #       cycl  = plot in polar coordinates
 #       resp  = plot with customised receiver response
 #       print = output maxima and minima to terminal
+#       table = write maxima and minima to extremaFile (see fringes.py)
+#       maps  = plot the 2-D (l, m) fringe pattern summed over all
+#               baselines of antArray (see fringemaps.py)
+#       thre  = plot the response as a 3-D surface over (l, m)
 
 
 
@@ -37,7 +44,14 @@ from mpl_toolkits.mplot3d import Axes3D
 #
 u             = 3           # Baseline length                             (wavelengths)
 field_of_view = 180         # Total range of field of view centred on zero    (degrees)
-steps         = 10000
+steps         = None        # Samples along theta, None = choose from u (see sampling.py)
+extremaFile   = '01-corr-resp-extrema.csv'    # Output of 'table'
+vertexBudget  = 20000       # Max. vertices of the 'thre' surface
+numPix        = 512         # Pixels along l and m for 'maps'
+jobs          = 4           # Threads for 'maps'
+antArray      = {'A' : [ 0.5, -0.5],      # Array coordinates for 'maps' (wavelengths)
+                 'B' : [   0,  0.5],
+                 'C' : [-0.5, -0.5]}
 #=====================================================================
 
 
@@ -52,8 +66,12 @@ usrInp = sys.argv[1:]
 fov   = field_of_view/2.0                  # FOV centred on zero (see plot for zero)
 rfov  = np.radians(fov)
 
-xaxis = np.linspace( fov,  -fov, steps)    # Top axis in degrees
-theta = np.linspace(rfov, -rfov, steps)    # Angular offset from perpendicular plane (radians)
+if steps is None:                          # Angular offset from perpendicular plane (radians)
+    theta = sampling.adaptiveSample(lambda x: np.cos(2 * np.pi * u * np.sin(x)),
+                                    rfov, -rfov, sampling.fringeFreq(u))[0]
+else:
+    theta = np.linspace(rfov, -rfov, steps)
+xaxis = np.degrees(theta)                  # Top axis in degrees
 
 l     = np.sin(theta)                      # Directional cosine ("ell") towards source, s
 cosr  = np.cos(2 * np.pi * u * l)          # Interferometer cosine response, R_c
@@ -68,27 +86,20 @@ cosr  = np.cos(2 * np.pi * u * l)          # Interferometer cosine response, R_c
 #     Look at the bottom of page 4 of my personal notes for details.
 #
 if 'print' in usrInp:
-    print "%5s  %6s  %6s"%('n', 'rad', 'deg')
-    print ""
-    firstPass = True
-    for i in range(-u, u+1):
-
-        i = float(i)
-        u = float(u)
-
-        if firstPass:                  # Print "max" , "min" fin the first instance
-            maxima = np.arcsin(i/u)    # Values of Theta where R_c is max
-            print "%5d  %6.2f  %6.2f         max"%(i, maxima, np.degrees(maxima))
-            if i < u:
-                minima = np.arcsin((2*i+1)/(2*u))    # Values of Theta where R_c is min
-                print "%10s  %6.2f  %6.2f    min"%(" ", minima, np.degrees(minima))
-            firstPass = False
+    extrema = fringes.fringeExtrema(u, fov)
+    print("%5s  %6s  %6s"%('n', 'rad', 'deg'))
+    print("")
+    firstMax = firstMin = True
+    for row in extrema:
+        if row['kind'] > 0:                # Print "max" , "min" for the first instance
+            print("%5d  %6.2f  %6.2f         %s"%(row['n'], row['rad'], row['deg'], 'max' if firstMax else ''))
+            firstMax = False
         else:
-            maxima = np.arcsin(i/u)
-            print "%5d  %6.2f  %6.2f           "%(i, maxima, np.degrees(maxima))
-            if i < u:
-                minima = np.arcsin((2*i+1)/(2*u))    # Values of Theta where R_c is min
-                print "%10s  %6.2f  %6.2f      "%(" ", minima, np.degrees(minima))
+            print("%10s  %6.2f  %6.2f    %s"%(" ", row['rad'], row['deg'], 'min' if firstMin else ''))
+            firstMin = False
+
+if 'table' in usrInp:
+    fringes.saveTable(fringes.fringeExtrema(u, fov), extremaFile)
 #=====================================================================
 
 
@@ -98,6 +109,11 @@ if 'print' in usrInp:
 #=====================================================================
 #     Plotting
 #
+# matplotlib is only imported when a plot is asked for, so 'print' and
+# 'table' runs stay cheap
+if set(usrInp) & set(['rect', 'cycl', 'resp', 'thre', 'maps']):
+    import matplotlib.pyplot as plt
+
 if 'rect' in usrInp:
     fig = plt.figure()
     ax1 = fig.add_subplot(111)
@@ -139,15 +155,12 @@ if 'cycl' in usrInp:
 
 if 'resp' in usrInp:
 
-    def gaussian(x, mu, sig):
-        return np.exp(-np.power(x-mu, 2.)/(2*np.power(sig, 2.)))
-
     fig = plt.figure()
     ax1 = fig.add_subplot(111, projection = 'polar')
 
-    # receiver = np.cos(theta)                          # Cosine response function of receiver
-    receiver = gaussian(theta, 0, 0.1)                  # Gaussian response function of receiver
-    rec_cosr = [i*j for i, j in zip(receiver, cosr)]    # Receiver * Response
+    # receiver = beams.cachedBeam('cosn', 1., theta, n=1)            # Cosine response function of receiver
+    receiver = beams.cachedBeam('gaussian', 1., theta, sigma=0.1)    # Gaussian response function of receiver
+    rec_cosr = receiver*cosr                                         # Receiver * Response
 
     ax1.plot(theta, np.abs(rec_cosr))
 
@@ -166,21 +179,49 @@ if 'resp' in usrInp:
 if 'thre' in usrInp:
 
     # As of Wednesday, 31 January 2018, I cannot get the 3D plot to
-    # work.
+    # work. Meshgridding the 10,000 points of theta and cosr against
+    # each other needs two 10,000 x 10,000 surfaces, so the surface is
+    # now built on a decimated polar grid of (l, m) instead, with at
+    # most vertexBudget vertices (see fringes.responseSurface).
 
+    from mpl_toolkits.mplot3d import Axes3D     # Registers the '3d' projection on old matplotlib
     fig = plt.figure()
     ax  = fig.add_subplot(111, projection = '3d')
 
-    x = theta
-    y = cosr
+    x, y, z = fringes.responseSurface(u, rfov, vertexBudget)
+
+    ax.plot_trisurf(x, y, z, cmap='viridis', linewidth=0, antialiased=False)
+
+    plt.suptitle('R$_c$ = cos(2$\\pi $ * ' + str(int(u)) + ' * $\\ell$)')
+    ax.set_xlabel('$\\ell$')
+    ax.set_ylabel('m')
+    ax.set_zlabel('R$_c$')
+
+    plt.show()
+
+
 
-    r = [np.sqrt(i**2 + j**2) for i, j in zip(x, y)]
-    p = [np.arctan(abs(j/i))  for i, j in zip(x, y)]
 
-    R, P = np.meshgrid(r,p)
-    Z    = R
+if 'maps' in usrInp:
 
-    X, Y = R*np.cos(P), R*np.sin(P)
+    pairs, uv = antarray.baselines(antArray)
+    lm   = fringemaps.lmAxis(numPix)
+    resp = fringemaps.summedResponse(uv, lm, lm, jobs=jobs)    # Sum of R_c + i R_s
+
+    fig = plt.figure()
+    plt.suptitle('Summed response of %d baselines'%len(pairs))
+    extent = [lm[0], lm[-1], lm[0], lm[-1]]
 
-    ax.plot_surface(X, Y, Z)
+    ax1 = fig.add_subplot(121)
+    ax1.imshow(resp.real, origin='lower', extent=extent)
+    ax1.set_title('$\\sum$ R$_c$')
+    ax1.set_xlabel('$\\ell$')
+    ax1.set_ylabel('m')
+
+    ax2 = fig.add_subplot(122)
+    ax2.imshow(resp.imag, origin='lower', extent=extent)
+    ax2.set_title('$\\sum$ R$_s$')
+    ax2.set_xlabel('$\\ell$')
+
+    plt.show()
 #=====================================================================
@@ -1,8 +1,7 @@
-#! /usr/bin/env python
+#! /usr/bin/env python3
 
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.patches import Polygon
+import sampling
 
 # Written by Vasaant S/O Krishnan on Saturday, 03 February 2018
 
@@ -21,7 +20,7 @@ from matplotlib.patches import Polygon
 #
 u             = 3           # Baseline length                             (wavelengths)
 field_of_view = 180         # Total range of field of view centred on zero    (degrees)
-steps         = 10000
+steps         = None        # Samples along theta, None = choose from u (see sampling.py)
 #=====================================================================
 
 
@@ -34,8 +33,12 @@ steps         = 10000
 fov    = field_of_view/2.0                     # FOV centred on zero (see plot for zero)
 rfov   = np.radians(fov)
 
-xaxis  = np.linspace( fov,  -fov, steps)       # Top axis in degrees
-theta  = np.linspace(rfov, -rfov, steps)       # Angular offset from perpendicular plane (radians)
+if steps is None:                              # Angular offset from perpendicular plane (radians)
+    theta = sampling.adaptiveSample(lambda x: np.exp(-x**2 + 2j * np.pi * u * np.sin(x)),
+                                    rfov, -rfov, sampling.fringeFreq(u))[0]
+else:
+    theta = np.linspace(rfov, -rfov, steps)
+xaxis  = np.degrees(theta)                     # Top axis in degrees
 
 l      = np.sin(theta)                         # Directional cosine ("ell") towards source, s
 
@@ -44,8 +47,8 @@ sinr   = np.sin(2 * np.pi * u * l)             # Interferometer sine   response,
 
 source = np.exp(-theta**2)                     # Gaussian brightness distribution, I_v(s)
 
-cosEnv = [i*j for i, j in zip(source, cosr)]   # I_v(s) * cos
-sinEnv = [i*j for i, j in zip(source, sinr)]   # I_v(s) * sin
+cosEnv = source*cosr                           # I_v(s) * cos
+sinEnv = source*sinr                           # I_v(s) * sin
 #=====================================================================
 
 
@@ -55,36 +58,41 @@ sinEnv = [i*j for i, j in zip(source, sinr)]   # I_v(s) * sin
 #=====================================================================
 #     Plotting
 #
-fig = plt.figure()
+if __name__ == '__main__':
+    import matplotlib.pyplot as plt
+    from matplotlib.patches import Polygon
 
-#==================================
-#    Cosine plot params
-ax1 = fig.add_subplot(121)
-ax2 = ax1.twiny()                # Create twin 'x' axis to show radians and degrees
+    fig = plt.figure()
 
-ax1.plot(theta, cosEnv)          # Plot [I_v(s) * cos] and give x-axis radians
-ax2.plot(xaxis, source)          # Plot [I_v(s)]       and give x-axis degrees
+    #==================================
+    #    Cosine plot params
+    ax1 = fig.add_subplot(121)
+    ax2 = ax1.twiny()                # Create twin 'x' axis to show radians and degrees
 
-cosInt = Polygon(zip(theta, cosEnv), facecolor='g', edgecolor='g')    # Integrated region of I_v(s) * cos
-ax1.add_patch(cosInt)
+    ax1.plot(theta, cosEnv)          # Plot [I_v(s) * cos] and give x-axis radians
+    ax2.plot(xaxis, source)          # Plot [I_v(s)]       and give x-axis degrees
 
-ax1.set_title( 'I$_v$(s) * cos(2$\pi $ * ' + str(int(u)) + ' * $\ell$)', y = 1.09)
-ax1.set_ylabel('Response from correlator (Left:  R$_c$ , Right:  R$_s$)')
-ax1.set_xlabel('Angular offset from perpendicular plane (radians)')
-ax2.set_xlabel('(degrees)')
+    cosInt = Polygon(np.column_stack((theta, cosEnv)), facecolor='g', edgecolor='g')    # Integrated region of I_v(s) * cos
+    ax1.add_patch(cosInt)
 
-#==================================
-#    Sine plot params
-ax3 = fig.add_subplot(122)
-ax4 = ax3.twiny()                # Create twin 'x' axis to show radians and degrees
+    ax1.set_title( 'I$_v$(s) * cos(2$\pi $ * ' + str(int(u)) + ' * $\ell$)', y = 1.09)
+    ax1.set_ylabel('Response from correlator (Left:  R$_c$ , Right:  R$_s$)')
+    ax1.set_xlabel('Angular offset from perpendicular plane (radians)')
+    ax2.set_xlabel('(degrees)')
 
-ax3.plot(theta, sinEnv)          # Plot   I_v(s) * sin   with x-axis in radians
-ax4.plot(xaxis, source)          # Plot   I_v(s)]        with x-axis in degrees
+    #==================================
+    #    Sine plot params
+    ax3 = fig.add_subplot(122)
+    ax4 = ax3.twiny()                # Create twin 'x' axis to show radians and degrees
 
-sinInt = Polygon(zip(theta,sinEnv), facecolor='g', edgecolor='g')    # Integrated region of I_v(s) * sin
-ax3.add_patch(sinInt)
+    ax3.plot(theta, sinEnv)          # Plot   I_v(s) * sin   with x-axis in radians
+    ax4.plot(xaxis, source)          # Plot   I_v(s)]        with x-axis in degrees
 
-ax4.set_title('I$_v$(s) * sin(2$\pi $ * ' + str(int(u)) + ' * $\ell$)', y = 1.09)
-ax3.get_yaxis().set_ticklabels([])
+    sinInt = Polygon(np.column_stack((theta, sinEnv)), facecolor='g', edgecolor='g')    # Integrated region of I_v(s) * sin
+    ax3.add_patch(sinInt)
 
-plt.show()
+    ax4.set_title('I$_v$(s) * sin(2$\pi $ * ' + str(int(u)) + ' * $\ell$)', y = 1.09)
+    ax3.get_yaxis().set_ticklabels([])
+
+    plt.show()
+#=====================================================================
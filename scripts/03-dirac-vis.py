@@ -1,7 +1,6 @@
 #! /usr/bin/env python
 
 import numpy as np
-import matplotlib.pyplot as plt
 
 # Written by Vasaant S/O Krishnan on Tuesday, 06 March 2018
 
@@ -83,43 +82,47 @@ pha = [      np.arctan(j/i) for i, j in zip(cosr, sinr)]
 #=====================================================================
 #     Plot
 #
-fig = plt.figure()
-
-# Plot source, which is a Dirac delta function
-ax1 = fig.add_subplot(131)
-ax1.arrow(l, 0, 0, 0.95,
-           head_width = 0.50,
-          head_length = 0.05,
-                   fc = 'k',
-                   ec = 'k')
-ax1.set_xlim(-10,  10)
-ax1.set_xticks(np.arange(-10, 11, 2))
-ax1.set_ylim([0, 1.06])
-ax1.set_xlabel('Source position')
-ax1.set_title( '$\\delta (\\ell - %d$)'%l)
-
-# Plot the visibility cosine and sine components
-ax2 = fig.add_subplot(132)
-ax3 = ax2.twiny()
-
-ax2.plot(   u, cosr, color = 'r')
-ax3.plot(uDeg, sinr, color = 'b')
-ax2.set_xlabel('Baseline (Spatial frequency)')
-ax3.set_xlabel('(degrees)')
-ax2.set_title( 'V(u): Real (r) and Imag (b)', y=1.09)
-ax2.set_xlim([-ulim, ulim])
-ax2.set_ylim(-1.1, 1.1)
-
-# Plot the visibility amplitude and phase
-ax4 = fig.add_subplot(133)
-ax5 = ax4.twiny()
-
-ax4.plot(   u, amp, color = 'r')
-ax5.plot(uDeg, pha, color = 'b')
-ax4.set_xlabel('Baseline (Spatial frequency)')
-ax4.set_title( 'V(u): Amp (r) and Phas (b)', y=1.09)
-ax4.set_xlim([-ulim, ulim])
-if l == 0:
-    ax4.set_ylim(-0.1, 1.1)
-
-plt.show()
+if __name__ == '__main__':
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure()
+
+    # Plot source, which is a Dirac delta function
+    ax1 = fig.add_subplot(131)
+    ax1.arrow(l, 0, 0, 0.95,
+               head_width = 0.50,
+              head_length = 0.05,
+                       fc = 'k',
+                       ec = 'k')
+    ax1.set_xlim(-10,  10)
+    ax1.set_xticks(np.arange(-10, 11, 2))
+    ax1.set_ylim([0, 1.06])
+    ax1.set_xlabel('Source position')
+    ax1.set_title( '$\\delta (\\ell - %d$)'%l)
+
+    # Plot the visibility cosine and sine components
+    ax2 = fig.add_subplot(132)
+    ax3 = ax2.twiny()
+
+    ax2.plot(   u, cosr, color = 'r')
+    ax3.plot(uDeg, sinr, color = 'b')
+    ax2.set_xlabel('Baseline (Spatial frequency)')
+    ax3.set_xlabel('(degrees)')
+    ax2.set_title( 'V(u): Real (r) and Imag (b)', y=1.09)
+    ax2.set_xlim([-ulim, ulim])
+    ax2.set_ylim(-1.1, 1.1)
+
+    # Plot the visibility amplitude and phase
+    ax4 = fig.add_subplot(133)
+    ax5 = ax4.twiny()
+
+    ax4.plot(   u, amp, color = 'r')
+    ax5.plot(uDeg, pha, color = 'b')
+    ax4.set_xlabel('Baseline (Spatial frequency)')
+    ax4.set_title( 'V(u): Amp (r) and Phas (b)', y=1.09)
+    ax4.set_xlim([-ulim, ulim])
+    if l == 0:
+        ax4.set_ylim(-0.1, 1.1)
+
+    plt.show()
+#=====================================================================
@@ -1,8 +1,7 @@
-#! /usr/bin/env python2.7
+#! /usr/bin/env python3
 
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.integrate as integrate
+import sampling
 
 # Written by Vasaant S/O Krishnan on Saturday, 18 May 2019
 
@@ -28,6 +27,7 @@ widthTwo  = 0.1        # Second source's width                (dimensionless)
 
 uLim   = 5             # Limit of range of baselines            (wavelengths)
 steps  = 1000
+uSteps = None          # Samples along u, None = choose from the source (see sampling.py)
 #=====================================================================
 
 
@@ -37,9 +37,6 @@ steps  = 1000
 #=====================================================================
 #     Code begins here
 #
-u    = np.linspace(uLim, -uLim, steps)                 # Baseline span
-uDeg = np.degrees(u)
-
 lLim = 10                                              # Limit of range of source position (dimensionless)
 lUpp =  lLim
 lLow = -lLim
@@ -55,8 +52,20 @@ Ix = [a+b for a, b in zip(Iv, Iw)]
 # sinr = [integrate.quad(lambda l: np.multiply((1/np.sqrt(2*np.pi*np.power(width, 2.)))*np.exp(-np.power(l-offset, 2)/(2*np.power(width, 2))), np.sin(2 * np.pi * k * l/np.pi)), theta[0], theta[-1])[0] for k in u]
 
 
-cosr = [integrate.quad(lambda l: np.multiply(((1/np.sqrt(2*np.pi*np.power(width, 2.)))*np.exp(-np.power(l-offset, 2)/(2*np.power(width, 2))) + (1/np.sqrt(2*np.pi*np.power(widthTwo, 2.)))*np.exp(-np.power(l-offsetTwo, 2)/(2*np.power(widthTwo, 2)))), np.cos(2 * np.pi * k * l/np.pi)), theta[0], theta[-1])[0] for k in u]
-sinr = [integrate.quad(lambda l: np.multiply(((1/np.sqrt(2*np.pi*np.power(width, 2.)))*np.exp(-np.power(l-offset, 2)/(2*np.power(width, 2))) + (1/np.sqrt(2*np.pi*np.power(widthTwo, 2.)))*np.exp(-np.power(l-offsetTwo, 2)/(2*np.power(widthTwo, 2)))), np.sin(2 * np.pi * k * l/np.pi)), theta[0], theta[-1])[0] for k in u]
+def visibility(us):
+    import scipy.integrate as integrate          # Only needed on the quad path
+    cosr = [integrate.quad(lambda l: np.multiply(((1/np.sqrt(2*np.pi*np.power(width, 2.)))*np.exp(-np.power(l-offset, 2)/(2*np.power(width, 2))) + (1/np.sqrt(2*np.pi*np.power(widthTwo, 2.)))*np.exp(-np.power(l-offsetTwo, 2)/(2*np.power(widthTwo, 2)))), np.cos(2 * np.pi * k * l/np.pi)), theta[0], theta[-1])[0] for k in us]
+    sinr = [integrate.quad(lambda l: np.multiply(((1/np.sqrt(2*np.pi*np.power(width, 2.)))*np.exp(-np.power(l-offset, 2)/(2*np.power(width, 2))) + (1/np.sqrt(2*np.pi*np.power(widthTwo, 2.)))*np.exp(-np.power(l-offsetTwo, 2)/(2*np.power(widthTwo, 2)))), np.sin(2 * np.pi * k * l/np.pi)), theta[0], theta[-1])[0] for k in us]
+    return np.array(cosr) + 1j*np.array(sinr)
+
+if uSteps is None:                                     # Baseline span
+    u, vis = sampling.adaptiveSample(visibility, uLim, -uLim, sampling.visibilityFreq(max(abs(offset) + 3*width, abs(offsetTwo) + 3*widthTwo)))
+else:
+    u   = np.linspace(uLim, -uLim, uSteps)
+    vis = visibility(u)
+uDeg = np.degrees(u)
+cosr = vis.real
+sinr = vis.imag
 
 
 # These compute the amp and phase manually:
@@ -77,37 +86,41 @@ pha = [      np.arctan(j/i) for i, j in zip(cosr, sinr)]
 #=====================================================================
 #     Plot
 #
-fig = plt.figure()
-
-# Plot source, which is a Gaussian function
-ax1 = fig.add_subplot(131)
-ax1.plot(np.linspace(lLow,lUpp,steps), Ix)
-ax1.set_xlim(-10,  10)
-ax1.set_xticks(np.arange(-10, 11, 2))
-ax1.set_ylim(  0, 1.05)
-ax1.set_xlabel('Source width and offset')
-ax1.set_title( 'Gaussian\n $\\frac{1}{\sqrt{2\\pi \\times %.2f}} \enspace e^{- \\frac{(\\ell - %.2f)^2}{2 \\times %.2f}}$'%(width, offset, width), y= 1.0)
-
-# Plot the visibility cosine and sine components
-ax2 = fig.add_subplot(132)
-ax3 = ax2.twiny()
-ax2.plot(   u, cosr, color= 'r')
-ax3.plot(uDeg, sinr, color= 'b')
-ax2.set_xlabel('Baseline (Spatial frequency)')
-ax3.set_xlabel('(degrees)')
-# ax2.set_ylim(-1.1, 1.1)
-ax2.set_title( 'V(u): R$_c$ (r) and R$_s$ (b)', y= 1.09)
-
-# Plot the visibility amplitude and phase
-ax4 = fig.add_subplot(133)
-ax5 = ax4.twiny()
-
-ax4.plot(   u, amp, color= 'r')
-ax5.plot(uDeg, pha, color= 'b')
-ax4.set_xlabel('Baseline (Spatial frequency)')
-ax4.set_title( 'V(u): Amp (r) and Phas (b)', y= 1.09)
-ax4.set_xlim([-uLim, uLim])
-if offset == 0:
-    ax4.set_ylim(-0.1, 1.1)
-
-plt.show()
+if __name__ == '__main__':
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure()
+
+    # Plot source, which is a Gaussian function
+    ax1 = fig.add_subplot(131)
+    ax1.plot(np.linspace(lLow,lUpp,steps), Ix)
+    ax1.set_xlim(-10,  10)
+    ax1.set_xticks(np.arange(-10, 11, 2))
+    ax1.set_ylim(  0, 1.05)
+    ax1.set_xlabel('Source width and offset')
+    ax1.set_title( 'Gaussian\n $\\frac{1}{\sqrt{2\\pi \\times %.2f}} \enspace e^{- \\frac{(\\ell - %.2f)^2}{2 \\times %.2f}}$'%(width, offset, width), y= 1.0)
+
+    # Plot the visibility cosine and sine components
+    ax2 = fig.add_subplot(132)
+    ax3 = ax2.twiny()
+    ax2.plot(   u, cosr, color= 'r')
+    ax3.plot(uDeg, sinr, color= 'b')
+    ax2.set_xlabel('Baseline (Spatial frequency)')
+    ax3.set_xlabel('(degrees)')
+    # ax2.set_ylim(-1.1, 1.1)
+    ax2.set_title( 'V(u): R$_c$ (r) and R$_s$ (b)', y= 1.09)
+
+    # Plot the visibility amplitude and phase
+    ax4 = fig.add_subplot(133)
+    ax5 = ax4.twiny()
+
+    ax4.plot(   u, amp, color= 'r')
+    ax5.plot(uDeg, pha, color= 'b')
+    ax4.set_xlabel('Baseline (Spatial frequency)')
+    ax4.set_title( 'V(u): Amp (r) and Phas (b)', y= 1.09)
+    ax4.set_xlim([-uLim, uLim])
+    if offset == 0:
+        ax4.set_ylim(-0.1, 1.1)
+
+    plt.show()
+#=====================================================================
@@ -1,8 +1,7 @@
-#! /usr/bin/env python2.7
+#! /usr/bin/env python3
 
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.integrate as integrate
+import sampling
 
 # Written by Vasaant S/O Krishnan on Tuesday, 06 March 2018
 
@@ -58,6 +57,7 @@ offset = 1           # Distance of source from origin
 width  = 2           # Source width                (dimensionless)
 ulim   = 5           # Limit of range of baselines   (wavelengths)
 steps  = 10000
+uSteps = None          # Samples along u, None = choose from the source (see sampling.py)
 #=====================================================================
 
 
@@ -67,17 +67,26 @@ steps  = 10000
 #=====================================================================
 #     Code begins here
 #
-u    = np.linspace(ulim, -ulim, steps)                 # Baseline span
-uDeg = np.degrees(u)
-
 lUpp =  width/2. + offset
 lLow = -width/2. + offset
 l    = np.linspace(lUpp,  lLow, steps)
 
 # For each baseline, u, integrate "Re[V(u)] = I(l)*cos(2pi u  l)"  for all, l.
 # Here I(l) is the box function for the range [lUpp, lLow]:
-cosr = [(1./(np.abs(lLow-lUpp))) * integrate.quad(lambda l: np.cos(2 * np.pi * k * l/np.pi), lLow, lUpp)[0] for k in u]    # Real component
-sinr = [(1./(np.abs(lLow-lUpp))) * integrate.quad(lambda l: np.sin(2 * np.pi * k * l/np.pi), lLow, lUpp)[0] for k in u]    # Imag component
+def visibility(us):
+    import scipy.integrate as integrate          # Only needed on the quad path
+    cosr = [(1./(np.abs(lLow-lUpp))) * integrate.quad(lambda l: np.cos(2 * np.pi * k * l/np.pi), lLow, lUpp)[0] for k in us]    # Real component
+    sinr = [(1./(np.abs(lLow-lUpp))) * integrate.quad(lambda l: np.sin(2 * np.pi * k * l/np.pi), lLow, lUpp)[0] for k in us]    # Imag component
+    return np.array(cosr) + 1j*np.array(sinr)
+
+if uSteps is None:                                     # Baseline span
+    u, vis = sampling.adaptiveSample(visibility, ulim, -ulim, sampling.visibilityFreq(offset, width))
+else:
+    u   = np.linspace(ulim, -ulim, uSteps)
+    vis = visibility(u)
+uDeg = np.degrees(u)
+cosr = vis.real
+sinr = vis.imag
 
 # These compute the amp and phase manually:
 amp = [np.sqrt(i**2 + j**2) for i, j in zip(cosr, sinr)]
@@ -97,37 +106,41 @@ pha = [      np.arctan(j/i) for i, j in zip(cosr, sinr)]
 #=====================================================================
 #     Plot
 #
-fig = plt.figure()
-
-# Plot source, which is a box function
-ax1 = fig.add_subplot(131)
-ax1.fill_between(l, np.ones(len(l)), np.zeros(len(l)), color='black')
-ax1.set_xlim(-10,  10)
-ax1.set_xticks(np.arange(-10, 11, 2))
-ax1.set_ylim(  0, 1.05)
-ax1.set_xlabel('Source position and offset')
-ax1.set_title( 'Box', y=1.09)
-
-# Plot the visibility cosine and sine components
-ax2 = fig.add_subplot(132)
-ax3 = ax2.twiny()
-ax2.plot(   u, cosr, color = 'r')
-ax3.plot(uDeg, sinr, color = 'b')
-ax2.set_xlabel('Baseline (Spatial frequency)')
-ax3.set_xlabel('(degrees)')
-ax2.set_ylim(-1.1, 1.1)
-ax2.set_title( 'V(u): R$_c$ (r) and R$_s$ (b)', y=1.09)
-
-# Plot the visibility amplitude and phase
-ax4 = fig.add_subplot(133)
-ax5 = ax4.twiny()
-
-ax4.plot(   u, amp, color = 'r')
-ax5.plot(uDeg, pha, color = 'b')
-ax4.set_xlabel('Baseline (Spatial frequency)')
-ax4.set_title( 'V(u): Amp (r) and Phas (b)', y=1.09)
-ax4.set_xlim([-ulim, ulim])
-if offset == 0:
-    ax4.set_ylim(-0.1, 1.1)
-
-plt.show()
+if __name__ == '__main__':
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure()
+
+    # Plot source, which is a box function
+    ax1 = fig.add_subplot(131)
+    ax1.fill_between(l, np.ones(len(l)), np.zeros(len(l)), color='black')
+    ax1.set_xlim(-10,  10)
+    ax1.set_xticks(np.arange(-10, 11, 2))
+    ax1.set_ylim(  0, 1.05)
+    ax1.set_xlabel('Source position and offset')
+    ax1.set_title( 'Box', y=1.09)
+
+    # Plot the visibility cosine and sine components
+    ax2 = fig.add_subplot(132)
+    ax3 = ax2.twiny()
+    ax2.plot(   u, cosr, color = 'r')
+    ax3.plot(uDeg, sinr, color = 'b')
+    ax2.set_xlabel('Baseline (Spatial frequency)')
+    ax3.set_xlabel('(degrees)')
+    ax2.set_ylim(-1.1, 1.1)
+    ax2.set_title( 'V(u): R$_c$ (r) and R$_s$ (b)', y=1.09)
+
+    # Plot the visibility amplitude and phase
+    ax4 = fig.add_subplot(133)
+    ax5 = ax4.twiny()
+
+    ax4.plot(   u, amp, color = 'r')
+    ax5.plot(uDeg, pha, color = 'b')
+    ax4.set_xlabel('Baseline (Spatial frequency)')
+    ax4.set_title( 'V(u): Amp (r) and Phas (b)', y=1.09)
+    ax4.set_xlim([-ulim, ulim])
+    if offset == 0:
+        ax4.set_ylim(-0.1, 1.1)
+
+    plt.show()
+#=====================================================================
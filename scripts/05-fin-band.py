@@ -1,9 +1,9 @@
-#! /usr/bin/env python
+#! /usr/bin/env python3
 
 import sys
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.integrate as integrate
+import fringes
+import sampling
 
 # Written by Vasaant S/O Krishnan on Saturday, 28 July 2018, 15:53 pm
 #
@@ -30,7 +30,7 @@ u             = 3           # Baseline length                             (wavel
 Dnu           = 8           # Bandwidth                                            (Hz)
 nu            = 13          # Observing frequency                                  (Hz)
 field_of_view = 180         # Total range of field of view centred on zero    (degrees)
-steps         = 10000
+steps         = None        # Samples along theta, None = choose from u (see sampling.py)
 #=====================================================================
 
 
@@ -44,16 +44,20 @@ nu  = float( nu)                               # Make sure frequencies are float
 Dnu = float(Dnu)
 
 if ((1./u)/(Dnu/nu)) > 1.0:
-    print "Make (1/u) <= (Dnu/nu)"
-    print "   1/u = %.3f"%(1./u)
-    print "Dnu/nu = %.3f"%(Dnu/nu)
+    print("Make (1/u) <= (Dnu/nu)")
+    print("   1/u = %.3f"%(1./u))
+    print("Dnu/nu = %.3f"%(Dnu/nu))
     exit()
 
 fov    = field_of_view/2.0                     # FOV centred on zero (see plot for zero)
 rfov   = np.radians(fov)
 
-xaxis  = np.linspace( fov,  -fov, steps)       # Top axis in degrees
-theta  = np.linspace(rfov, -rfov, steps)       # Angular offset from perpendicular plane (radians)
+if steps is None:                              # Angular offset from perpendicular plane (radians)
+    theta = sampling.adaptiveSample(lambda x: np.sinc((Dnu/nu) * u * np.sin(x)) * np.exp(2j * np.pi * u * np.sin(x)),
+                                    rfov, -rfov, sampling.fringeFreq(u, Dnu, nu))[0]
+else:
+    theta = np.linspace(rfov, -rfov, steps)
+xaxis  = np.degrees(theta)                     # Top axis in degrees
 
 l      = np.sin(theta)                         # Directional cosine ("ell") towards source, s
 
@@ -62,18 +66,18 @@ sinr   = np.sin(2 * np.pi * u * l)             # Interferometer sine   response,
 
 sinc   = np.sinc((Dnu/nu) * u * l)             # Sinc envelope [Note that in np, sinc x = sin(pi*x)/(pi*x)]
 
-cosEnv = [i*j for i, j in zip(sinc, cosr)]     # sinc * cos
-sinEnv = [i*j for i, j in zip(sinc, sinr)]     # sinc * sin
+cosEnv = sinc*cosr                             # sinc * cos
+sinEnv = sinc*sinr                             # sinc * sin
 
 # cosEnv and sinEnv computed numerically instead:
 # cosEnv = [(1/Dnu) * integrate.quad(lambda f: np.cos(2 * np.pi * u * (1/nu) * i * f), (nu-(Dnu/2)), (nu+(Dnu/2)))[0] for i in l]
 # sinEnv = [(1/Dnu) * integrate.quad(lambda f: np.sin(2 * np.pi * u * (1/nu) * i * f), (nu-(Dnu/2)), (nu+(Dnu/2)))[0] for i in l]
 
-sinTheta  = (1./u)/(Dnu/nu)                    # Compute first null...
-firstNull = np.degrees(np.arcsin(sinTheta))
-numFringe = np.ceil(nu/Dnu)                    #... and number of fringes to that null
+null      = fringes.firstNull(u, Dnu, nu)      # Compute first null...
+firstNull = null['deg']
+numFringe = null['numFringe']                  #... and number of fringes to that null
 
-print "%.1f degrees and %d fringes to the first null."%(np.degrees(np.arcsin(sinTheta)), numFringe)
+print("%.1f degrees and %d fringes to the first null."%(firstNull, numFringe))
 #=====================================================================
 
 
@@ -83,32 +87,36 @@ print "%.1f degrees and %d fringes to the first null."%(np.degrees(np.arcsin(sin
 #=====================================================================
 #     Plotting
 #
-fig = plt.figure()
+if __name__ == '__main__':
+    import matplotlib.pyplot as plt
 
-#==================================
-#    Cosine plot params
-ax1 = fig.add_subplot(121)
-ax2 = ax1.twiny()                 # Create twin 'x' axis to show radians and degrees
+    fig = plt.figure()
 
-ax1.plot(theta, cosEnv)           # Plot sinc * cos and give x-axis radians
-ax2.plot(xaxis,   sinc, '--r', linewidth= 0.3)   # Plot sinc       and give x-axis degrees
-ax2.axvline(firstNull, color='k', alpha= 0.2)    # Plot first null on degrees' axis
+    #==================================
+    #    Cosine plot params
+    ax1 = fig.add_subplot(121)
+    ax2 = ax1.twiny()                 # Create twin 'x' axis to show radians and degrees
 
-ax1.set_title( 'sinc($\\frac{'+str(int(Dnu))+' }{'+str(int(nu))+'}$ * '+str(int(u))+' * $\ell$)) * cos(2$\pi $ * '+str(int(u))+' * $\ell$)', y = 1.09)
-ax1.set_ylabel('Response from correlator to square bandpass (Left:  R$_c$ , Right:  R$_s$)')
-ax1.set_xlabel('Angular offset from perpendicular plane (radians)')
-ax2.set_xlabel('(degrees)')
+    ax1.plot(theta, cosEnv)           # Plot sinc * cos and give x-axis radians
+    ax2.plot(xaxis,   sinc, '--r', linewidth= 0.3)   # Plot sinc       and give x-axis degrees
+    ax2.axvline(firstNull, color='k', alpha= 0.2)    # Plot first null on degrees' axis
 
-#==================================
-#    Sine plot params
-ax3 = fig.add_subplot(122)
-ax4 = ax3.twiny()                 # Create twin 'x' axis to show radians and degrees
+    ax1.set_title( 'sinc($\\frac{'+str(int(Dnu))+' }{'+str(int(nu))+'}$ * '+str(int(u))+' * $\ell$)) * cos(2$\pi $ * '+str(int(u))+' * $\ell$)', y = 1.09)
+    ax1.set_ylabel('Response from correlator to square bandpass (Left:  R$_c$ , Right:  R$_s$)')
+    ax1.set_xlabel('Angular offset from perpendicular plane (radians)')
+    ax2.set_xlabel('(degrees)')
 
-ax3.plot(theta, sinEnv)           # Plot sinc * sin and give x-axis radians
-ax4.plot(xaxis,   sinc, '--r', linewidth= 0.3)  # Plot sinc       and give x-axis degrees
-ax4.axvline(firstNull, color='k', alpha=0.3)    # Plot first null on degrees' axis
+    #==================================
+    #    Sine plot params
+    ax3 = fig.add_subplot(122)
+    ax4 = ax3.twiny()                 # Create twin 'x' axis to show radians and degrees
 
-ax4.set_title( 'sinc($\\frac{'+str(int(Dnu))+' }{'+str(int(nu))+'}$ * '+str(int(u))+' * $\ell$)) * sin(2$\pi $ * '+str(int(u))+' * $\ell$)', y = 1.09)
-ax3.get_yaxis().set_ticklabels([])
+    ax3.plot(theta, sinEnv)           # Plot sinc * sin and give x-axis radians
+    ax4.plot(xaxis,   sinc, '--r', linewidth= 0.3)  # Plot sinc       and give x-axis degrees
+    ax4.axvline(firstNull, color='k', alpha=0.3)    # Plot first null on degrees' axis
 
-plt.show()
+    ax4.set_title( 'sinc($\\frac{'+str(int(Dnu))+' }{'+str(int(nu))+'}$ * '+str(int(u))+' * $\ell$)) * sin(2$\pi $ * '+str(int(u))+' * $\ell$)', y = 1.09)
+    ax3.get_yaxis().set_ticklabels([])
+
+    plt.show()
+#=====================================================================
@@ -1,10 +1,8 @@
 #! /usr/bin/env python3
 
-import matplotlib.pyplot as plt
-from itertools import combinations
 import numpy as np
-from scipy.fftpack import fft2, ifft2, fftshift
-from mpl_toolkits.mplot3d import Axes3D
+import uvtracks
+import psfmetrics
 
 
 # 08-dirtybeam.py takes a dictionary, antArray, of antenna name
@@ -24,6 +22,11 @@ from mpl_toolkits.mplot3d import Axes3D
 hourRange = [10, 30]        # Hour angle range of observation (degrees)
 srcDec    = 85              # Source declination              (degrees)
 steps     = 500             # Resolution for loci
+uvRender  = 'scatter'       # 'scatter' each sample, or bin them into a 'density' image (see density.py)
+latitude  = None            # Site latitude (degrees); None keeps samples below the horizon
+minElevation = 0.           # Lowest source elevation kept    (degrees)
+dishDiameter = 0.           # Drop samples of shadowed antennas (0 = no shadowing)
+adaptive  = False           # Sample each baseline about once per uv cell, not steps times
 antArray  = {'A' : [ 0.05,  0.10],  # Array coordinates
              'B' : [-0.07,  0.22],
              'C' : [ 0.00,  0.42],
@@ -45,127 +48,20 @@ antArray  = {'A' : [ 0.05,  0.10],  # Array coordinates
 
 
 
-#=====================================================================
-#     Functions
-def uvDataToTMS(uvdatapoint, hourangle, declinationRadians):
-    # Perform the coordinate rotation based on Thompson, Moran &
-    # Swenson (2017) equation 4.1:
-    us = uvdatapoint[0]*np.sin(hourangle) + uvdatapoint[1]*np.cos(hourangle)
-    vs = -uvdatapoint[0]*np.cos(hourangle)*np.sin(declinationRadians) \
-         + uvdatapoint[1]*np.sin(hourangle)*np.sin(declinationRadians)
-    return [us, vs]
-#=====================================================================
-
-
-
-
-
 #=====================================================================
 #     Code begins here
 #
-# Determine all unique baselines
-baseArray = [','.join(map(str, comb)).split(',') for comb in
-             combinations(antArray.keys(), 2)]
-
-# Determine centre of array from all antennas
-numAnts = float(len(antArray))
-xAntCoords = 0
-yAntCoords = 0
-for i in antArray:
-    xAntCoords += antArray[i][0]
-    yAntCoords += antArray[i][1]
-arrayCentre = [xAntCoords/numAnts, yAntCoords/numAnts]
-#=====================================================================
-
-
-
-
-
-#=====================================================================
-#     Compute verctors and plot
-#
-fig = plt.figure()
-plt.suptitle('(x, y) to $S(u , v) \\rightarrow B(\\ell , m)$')
-plt.suptitle(
-    'Array Layout to Sampling Pattern and Dirty Beam\n $S(u , v) \\rightarrow B(\\ell , m)$')
-
-# Plot the array configuration
-ax1 = fig.add_subplot(221)
-for i in antArray:
-    ax1.scatter(antArray[i][0], antArray[i][1], c= 'k')
-ax1.set_title('Array layout')
-ax1.set_xlabel('x')
-ax1.set_ylabel('y')
-ax1.axis('equal')
-
-hourAngles = np.linspace(np.radians(abs(float(hourRange[0]))),
-                         np.radians(abs(float(hourRange[1]))), steps)
-srcDecRad  = np.radians(float(srcDec))
-
-# Create arrays for all baseline & hourAngle permutations
-numTerms = len(baseArray)*len(hourAngles)
-uvarray = np.zeros((numTerms, 2))
-
-for index, antPair in enumerate(baseArray):
-
-    # Determine coordinates in uv-plane
-    OA = [ a-b for a, b in zip(antArray[antPair[0]], arrayCentre)]    # First  antenna w.r.t centre (e.g. vec{OA})
-    OB = [ a-b for a, b in zip(antArray[antPair[1]], arrayCentre)]    # Second antenna w.r.t centre (e.g. vec{OB})
-    uv = [-x+y for x, y in zip(OA, OB)]    # vec{AB} = -OA + OB
-
-    # uv coordinate transformation
-    for hangle in np.arange(steps):
-        uvarray[hangle*index] = uvDataToTMS(uv, hourAngles[hangle], srcDecRad)
+# Baselines, uv loci, gridding and the dirty beam are computed by
+# uvtracks.psf, which needs neither matplotlib nor scipy.
+uvarray, f, F = uvtracks.psf(antArray, hourRange, srcDec, steps,
+                             latitude, minElevation, dishDiameter, adaptive)    # f = S(u, v), F = B(l, m)
 
 # Get axis limits for plot
 maxax = np.ceil(np.amax(np.abs(uvarray)))
 
-# Plot the sampling pattern, S(u, v)
-ax2 = fig.add_subplot(222)
-ax2.scatter(uvarray[:, 0], uvarray[:, 1], c= 'k', s= 0.3)
-ax2.scatter(-uvarray[:, 0], -uvarray[:, 1], c= 'k', s= 0.3)
-
-ax2.set_title('$S(u, v)$')
-ax2.set_xlabel('u')
-ax2.set_ylabel('v')
-ax2.set_ylim(-maxax, maxax)
-ax2.set_xlim(-maxax, maxax)
-ax2.axis('equal')
-#=====================================================================
-
-
-
-
-
-#=====================================================================
-#     Grid the uv and vu sampling points
-#
-numCells = np.sqrt(steps)    # Balance the gridsize by adopting the user's resolution
-pltFieldSize = int(2*maxax*numCells)    # Allow plot to range from [-maxax, maxax]
-
-# Model the sampling pattern as a surface...
-sky = np.zeros((pltFieldSize, pltFieldSize))
-# sky[ 0,  0] = TLC
-# sky[ 0, -1] = TRC
-# sky[-1,  0] = BLC
-# sky[-1, -1] = BRC
-
-# Use y=mx+c to transfrom [-maxax, maxax] --> [0, numCells]
-uvToGrid = lambda x: int((x*numCells)+(numCells*maxax))
-
-#... and toggle each uv point
-vuarray = -uvarray
-for i, j in zip(uvarray, vuarray):
-    xUVpt = uvToGrid(i[0])
-    yUVpt = uvToGrid(i[1])
-    sky[yUVpt, xUVpt] = 1
-
-    xVUpt = uvToGrid(j[0])
-    yVUpt = uvToGrid(j[1])
-    sky[yVUpt, xVUpt] = 1
-
-f = np.flip(sky, 0)    # uvToGrid does not totally work, so I must flip the axis, f = S(u, v)
-F = ifft2(f)    # Take the Inverse Fourier Transform to get B(l, m)
+# Main lobe, sidelobes and solid angle of the beam; a pixel of
+# fftshift(F) is 1/(2 maxax) in l and m
+metrics = psfmetrics.psfMetrics(np.abs(np.fft.fftshift(F)), cellSize=1/(2*maxax))
 #=====================================================================
 
 
@@ -173,19 +69,55 @@ F = ifft2(f)    # Take the Inverse Fourier Transform to get B(l, m)
 
 
 #=====================================================================
-#     Plotting in 2D
+#     Plot
 #
-# The sampling pattern, f = S(u, v)
-ax4 = fig.add_subplot(224)
-ax4.set_title('$S(u, v)$ gridded')
-ax4.imshow(f, cmap= 'binary')
-
-# The dirty beam, F = B(l, m)
-ax3 = fig.add_subplot(223)
-ax3.set_title('$B(\\ell , m)$')
-ax3.imshow(np.abs(fftshift(F)), cmap= 'binary')    # Note the fftshift
-
-plt.show()
+if __name__ == '__main__':
+    import matplotlib.pyplot as plt
+    import density
+
+    print('Beam FWHM %.4f x %.4f at PA %.1f deg, peak sidelobe %.3f, rms sidelobe %.4f'
+          %(metrics['fwhmMajor'], metrics['fwhmMinor'], metrics['positionAngle'],
+            metrics['peakSidelobe'], metrics['rmsSidelobe']))
+
+    fig = plt.figure()
+    plt.suptitle(
+        'Array Layout to Sampling Pattern and Dirty Beam\n $S(u , v) \\rightarrow B(\\ell , m)$')
+
+    # Plot the array configuration
+    ax1 = fig.add_subplot(221)
+    for i in antArray:
+        ax1.scatter(antArray[i][0], antArray[i][1], c= 'k')
+    ax1.set_title('Array layout')
+    ax1.set_xlabel('x')
+    ax1.set_ylabel('y')
+    ax1.axis('equal')
+
+    # Plot the sampling pattern, S(u, v)
+    ax2 = fig.add_subplot(222)
+    if uvRender == 'density':
+        density.densityImage(ax2, uvarray, [-maxax, maxax, -maxax, maxax])    # Includes the mirrored points
+    else:
+        ax2.scatter(uvarray[:, 0], uvarray[:, 1], c= 'k', s= 0.3)
+        ax2.scatter(-uvarray[:, 0], -uvarray[:, 1], c= 'k', s= 0.3)
+
+    ax2.set_title('$S(u, v)$')
+    ax2.set_xlabel('u')
+    ax2.set_ylabel('v')
+    ax2.set_ylim(-maxax, maxax)
+    ax2.set_xlim(-maxax, maxax)
+    ax2.axis('equal')
+
+    # The sampling pattern, f = S(u, v)
+    ax4 = fig.add_subplot(224)
+    ax4.set_title('$S(u, v)$ gridded')
+    ax4.imshow(f, cmap= 'binary')
+
+    # The dirty beam, F = B(l, m)
+    ax3 = fig.add_subplot(223)
+    ax3.set_title('$B(\\ell , m)$')
+    ax3.imshow(np.abs(np.fft.fftshift(F)), cmap= 'binary')    # Note the fftshift
+
+    plt.show()
 #=====================================================================
 
 
@@ -212,6 +144,7 @@ plt.show()
 # kx, ky = np.meshgrid(Beam_xUV, Beam_yUV, sparse=False, indexing='ij')
 
 # # The sampling pattern, f = S(u, v)
+# from mpl_toolkits.mplot3d import Axes3D
 # ax4 = fig.add_subplot(224, projection= '3d')
 # ax4.set_title('$S(u, v)$ gridded')
 # surf = ax4.plot_surface(x, y, np.abs(f), cmap= 'binary')
@@ -0,0 +1,50 @@
+#! /usr/bin/env python3
+
+import numpy as np
+
+# antarray.py turns the antArray dictionaries used throughout these
+# scripts, {name : [x, y]}, into numpy arrays of antenna coordinates
+# and baseline vectors.
+#
+# Baselines are ordered as itertools.combinations(antArray.keys(), 2)
+# orders them in 06-array2uv.py, i.e. (A, B), (A, C), ..., (B, C), ...
+# and each is vec{AB} = -OA + OB, where O is the centre of the array.
+
+
+
+
+
+#=====================================================================
+#     Functions
+def antennaCoords(antArray):
+    # Returns (names, coords) where coords is (numAnts, 2) w.r.t. the
+    # centre of the array.
+    names  = list(antArray.keys())
+    coords = np.array([antArray[i] for i in names], dtype=float)
+    return names, coords - coords.mean(axis=0)
+
+
+
+def baselinePairs(numAnts):
+    # Antenna indices (ant1, ant2) of every unique baseline
+    return np.triu_indices(numAnts, 1)
+
+
+
+def baselineVectors(coords):
+    # vec{AB} = -OA + OB for every unique baseline, shape (numBase, dim).
+    # coords may have leading axes, e.g. (numLayouts, numAnts, dim) gives
+    # (numLayouts, numBase, dim).
+    coords = np.asarray(coords, dtype=float)
+    ant1, ant2 = baselinePairs(coords.shape[-2])
+    return coords[..., ant2, :] - coords[..., ant1, :]
+
+
+
+def baselines(antArray):
+    # Returns (pairs, uv) where pairs lists the (name, name) of each
+    # baseline and uv is the (numBase, 2) array of baseline vectors.
+    names, coords = antennaCoords(antArray)
+    ant1, ant2 = baselinePairs(len(names))
+    return [(names[i], names[j]) for i, j in zip(ant1, ant2)], baselineVectors(coords)
+#=====================================================================
@@ -0,0 +1,168 @@
+#! /usr/bin/env python3
+
+import numpy as np
+import antarray
+import uvtracks
+
+# bda.py compresses simulated visibilities by baseline-dependent
+# averaging: consecutive samples of a baseline are averaged together
+# for as long as the smearing this causes stays within a bound.
+#
+# Averaging samples spread over a stretch of track along which (u, v)
+# moves by du scales the response to a source at radius l from the
+# phase centre by sinc(du l) for many samples, and by cos(pi du l) in
+# the worst case of two. Keeping the loss at fieldRadius under maxLoss
+# therefore bounds du by
+#
+#   du <= sqrt(2 maxLoss)/(pi fieldRadius)       (1 - cos(pi x) <= (pi x)^2/2)
+#
+# The distance moved comes from the analytic uv speed of the rotation in
+# uvtracks.uvDataToTMS (uvtracks.uvSpeed), integrated along each track,
+# so short baselines, which move slowly, are averaged far more than long
+# ones. Every sample's arc position is binned in one pass and each bin
+# is reduced with np.add.reduceat; nothing loops over baselines.
+#
+# Datasets are ragged as in uvtracks.adaptiveTracks: one row per sample,
+# baseline by baseline, with offsets[i]:offsets[i+1] the samples of
+# baseline i.
+
+
+
+
+
+#=====================================================================
+#     Functions
+def trackSamples(antArray, hourRange, srcDec, steps):
+    # The samples of uvtracks.uvTracks as (vectors, offsets, hourangle):
+    # the (numBase, 2) baseline vectors, the (numBase + 1,) offsets and
+    # the hour angle (radians) of every sample
+    names, coords = antarray.antennaCoords(antArray)
+    vectors = antarray.baselineVectors(coords)
+    angles  = uvtracks.hourAngles(hourRange, steps)
+    return vectors, np.arange(len(vectors) + 1)*steps, np.tile(angles, len(vectors))
+
+
+
+def baselineIndex(offsets):
+    # Baseline of every sample of a ragged dataset
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+
+def uvwSamples(vectors, offsets, hourangle, declinationRadians):
+    # (numSamples, 3) u, v, w of every sample
+    base = baselineIndex(offsets)
+    uv   = uvtracks.uvDataToTMS(vectors[base], hourangle, declinationRadians)
+    w    = uvtracks.wTMS(vectors[base], hourangle, declinationRadians)
+    return np.column_stack((uv, w))
+
+
+
+def pointSourceVis(uvw, sources):
+    # Visibilities of point sources, rows of (l, m, flux), at uvw
+    sources = np.atleast_2d(sources)
+    vis = np.zeros(len(uvw), dtype=complex)
+    for l, m, flux in sources:
+        n = np.sqrt(1. - l*l - m*m)
+        vis += flux*np.exp(-2j*np.pi*(uvw[:, 0]*l + uvw[:, 1]*m + uvw[:, 2]*(n - 1)))
+    return vis
+
+
+
+def maxDisplacement(fieldRadius, maxLoss):
+    # Largest uv distance (wavelengths) to average over
+    return np.sqrt(2*maxLoss)/(np.pi*fieldRadius)
+
+
+
+def averageBins(vectors, offsets, hourangle, declinationRadians, fieldRadius, maxLoss=0.01):
+    # (start, binOffsets): the first sample of each averaging bin and
+    # the (numBase + 1,) offsets of each baseline's bins. A bin holds
+    # the samples of one baseline whose arc position, in units of
+    # maxDisplacement, has the same integer part.
+    base  = baselineIndex(offsets)
+    if len(base) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(len(offsets), dtype=np.int64)
+    speed = uvtracks.uvSpeed(vectors[base], hourangle, declinationRadians)
+    step  = np.zeros(len(base))
+    step[1:] = 0.5*(speed[1:] + speed[:-1])*np.abs(np.diff(hourangle))
+    first = np.minimum(offsets[:-1], len(base) - 1)
+    step[first] = 0                              # Each baseline starts at arc 0
+    arc   = np.cumsum(step)
+    arc  -= np.repeat(arc[first], np.diff(offsets))
+    slot  = np.floor(arc/maxDisplacement(fieldRadius, maxLoss)).astype(np.int64)
+
+    new = np.ones(len(base), dtype=bool)
+    new[1:] = (base[1:] != base[:-1]) | (slot[1:] != slot[:-1])
+    start = np.flatnonzero(new)
+    binOffsets = np.concatenate(([0], np.cumsum(np.bincount(base[start], minlength=len(offsets) - 1))))
+    return start, binOffsets
+
+
+
+def averageVisibilities(uvw, vis, start, weight=None):
+    # Weighted means of uvw and vis over the bins beginning at start,
+    # and the summed weight of each: (uvw, vis, weight)
+    weight = np.ones(len(vis)) if weight is None else np.asarray(weight, dtype=float)
+    total  = np.add.reduceat(weight, start)
+    norm   = np.where(total > 0, total, 1.)
+    meanUVW = np.add.reduceat(uvw*weight[:, None], start, axis=0)/norm[:, None]
+    meanVis = np.add.reduceat(vis*weight, start)/norm
+    return meanUVW, meanVis, total
+
+
+
+def compress(vectors, offsets, hourangle, declinationRadians, vis, fieldRadius, maxLoss=0.01,
+             weight=None):
+    # Baseline-dependent averaging of a ragged dataset. Returns (uvw,
+    # vis, weight, offsets) of the averaged samples.
+    uvw = uvwSamples(vectors, offsets, hourangle, declinationRadians)
+    start, binOffsets = averageBins(vectors, offsets, hourangle, declinationRadians, fieldRadius, maxLoss)
+    uvw, vis, weight = averageVisibilities(uvw, vis, start, weight)
+    return uvw, vis, weight, binOffsets
+#=====================================================================
+
+
+
+
+
+#=====================================================================
+#     Code begins here
+#
+if __name__ == '__main__':
+    import time
+    import layouts
+
+    # A MeerKAT-like array: a dense core of 48 dishes within 0.5 km and
+    # 16 on arms out to 4 km, at 21 cm (coordinates in wavelengths).
+    # Sampling is set by the longest baseline, whose samples are spaced
+    # at the averaging limit.
+    scale    = 1e3/0.21
+    antArray = layouts.toAntArray(scale*layouts.coreArms(48, 0.5, 3, 6, 4., minSpacing=0.02, seed=2020),
+                                  prefix='M')
+    hourRange, srcDec = [-60, 60], -30
+    fieldRadius, maxLoss = np.radians(0.5), 0.01
+
+    decRad  = np.radians(srcDec)
+    longest = np.amax(np.hypot(*uvtracks.snapshotUV(antArray)[1].T))
+    steps   = int(np.ceil(longest*np.radians(hourRange[1] - hourRange[0])
+                          /maxDisplacement(fieldRadius, maxLoss))) + 1
+    vectors, offsets, hourangle = trackSamples(antArray, hourRange, srcDec, steps)
+    uvw     = uvwSamples(vectors, offsets, hourangle, decRad)
+    sources = [[fieldRadius, 0., 1.], [0., -fieldRadius/2, 0.5]]
+    vis     = pointSourceVis(uvw, sources)
+
+    begin = time.time()
+    avgUVW, avgVis, weight, avgOffsets = compress(vectors, offsets, hourangle, decRad, vis,
+                                                  fieldRadius, maxLoss)
+    spent = time.time() - begin
+
+    # Smearing: the averaged visibility of a source at fieldRadius
+    # against its exact value at the averaged uvw
+    start = averageBins(vectors, offsets, hourangle, decRad, fieldRadius, maxLoss)[0]
+    ratio = np.abs(averageVisibilities(uvw, pointSourceVis(uvw, sources[:1]), start)[1]) \
+            /np.abs(pointSourceVis(avgUVW, sources[:1]))
+    print("%d baselines x %d steps: %d -> %d visibilities (%.1fx) in %.2f s"
+          %(len(vectors), steps, len(vis), len(avgVis), len(vis)/float(len(avgVis)), spent))
+    print("worst amplitude loss at fieldRadius: %.5f (bound %.5f)"%(1 - ratio.min(), maxLoss))
+#=====================================================================
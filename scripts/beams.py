@@ -0,0 +1,122 @@
+#! /usr/bin/env python3
+
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+
+# beams.py models the primary beam, A(theta), of a single dish: the
+# receiver response which multiplies the fringe pattern of
+# 01-corr-resp.py and the sky seen by a synthesis image. Three power
+# patterns are available:
+#
+#     'gaussian' : exp(-theta^2 / 2 sigma^2), FWHM = 1.02 lambda/D
+#     'airy'     : (2 J1(x)/x)^2, x = pi D sin(theta)/lambda
+#     'cosn'     : cos(theta)^n, for a simple dipole-like receiver
+#
+# where lambda = c/freq and D = dishDiam, both in the same length unit
+# as c (c = 1 by default, as in correlation.py).
+#
+# evaluate() works on any theta array; lmGrid() gives theta over an
+# image, for applyBeam(). cachedBeam() is evaluate() memoised on (model,
+# freq, grid, parameters), the grid keyed on a hash of its bytes, so the
+# fringe, visibility and imaging steps can all ask for the same beam,
+# on a regular or an adaptively sampled grid, without recomputing it.
+# beam2D() is the cached pattern on lmGrid(). Cached arrays are
+# read-only.
+
+
+
+
+
+#=====================================================================
+#     Functions
+fwhmToSigma = 1./(2*np.sqrt(2*np.log(2)))
+cacheSize   = 32                   # Patterns kept by cachedBeam
+_cache      = OrderedDict()
+_cacheLock  = threading.Lock()
+
+
+
+def evaluate(model, freq, theta, dishDiam=1., c=1., sigma=None, n=1, voltage=False):
+    # Power pattern of model at freq for angles theta (radians) from
+    # the pointing centre. sigma overrides the Gaussian width (radians)
+    # and n is the power of 'cosn'. If voltage is True the voltage
+    # pattern, sqrt(A), is returned instead.
+    theta = np.asarray(theta, dtype=float)
+    lam   = c/float(freq)
+
+    if model == 'gaussian':
+        if sigma is None:
+            sigma = 1.02*lam/dishDiam*fwhmToSigma
+        pattern = np.exp(-theta**2/(2*sigma**2))
+    elif model == 'airy':
+        from scipy.special import j1
+        x = np.pi*dishDiam*np.sin(theta)/lam
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pattern = np.where(x == 0, 1., (2*j1(x)/x)**2)
+    elif model == 'cosn':
+        pattern = np.clip(np.cos(theta), 0, None)**n
+    else:
+        raise ValueError("Unknown beam model '%s'"%model)
+
+    if voltage:
+        pattern = np.sqrt(pattern)
+    return pattern
+
+
+
+def lmGrid(numPix, cellSize):
+    # (l, m) direction cosines of a numPix x numPix image with cells
+    # of cellSize, with (0, 0) at pixel [numPix//2, numPix//2] as
+    # after an fftshift. Returns (l, m, theta); theta is nan beyond
+    # the horizon, l^2 + m^2 > 1.
+    axis = (np.arange(numPix) - numPix//2)*cellSize
+    l, m = np.meshgrid(axis, axis, sparse=True)
+    r    = np.sqrt(l**2 + m**2)
+    with np.errstate(invalid='ignore'):
+        theta = np.where(r <= 1, np.arcsin(np.minimum(r, 1)), np.nan)
+    return l, m, theta
+
+
+
+def cachedBeam(model, freq, theta, **params):
+    # evaluate(model, freq, theta, **params), read-only, from an LRU
+    # cache of cacheSize patterns keyed on the bytes of theta
+    theta = np.ascontiguousarray(theta, dtype=float)
+    key   = (model, float(freq), theta.shape, hashlib.sha1(theta).hexdigest(),
+             tuple(sorted(params.items())))
+    with _cacheLock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    pattern = evaluate(model, freq, theta, **params)
+    pattern.setflags(write=False)
+    with _cacheLock:
+        _cache[key] = pattern
+        while len(_cache) > cacheSize:
+            _cache.popitem(last=False)
+    return pattern
+
+
+
+def beam2D(model, freq, numPix, cellSize, **params):
+    # Cached pattern on lmGrid(numPix, cellSize); nan beyond the horizon
+    return cachedBeam(model, freq, lmGrid(numPix, cellSize)[2], **params)
+
+
+
+def applyBeam(image, pattern, correct=False, cutoff=0.1):
+    # Taper an image by the beam pattern, or (correct=True) divide the
+    # beam out of it. Pixels where the beam is below cutoff of its peak
+    # cannot be corrected reliably and are set to zero, as are pixels
+    # beyond the horizon, where a pattern on lmGrid() is nan.
+    image = np.asarray(image)
+    if not correct:
+        return image*pattern
+    finite = np.isfinite(pattern)
+    good   = finite & (np.where(finite, pattern, 0) >= cutoff*np.nanmax(pattern))
+    out    = np.zeros(np.broadcast(image, pattern).shape, dtype=np.result_type(image, float))
+    np.divide(image, pattern, out=out, where=good)
+    return out
+#=====================================================================
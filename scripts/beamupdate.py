@@ -0,0 +1,150 @@
+#! /usr/bin/env python3
+
+import numpy as np
+import antarray
+import uvtracks
+
+# beamupdate.py keeps the dirty beam of 08-dirtybeam.py up to date
+# while single antennas are added, moved or removed, for array design
+# by hand: instead of recomputing all N(N-1)/2 baseline tracks,
+# regridding and transforming, only the N-1 baselines of the changed
+# antenna are regridded, an O(N) update.
+#
+# The grid keeps the number of samples in each uv cell, so removing a
+# baseline's samples is a subtraction. The sampling pattern S(u, v) is
+# 1 where a cell holds any sample, so only the cells which flip between
+# 0 and 1 change it. B(l, m) = ifft2(S) is linear, so it is updated by
+# the transform of that sparse delta: a direct DFT of the few changed
+# cells (an (Ny, n) x (n, Nx) product) when there are at most
+# sparseLimit of them, otherwise an FFT of the delta grid.
+#
+# The grid extent, maxax, is fixed when the object is built. A change
+# which puts samples beyond it rebuilds everything with a larger grid.
+#
+#   beam = beamupdate.IncrementalBeam(antArray, hourRange, srcDec, steps)
+#   beam.moveAntenna('O', [2.0, -1.5])
+#   beam.f, beam.F                               # As in 08-dirtybeam.py
+
+
+
+
+
+#=====================================================================
+#     Functions
+class IncrementalBeam(object):
+    def __init__(self, antArray, hourRange, srcDec, steps, maxax=None, sparseLimit=32):
+        self.hourAngles  = uvtracks.hourAngles(hourRange, steps)
+        self.decRad      = np.radians(float(srcDec))
+        self.numCells    = np.sqrt(steps)            # As in uvtracks.psf
+        self.sparseLimit = sparseLimit
+        self.antArray    = dict((k, [float(x) for x in v]) for k, v in antArray.items())
+        self.rebuild(maxax)
+
+
+    def rebuild(self, maxax=None):
+        # Grid every baseline from scratch. maxax defaults to the
+        # smallest integer enclosing all samples, as in uvtracks.psf.
+        names, coords = antarray.antennaCoords(self.antArray)
+        points = self._tracks(antarray.baselineVectors(coords))
+        if maxax is None:
+            maxax = np.ceil(np.amax(np.abs(points))) if len(points) else 1.
+        self.maxax  = maxax
+        self.size   = int(2*maxax*self.numCells)
+        self.counts = np.zeros(self.size*self.size, dtype=np.int64)
+        self._grid(points, 1)
+        self.F = uvtracks.dirtyBeam(self.f)
+
+        # Direct DFT phasors, e^{2 pi i k p/N}/N, for sparse updates
+        k = np.arange(self.size)
+        self._phasor = np.exp(2j*np.pi*np.outer(k, k)/self.size)/self.size
+
+
+    @property
+    def f(self):
+        # The gridded sampling pattern S(u, v), flipped as in 08-dirtybeam.py
+        return np.flip((self.counts > 0).reshape(self.size, self.size).astype(float), 0)
+
+
+    def _tracks(self, vectors):
+        # uv samples (numBase*steps, 2) of baseline vectors; gridded
+        # with their conjugates
+        return uvtracks.uvDataToTMS(np.asarray(vectors, dtype=float)[:, None, :],
+                                    self.hourAngles[None, :], self.decRad).reshape(-1, 2)
+
+
+    def _cells(self, points):
+        # Flat cell index of points and their conjugates, or None if any
+        # lies beyond the grid
+        pts = np.concatenate((points, -points))
+        if len(pts) and np.amax(np.abs(pts)) > self.maxax:
+            return None
+        idx = np.clip((pts*self.numCells + self.numCells*self.maxax).astype(np.int64), 0, self.size - 1)
+        return idx[:, 1]*self.size + idx[:, 0]
+
+
+    def _grid(self, points, sign):
+        cells = self._cells(points)
+        self.counts += sign*np.bincount(cells, minlength=self.counts.size)
+
+
+    def _antennaPoints(self, name, xy):
+        # Samples of the baselines between an antenna at xy and every
+        # other antenna (excluding name itself)
+        others = np.array([v for k, v in self.antArray.items() if k != name], dtype=float)
+        if len(others) == 0:
+            return np.zeros((0, 2))
+        return self._tracks(others - np.asarray(xy, dtype=float))
+
+
+    def _update(self, remove, add):
+        # Apply the removal and addition of samples; returns the number
+        # of cells of S(u, v) which changed (-1 for a full rebuild).
+        addCells = self._cells(add)
+        if addCells is None:
+            self.rebuild()
+            return -1
+        remCells = self._cells(remove)
+
+        touched = np.unique(np.concatenate((remCells, addCells)))
+        before  = self.counts[touched] > 0
+        for cells, sign in ((remCells, -1), (addCells, 1)):
+            cells, num = np.unique(cells, return_counts=True)
+            self.counts[cells] += sign*num
+        delta   = (self.counts[touched] > 0).astype(float) - before
+        changed = touched[delta != 0]
+        delta   = delta[delta != 0]
+        if len(changed) == 0:
+            return 0
+
+        rows = self.size - 1 - changed//self.size    # Row of the flipped grid
+        cols = changed % self.size
+        if len(changed) <= self.sparseLimit:
+            self.F += (self._phasor[:, rows]*delta).dot(self._phasor[cols, :])
+        else:
+            d = np.zeros((self.size, self.size))
+            d[rows, cols] = delta
+            self.F += uvtracks.dirtyBeam(d)
+        return len(changed)
+
+
+    def addAntenna(self, name, xy):
+        if name in self.antArray:
+            raise ValueError('Antenna %s already exists'%name)
+        xy = [float(x) for x in xy]
+        self.antArray[name] = xy                 # Before a possible rebuild
+        return self._update(np.zeros((0, 2)), self._antennaPoints(name, xy))
+
+
+    def removeAntenna(self, name):
+        xy = self.antArray[name]
+        changed = self._update(self._antennaPoints(name, xy), np.zeros((0, 2)))
+        del self.antArray[name]
+        return changed
+
+
+    def moveAntenna(self, name, xy):
+        old = self.antArray[name]
+        xy  = [float(x) for x in xy]
+        self.antArray[name] = xy                 # Before a possible rebuild
+        return self._update(self._antennaPoints(name, old), self._antennaPoints(name, xy))
+#=====================================================================
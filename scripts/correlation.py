@@ -1,7 +1,8 @@
-#! /usr/bin/env python
+#! /usr/bin/env python3
 
-import matplotlib.pyplot as plt
 import numpy as np
+import delaytrack
+import noisegen
 
 # Written by Vasaant S/O Krishnan on Tuesday, 21 August 2018
 
@@ -18,6 +19,10 @@ nu            = 5           # Centre freq.
 signal        = 6000        # Signal duration                                     (sec)
 field_of_view = 180         # Total range of field of view centred on zero    (degrees)
 steps         = 2000
+sampleRate    = 20          # Sample rate of the delay tracked pair (> 2 nu)        (Hz)
+blockLen      = 64          # Samples per FFT block for delay tracking
+numBlocks     = 400         # Blocks in the delay tracked pair
+seed          = 2018        # Seed for the white noise (see noisegen.py)
 #=====================================================================
 
 
@@ -38,27 +43,55 @@ c     = 1                                  # Speed of light
 tau_G = u*l*1/c
 
 t   = np.linspace(signal, -signal, steps)
-wn  = np.random.normal(0, 1, t.shape)      # White noise
+sky = noisegen.spawnStreams(seed, 1, 2)[0][0]
+wn  = sky.standard_normal(t.shape)         # White noise, common to both antennas
 
 v1  = wn + np.cos( w* t)
-v2  = wn + np.cos([w*(i-j) for i, j in zip(t, tau_G)])
+v2  = wn + np.cos(w*(t - tau_G))
 
 vv  = (1./signal)*np.correlate(v1, v2, mode= 'same')
 
-plt.subplot(211)
-plt.plot(t, v1, c='b', alpha=0.6, label='v1')
-v2 = [10+i for i in v2]
-plt.plot(t, v2, c='g', alpha=0.6, label='v2')
-plt.xlim([-signal/3,signal/3])
-plt.legend()
+# Compensate tau_G, tracked block by block, on a pair sampled above
+# the Nyquist rate of nu (v1 and v2 above are not) as the source drifts
+# across the same field of view. Only the signal was delayed, so only
+# the signal of antenna 2 is compensated; the common noise is not.
+ts    = np.arange(numBlocks*blockLen)/float(sampleRate)
+tauTs = u*np.sin(np.linspace(rfov, -rfov, len(ts)))/c
+wnTs  = sky.standard_normal(ts.shape)
+s1    = np.cos(w*ts)
+s2    = np.cos(w*(ts - tauTs))
+s2c   = delaytrack.delayCompensate(s2, tauTs[None, blockLen//2::blockLen], sampleRate, blockLen)[0]
+
+corr  = lambda a, b: np.corrcoef(a, b)[0, 1]
+print("Correlation coefficient      raw   delay tracked")
+print("  signal only            %6.3f   %6.3f"%(corr(s1, s2), corr(s1, s2c)))
+print("  signal + common noise  %6.3f   %6.3f"%(corr(wnTs + s1, wnTs + s2), corr(wnTs + s1, wnTs + s2c)))
+#=====================================================================
+
+
 
-plt.subplot(212)
-plt.plot(  t, vv, color='k', label='<vv>')
-plt.xcorr(v1, v2, color='r')               # Built-in cross correlation plotter
-plt.xlim([-signal/3,signal/3])
-plt.legend()
 
-plt.show()
+
+#=====================================================================
+#     Plot
+#
+if __name__ == '__main__':
+    import matplotlib.pyplot as plt
+
+    plt.subplot(211)
+    plt.plot(t, v1, c='b', alpha=0.6, label='v1')
+    v2 = [10+i for i in v2]
+    plt.plot(t, v2, c='g', alpha=0.6, label='v2')
+    plt.xlim([-signal/3,signal/3])
+    plt.legend()
+
+    plt.subplot(212)
+    plt.plot(  t, vv, color='k', label='<vv>')
+    plt.xcorr(v1, v2, color='r')               # Built-in cross correlation plotter
+    plt.xlim([-signal/3,signal/3])
+    plt.legend()
+
+    plt.show()
 #=====================================================================
 
 
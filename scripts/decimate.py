@@ -0,0 +1,152 @@
+#! /usr/bin/env python3
+
+import numpy as np
+
+# decimate.py thins out the line and polygon data of a figure to the
+# resolution it will be drawn at, so that e.g. 10,000 points per curve
+# do not all end up in the .eps files in Figs/.
+#
+# Points are first mapped to device coordinates (pixels at the output
+# dpi), so polar and log axes are handled like any other. Then:
+#
+#   'minmax' : (default) of each run of consecutive points within one
+#              pixel column, keep the first, lowest, highest and last
+#              point, or only the first if the run is under a pixel
+#              tall. The drawn envelope is unchanged, for lines and
+#              polygons alike.
+#   'lttb'   : largest-triangle-three-buckets, keeping one point per
+#              bucket, the one which spans the largest triangle with
+#              its neighbours. Fewer points, but narrow peaks between
+#              buckets can be clipped.
+#
+# decimateFigure(fig) applies this to every Line2D, Polygon and
+# PolyCollection of a figure just before plt.savefig.
+
+
+
+
+
+#=====================================================================
+#     Functions
+def minMaxIndices(px, py):
+    # Indices to keep of a path in pixel coordinates. Consecutive
+    # points in the same pixel column form a group; a group spanning a
+    # pixel or more in y keeps its first, lowest, highest and last
+    # point, in their original order, any other group just its first.
+    # The last point of the path is always kept.
+    n = len(px)
+    if n <= 4:
+        return np.arange(n)
+    col    = np.floor(px).astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, col[1:] != col[:-1]])
+    ends   = np.r_[starts[1:], n] - 1
+    group  = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))
+
+    order  = np.lexsort((py, group))             # Sorted by y within each group
+    lo, hi = order[starts], order[ends]          # Groups are contiguous, so the bounds carry over
+    tall   = py[hi] - py[lo] >= 1.
+    keep   = np.concatenate(([n-1], starts, ends[tall], lo[tall], hi[tall]))
+    return np.unique(keep)
+
+
+
+def lttbIndices(px, py, numOut):
+    # Largest-triangle-three-buckets: indices of numOut points of the
+    # path (px, py), always keeping the first and last point.
+    n = len(px)
+    if numOut >= n or numOut < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, numOut - 1).astype(np.int64)   # numOut-2 buckets over the interior
+    # Mean of each bucket (the "third" point of the triangle)
+    cx = np.add.reduceat(px[1:n-1], edges[:-1] - 1)/np.diff(edges)
+    cy = np.add.reduceat(py[1:n-1], edges[:-1] - 1)/np.diff(edges)
+    cx = np.r_[cx, px[-1]]
+    cy = np.r_[cy, py[-1]]
+
+    keep = np.empty(numOut, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for b in range(numOut - 2):
+        lo, hi = edges[b], edges[b+1]
+        area   = np.abs((px[a] - cx[b+1])*(py[lo:hi] - py[a])
+                        - (px[a] - px[lo:hi])*(cy[b+1] - py[a]))
+        a = lo + int(np.argmax(area))
+        keep[b+1] = a
+    return keep
+
+
+
+def decimateIndices(px, py, method='minmax', pixels=None):
+    # Indices to keep of a path in pixel coordinates. pixels is the
+    # number of points kept by 'lttb'; by default one per pixel of the
+    # path's largest extent.
+    px, py = np.asarray(px, dtype=float), np.asarray(py, dtype=float)
+    finite = np.isfinite(px) & np.isfinite(py)
+    if not finite.all():                         # Keep gaps (nan) as they are
+        idx  = np.flatnonzero(finite)
+        runs = np.split(idx, np.flatnonzero(np.diff(idx) > 1) + 1)
+        keep = [r[decimateIndices(px[r], py[r], method, pixels)] for r in runs if len(r)]
+        gaps = np.flatnonzero(~finite)
+        return np.sort(np.concatenate(keep + [gaps]))
+
+    if method == 'minmax':
+        return minMaxIndices(px, py)
+    if pixels is None:
+        pixels = int(np.ceil(max(np.ptp(px), np.ptp(py)))) + 2
+    return lttbIndices(px, py, pixels)
+
+
+
+def _toPixels(xy, transform, scale):
+    return transform.transform(xy)*scale
+
+
+
+def decimateFigure(fig, method='minmax', dpi=None, minPoints=500):
+    # Replace the data of every line and polygon in fig with its
+    # decimated version at the given output dpi (default: fig.dpi).
+    # Artists with fewer than minPoints points are left alone. Returns
+    # (pointsBefore, pointsAfter).
+    from matplotlib.lines import Line2D
+    from matplotlib.patches import Polygon
+    from matplotlib.collections import PolyCollection
+
+    fig.canvas.draw()                            # Fix the layout (and transforms) first
+    scale  = (dpi or fig.dpi)/float(fig.dpi)
+    before = after = 0
+
+    for artist in fig.findobj(lambda a: isinstance(a, (Line2D, Polygon, PolyCollection))):
+        if isinstance(artist, Line2D):
+            x, y = (np.asarray(artist.get_xdata(), dtype=float),
+                    np.asarray(artist.get_ydata(), dtype=float))
+            before += len(x)
+            if len(x) >= minPoints:
+                p    = _toPixels(np.column_stack((x, y)), artist.get_transform(), scale)
+                keep = decimateIndices(p[:, 0], p[:, 1], method)
+                artist.set_data(x[keep], y[keep])
+                x = x[keep]
+            after += len(x)
+
+        elif isinstance(artist, Polygon):
+            xy = artist.get_xy()
+            before += len(xy)
+            if len(xy) >= minPoints:
+                p  = _toPixels(xy, artist.get_transform(), scale)
+                xy = xy[decimateIndices(p[:, 0], p[:, 1], method)]
+                artist.set_xy(xy)
+            after += len(xy)
+
+        else:
+            paths = []
+            for path in artist.get_paths():
+                v = path.vertices
+                before += len(v)
+                if len(v) >= minPoints:
+                    p = _toPixels(v, artist.get_transform(), scale)
+                    v = v[decimateIndices(p[:, 0], p[:, 1], method)]
+                after += len(v)
+                paths.append(v)
+            artist.set_verts(paths)
+    return before, after
+#=====================================================================
@@ -0,0 +1,200 @@
+#! /usr/bin/env python3
+
+import numpy as np
+
+# delaytrack.py compensates the geometric delay, tau_G, between the
+# antennas of an interferometer before their voltages are correlated.
+#
+# A delay is split into a whole number of samples, which is removed by
+# reading each antenna's voltage stream that many samples later, and a
+# fractional remainder, which is removed as a phase ramp across the
+# FFT of each block of samples:
+#
+#     v(t) = s(t - tau)  -->  V(f) exp(+2pi i f tau) = S(f)
+#
+# Fringe stopping removes the phase 2pi nu_LO tau_G which remains on
+# baseband (down-converted) voltages after the delay is compensated.
+# Everything is vectorised across antennas, blocks and channels, so a
+# whole stream is processed with a handful of array operations.
+
+
+
+
+
+#=====================================================================
+#     Functions
+def geometricDelays(antCoords, directions, c=1.):
+    # tau_G = (b . s)/c for each antenna w.r.t. the array origin.
+    #   antCoords  : (nAnt, 2) antenna (x, y) coordinates
+    #   directions : (nBlocks, 2) direction cosines (l, m), one per
+    #                block, or a single (l, m) pair
+    # Returns delays of shape (nAnt, nBlocks).
+    antCoords  = np.atleast_2d(np.asarray(antCoords,  dtype=float))
+    directions = np.atleast_2d(np.asarray(directions, dtype=float))
+    return antCoords.dot(directions.T)/c
+
+
+
+def splitDelay(delays, sampleRate):
+    # Split delays (sec) into whole samples and the fractional
+    # remainder (sec), which lies within half a sample of zero.
+    samples = np.asarray(delays, dtype=float)*sampleRate
+    whole   = np.rint(samples).astype(np.int64)
+    return whole, (samples - whole)/sampleRate
+
+
+
+def shiftBlocks(voltages, wholeDelays, blockLen, nBlocks, start=0):
+    # Cut voltages (nAnt, nSamples) into blocks (nAnt, nBlocks, blockLen)
+    # where block b of antenna a begins at sample
+    #     start + b*blockLen + wholeDelays[a, b]
+    # Samples which fall outside the stream are zero.
+    nAnt, nSamples = voltages.shape
+    k   = np.arange(nBlocks*blockLen).reshape(nBlocks, blockLen)
+    idx = start + k[None] + np.broadcast_to(wholeDelays, (nAnt, nBlocks))[..., None]
+
+    valid  = (idx >= 0) & (idx < nSamples)
+    idx    = np.clip(idx, 0, nSamples-1).reshape(nAnt, -1)
+    blocks = np.take_along_axis(voltages, idx, axis=1).reshape(nAnt, nBlocks, blockLen)
+    blocks[~valid] = 0
+    return blocks
+
+
+
+def compensateBlocks(blocks, wholeDelays, fracDelays, sampleRate, loFreq=0., spectra=False):
+    # Apply the fractional delay and fringe stopping to blocks which
+    # have already been shifted by wholeDelays (see shiftBlocks).
+    # Real voltages use the real FFT, complex (baseband) voltages the
+    # full FFT. If spectra is True the corrected spectra of shape
+    # (nAnt, nBlocks, nChan) are returned instead of time series.
+    blockLen = blocks.shape[-1]
+    if np.iscomplexobj(blocks):
+        spec  = np.fft.fft(blocks, axis=-1)
+        freqs = np.fft.fftfreq(blockLen, 1./sampleRate)
+    else:
+        spec  = np.fft.rfft(blocks, axis=-1)
+        freqs = np.fft.rfftfreq(blockLen, 1./sampleRate)
+
+    fracDelays = np.broadcast_to(fracDelays, blocks.shape[:-1])
+    phase = freqs*fracDelays[..., None]                           # Fractional delay ramp
+    if loFreq:
+        totDelays = wholeDelays/float(sampleRate) + fracDelays     # Fringe stopping uses the full tau_G
+        phase = phase + loFreq*np.broadcast_to(totDelays, blocks.shape[:-1])[..., None]
+    spec = spec*np.exp(2j*np.pi*phase).astype(spec.dtype)
+
+    if spectra:
+        return spec
+    if np.iscomplexobj(blocks):
+        return np.fft.ifft(spec, axis=-1).astype(blocks.dtype)
+    return np.fft.irfft(spec, n=blockLen, axis=-1).astype(blocks.dtype)
+
+
+
+def delayCompensate(voltages, delays, sampleRate, blockLen, loFreq=0., spectra=False):
+    # Remove the delays from a whole stream at once.
+    #   voltages : (nAnt, nSamples) real or complex voltages
+    #   delays   : (nAnt,) fixed delays or (nAnt, nBlocks) tracked delays (sec)
+    # Returns (nAnt, nBlocks*blockLen) compensated voltages, or the
+    # (nAnt, nBlocks, nChan) spectra if spectra is True. Any trailing
+    # partial block is dropped.
+    voltages = np.atleast_2d(np.asarray(voltages))
+    nAnt, nSamples = voltages.shape
+    nBlocks = nSamples//blockLen
+
+    delays = np.broadcast_to(np.asarray(delays, dtype=float).reshape(nAnt, -1), (nAnt, nBlocks))
+    whole, frac = splitDelay(delays, sampleRate)
+
+    blocks = shiftBlocks(voltages, whole, blockLen, nBlocks)
+    out    = compensateBlocks(blocks, whole, frac, sampleRate, loFreq, spectra)
+    if spectra:
+        return out
+    return out.reshape(nAnt, nBlocks*blockLen)
+
+
+
+def _trackBlocks(buf, bufStart, nextBlk, nBlocks, delayFunc, sampleRate, blockLen, maxLag,
+                 loFreq, spectra):
+    # Compensate the nBlocks blocks of buf beginning at absolute sample
+    # nextBlk (see trackStream)
+    blkStarts = nextBlk + blockLen*np.arange(nBlocks)
+    delays    = np.asarray(delayFunc((blkStarts + 0.5*blockLen)/float(sampleRate)), dtype=float)
+    delays    = np.broadcast_to(delays.reshape(buf.shape[0], -1), (buf.shape[0], nBlocks))
+    whole, frac = splitDelay(delays, sampleRate)
+    whole = np.clip(whole, -maxLag, maxLag)
+
+    blocks = shiftBlocks(buf, whole, blockLen, nBlocks, start=nextBlk-bufStart)
+    out    = compensateBlocks(blocks, whole, frac, sampleRate, loFreq, spectra)
+    return out if spectra else out.reshape(buf.shape[0], -1)
+
+
+
+def trackStream(chunks, delayFunc, sampleRate, blockLen, maxLag, loFreq=0., spectra=False):
+    # Generator which delay tracks an unbounded stream of voltages.
+    #   chunks    : iterable of (nAnt, n) voltage arrays, n arbitrary
+    #   delayFunc : callable taking the block centre times (nBlocks,)
+    #               in sec and returning delays (nAnt, nBlocks) in sec
+    #   maxLag    : largest whole-sample shift, in samples, to support
+    # Yields compensated (nAnt, nBlocks*blockLen) voltages (or spectra)
+    # for every block which can be completed. maxLag samples of history
+    # and look-ahead are buffered so shifts cross chunk edges. When a
+    # finite stream ends, the samples still buffered are flushed as
+    # blocks zero-padded past the end, and the voltages trimmed so the
+    # output is exactly as long as the input.
+    buf      = None
+    bufStart = -maxLag        # Absolute index of buf[:, 0]; the stream is zero before t = 0
+    nextBlk  = 0              # Absolute index of the next block to emit
+    params   = (delayFunc, sampleRate, blockLen, maxLag, loFreq, spectra)
+
+    for chunk in chunks:
+        chunk = np.atleast_2d(np.asarray(chunk))
+        if buf is None:
+            buf = np.zeros((chunk.shape[0], maxLag), dtype=chunk.dtype)
+        buf = np.concatenate((buf, chunk), axis=1)
+
+        bufEnd  = bufStart + buf.shape[1]
+        nBlocks = (bufEnd - maxLag - nextBlk)//blockLen
+        if nBlocks <= 0:
+            continue
+        yield _trackBlocks(buf, bufStart, nextBlk, nBlocks, *params)
+
+        # Keep only the history needed by the next block
+        nextBlk += nBlocks*blockLen
+        drop     = nextBlk - maxLag - bufStart
+        buf      = buf[:, drop:]
+        bufStart += drop
+
+    if buf is None:
+        return
+    remain = bufStart + buf.shape[1] - nextBlk        # Samples not yet emitted
+    if remain <= 0:
+        return
+    nBlocks = -(-remain//blockLen)
+    pad = np.zeros((buf.shape[0], nBlocks*blockLen - remain + maxLag), dtype=buf.dtype)
+    out = _trackBlocks(np.concatenate((buf, pad), axis=1), bufStart, nextBlk, nBlocks, *params)
+    yield out if spectra else out[:, :remain]
+#=====================================================================
+
+
+
+
+
+#=====================================================================
+#     Code begins here
+#
+if __name__ == '__main__':
+    # A finite stream in uneven chunks: every sample comes out, and the
+    # whole blocks match delayCompensate of the stream at once
+    rng        = np.random.default_rng(2020)
+    sampleRate = 1e3
+    blockLen   = 64
+    voltages   = rng.normal(size=(3, 10*blockLen + 37))
+    delays     = np.array([0., 3.4e-3, -7.8e-3])
+    edges      = np.cumsum(rng.integers(1, 3*blockLen, 20))
+    chunks     = np.split(voltages, edges[edges < voltages.shape[1]], axis=1)
+
+    out = np.concatenate(list(trackStream(chunks, lambda t: np.repeat(delays[:, None], len(t), 1),
+                                          sampleRate, blockLen, maxLag=16)), axis=1)
+    whole = delayCompensate(voltages, delays, sampleRate, blockLen)
+    print("%d samples in, %d out"%(voltages.shape[1], out.shape[1]))
+    print("whole blocks match delayCompensate:", np.allclose(out[:, :whole.shape[1]], whole))
+#=====================================================================
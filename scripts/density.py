@@ -0,0 +1,80 @@
+#! /usr/bin/env python3
+
+import numpy as np
+
+# density.py draws uv coverage as a 2-D histogram instead of one
+# ax.scatter marker per sample, as 07-array2uv-loci.py and
+# 08-dirtybeam.py do. Samples are binned at the screen resolution of
+# the axes with np.bincount, a chunk at a time so memory stays bounded,
+# and the counts are shown with imshow. The cost is linear in the
+# number of samples and the output is one image, however many there
+# are: 10^8 samples take seconds rather than minutes.
+
+
+
+
+
+#=====================================================================
+#     Functions
+def binIndex(u, v, extent, shape):
+    # Flat pixel index of each (u, v) sample in a shape = (ny, nx) grid
+    # spanning extent = [uMin, uMax, vMin, vMax], and a mask of the
+    # samples inside it.
+    ny, nx = shape
+    ix = np.floor((u - extent[0])*(nx/float(extent[1] - extent[0]))).astype(np.int64)
+    iy = np.floor((v - extent[2])*(ny/float(extent[3] - extent[2]))).astype(np.int64)
+    inside = (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny)
+    return iy*nx + ix, inside
+
+
+
+def densityGrid(chunks, extent, shape, mirror=True, chunkLen=1<<22):
+    # Counts of uv samples per pixel, shape (ny, nx), row 0 at vMin.
+    #   chunks : a (numSamples, 2) array, or an iterable of them (e.g. a
+    #            generator which never holds all samples at once)
+    #   mirror : also count the conjugate samples (-u, -v)
+    # Arrays are processed chunkLen samples at a time.
+    if isinstance(chunks, np.ndarray):
+        arr    = chunks
+        chunks = (arr[i:i+chunkLen] for i in range(0, len(arr), chunkLen))
+
+    # On a grid symmetric about the origin the conjugate samples land in
+    # the point-reflected pixel, so they are added by flipping the grid
+    symmetric = extent[0] == -extent[1] and extent[2] == -extent[3]
+
+    counts = np.zeros(shape[0]*shape[1], dtype=np.int64)
+    for chunk in chunks:
+        chunk = np.asarray(chunk)
+        for sign in ((1, -1) if mirror and not symmetric else (1,)):
+            idx, inside = binIndex(sign*chunk[:, 0], sign*chunk[:, 1], extent, shape)
+            counts += np.bincount(idx[inside], minlength=counts.size)
+    counts = counts.reshape(shape)
+    if mirror and symmetric:
+        counts = counts + counts[::-1, ::-1]
+    return counts
+
+
+
+def axesPixels(ax, dpi=None):
+    # (ny, nx) size of ax in pixels at dpi (default: the figure's)
+    fig = ax.figure
+    bbox = ax.get_window_extent().transformed(fig.dpi_scale_trans.inverted())
+    dpi  = dpi or fig.dpi
+    return max(1, int(round(bbox.height*dpi))), max(1, int(round(bbox.width*dpi)))
+
+
+
+def densityImage(ax, chunks, extent, mirror=True, shape=None, log=True, cmap='binary', **kwargs):
+    # Bin uv samples at the resolution of ax and show them with imshow.
+    # extent = [uMin, uMax, vMin, vMax]. With log=True counts are shown
+    # as log(1 + counts), so sparse tracks stay visible next to dense
+    # ones. Returns the AxesImage.
+    if shape is None:
+        ax.figure.canvas.draw()
+        ny, nx = axesPixels(ax)
+        shape  = (ny, nx)
+    counts = densityGrid(chunks, extent, shape, mirror)
+    image  = np.log1p(counts) if log else counts
+    return ax.imshow(image, origin='lower', extent=extent, cmap=cmap,
+                     interpolation='nearest', aspect='auto', **kwargs)
+#=====================================================================
@@ -0,0 +1,250 @@
+#! /usr/bin/env python3
+
+import os
+import sys
+import ast
+import json
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+# driver.py runs any of the scripts in this directory with its "User
+# variables" replaced, from the command line or from a batch file of
+# many runs, in one warm process instead of editing the script and
+# starting Python again for every variation:
+#
+#   -->$ driver.py dirtybeam --set srcDec=45 --set steps=1000 --figure beam.pdf
+#   -->$ driver.py fin-band --set u=30 --save l,cosEnv --output fin.npz
+#   -->$ driver.py --batch runs.toml --jobs 4
+#
+# A batch file (.json or .toml) holds a list of runs, each a table of
+#   script    : short name (see scripts below) or file name
+#   overrides : {variable : value} replacing the script's User variables
+#   args      : the script's command-line options, e.g. ['rect', 'print']
+#   save      : names of variables to write to output (.npz)
+#   output    : .npz file for save
+#   figure    : file to save the figure(s) to (else nothing is plotted
+#               by scripts which only plot when run as __main__)
+# e.g. in TOML
+#   [[run]]
+#   script    = "dirtybeam"
+#   overrides = {srcDec = 45, hourRange = [-30, 30]}
+#   figure    = "beam-45.pdf"
+#
+# Each script runs up to the end of its User variables block, the
+# overrides are applied, and the rest of the script runs in the same
+# namespace. Modules, caches (beams.py, pfb.py) and memoised
+# results (visibility.py) stay loaded between runs; with --jobs N the
+# runs are split over N such worker processes.
+
+
+
+
+
+#=====================================================================
+#     User variables
+#
+scripts = {'corr-resp'   : '01-corr-resp.py',
+           'vis-plot'    : '02-vis-plot.py',
+           'dirac-vis'   : '03-dirac-vis.py',
+           'box-vis'     : '04-box-vis.py',
+           'gauss-vis'   : '04-gauss-vis.py',
+           '2gauss-vis'  : '04-2gauss-vis.py',
+           'fin-band'    : '05-fin-band.py',
+           'array2uv'    : '06-array2uv.py',
+           'loci'        : '07-array2uv-loci.py',
+           'dirtybeam'   : '08-dirtybeam.py',
+           'correlation' : 'correlation.py'}
+#=====================================================================
+
+
+
+
+
+#=====================================================================
+#     Functions
+scriptsDir = os.path.dirname(os.path.abspath(__file__))
+
+
+
+def scriptPath(name):
+    path = os.path.join(scriptsDir, scripts.get(name, name))
+    if not os.path.exists(path):
+        raise ValueError('Unknown script %s, expected one of: %s'%(name, ', '.join(sorted(scripts))))
+    return path
+
+
+
+def splitScript(path):
+    # (head, tail, names): the source up to the end of the User
+    # variables block, the rest of it (padded with blank lines so that
+    # tracebacks keep the script's line numbers) and the names assigned
+    # in the block.
+    with open(path) as f:
+        lines = f.readlines()
+    start = next((i for i, line in enumerate(lines) if line.startswith('#     User variables')), None)
+    if start is None:
+        raise ValueError('%s has no User variables block'%os.path.basename(path))
+    end  = next(i for i in range(start + 1, len(lines)) if lines[i].startswith('#====='))
+    head = ''.join(lines[:end])
+    tail = '\n'*end + ''.join(lines[end:])
+
+    names = set()
+    for node in ast.parse(''.join(lines[start:end])).body:
+        if isinstance(node, ast.Assign):
+            names.update(t.id for t in node.targets if isinstance(t, ast.Name))
+    return head, tail, names
+
+
+
+def runScript(script, overrides=None, args=(), save=(), output=None, figure=None):
+    # Run one script with its User variables replaced by overrides.
+    # Returns the script's variables named in save, and writes them to
+    # output (.npz) and the figure(s) to figure, if given.
+    import numpy as np
+    if scriptsDir not in sys.path:
+        sys.path.insert(0, scriptsDir)
+    path = scriptPath(script)
+    head, tail, names = splitScript(path)
+    unknown = sorted(k for k in (overrides or {}) if k not in names)
+    if unknown:
+        raise ValueError('%s has no User variable(s) %s; it has %s'
+                         %(os.path.basename(path), ', '.join(unknown), ', '.join(sorted(names))))
+
+    runName = '__main__' if figure else '__driver__'
+    env     = {'__name__' : runName, '__file__' : path}
+    argv, sys.argv = sys.argv, [path] + list(args)
+    try:
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', message='.*non-interactive.*')    # plt.show() under Agg
+            try:
+                exec(compile(head, path, 'exec'), env)
+                env.update(overrides or {})
+                exec(compile(tail, path, 'exec'), env)
+            except SystemExit as err:                  # e.g. exit() on bad User variables
+                raise RuntimeError('%s exited early (status %r)'%(os.path.basename(path), err.code))
+
+        if figure and 'matplotlib.pyplot' in sys.modules:
+            saveFigures(figure)
+    finally:
+        sys.argv = argv
+        if 'matplotlib.pyplot' in sys.modules:
+            sys.modules['matplotlib.pyplot'].close('all')
+
+    missing = [k for k in save if k not in env]
+    if missing:
+        raise ValueError('%s defines no %s'%(os.path.basename(path), ', '.join(missing)))
+    result = dict((k, env[k]) for k in save)
+    if output:
+        np.savez(output, **dict((k, np.asarray(v)) for k, v in result.items()))
+    return result
+
+
+
+def saveFigures(figure):
+    # Save every open figure; figure-2.pdf, figure-3.pdf, ... if there
+    # are several
+    import matplotlib.pyplot as plt
+    root, ext = os.path.splitext(figure)
+    for i, num in enumerate(plt.get_fignums()):
+        plt.figure(num).savefig(figure if i == 0 else '%s-%d%s'%(root, i + 1, ext))
+
+
+
+def loadBatch(fname):
+    # List of runs from a .json file (a list, or {"run" : [...]}) or a
+    # .toml file ([[run]] tables)
+    if fname.endswith('.toml'):
+        import tomllib
+        with open(fname, 'rb') as f:
+            batch = tomllib.load(f)
+    else:
+        with open(fname) as f:
+            batch = json.load(f)
+    return batch['run'] if isinstance(batch, dict) else batch
+
+
+
+def _runAll(runs):
+    # Worker: run a share of the batch in one process. Errors, and
+    # scripts which call exit(), are reported per run rather than
+    # ending the batch.
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    done = []
+    for index, run in runs:
+        try:
+            runScript(**run)
+            done.append((index, None))
+        except Exception as err:
+            done.append((index, '%s: %s'%(type(err).__name__, err)))
+    return done
+
+
+
+def runBatch(runs, jobs=1):
+    # Run every run of a batch, in this process or split round-robin
+    # over jobs worker processes. Returns one error message (or None)
+    # per run.
+    indexed = list(enumerate(runs))
+    if jobs <= 1:
+        done = _runAll(indexed)
+    else:
+        shares = [indexed[i::jobs] for i in range(jobs)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            done = [d for share in pool.map(_runAll, shares) for d in share]
+    return [err for index, err in sorted(done)]
+
+
+
+def _value(text):
+    # Command-line values are Python literals; anything else is a string
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+#=====================================================================
+
+
+
+
+
+#=====================================================================
+#     Code begins here
+#
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Run the scripts with other User variables.')
+    parser.add_argument('script', nargs='?', help='one of: ' + ', '.join(sorted(scripts)))
+    parser.add_argument('args', nargs='*', help="the script's own options (e.g. rect print)")
+    parser.add_argument('-s', '--set', action='append', default=[], metavar='NAME=VALUE',
+                        help='override a User variable (a Python literal)')
+    parser.add_argument('--save', default='', help='comma separated variables to write to --output')
+    parser.add_argument('-o', '--output', help='.npz file for --save')
+    parser.add_argument('--figure', help='save the figure(s) here')
+    parser.add_argument('-b', '--batch', help='.json or .toml file of runs')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='worker processes for --batch')
+    parser.add_argument('-l', '--list', action='store_true', help="list a script's User variables")
+    opts = parser.parse_args()
+
+    if opts.list:
+        for name in ([opts.script] if opts.script else sorted(scripts)):
+            print('%-12s %s'%(name, ', '.join(sorted(splitScript(scriptPath(name))[2]))))
+        sys.exit(0)
+
+    if opts.batch:
+        runs = loadBatch(opts.batch)
+    elif opts.script:
+        runs = [{'script'    : opts.script,
+                 'overrides' : dict((k, _value(v)) for k, v in (s.split('=', 1) for s in opts.set)),
+                 'args'      : opts.args,
+                 'save'      : [k for k in opts.save.split(',') if k],
+                 'output'    : opts.output,
+                 'figure'    : opts.figure}]
+    else:
+        parser.error('give a script or --batch')
+
+    errors = runBatch(runs, opts.jobs)
+    for run, err in zip(runs, errors):
+        if err:
+            print('%-12s FAILED: %s'%(run.get('script'), err))
+    sys.exit(1 if any(errors) else 0)
+#=====================================================================
@@ -0,0 +1,96 @@
+#! /usr/bin/env python3
+
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# fringemaps.py extends the 1-D correlator response of 01-corr-resp.py,
+# R_c = cos(2pi u l), to the 2-D fringe pattern of each baseline (u, v)
+# of an array over a grid of direction cosines (l, m):
+#
+#     R_c + i R_s = exp(+2pi i (u l + v m))
+#
+# The exponential separates into exp(2pi i u l) * exp(2pi i v m), so a
+# baseline's map is the outer product of two 1-D vectors and the sum
+# over a chunk of baselines is a single matrix product. Baselines are
+# processed in chunks by a thread pool, so a cube of e.g. 2016
+# baselines x 2048^2 pixels never has to sit in memory at once.
+
+
+
+
+
+#=====================================================================
+#     Functions
+def lmAxis(numPix, cellSize=None):
+    # 1-D axis of direction cosines, centred on pixel numPix//2. The
+    # default cellSize spans l = [-1, 1).
+    if cellSize is None:
+        cellSize = 2./numPix
+    return (np.arange(numPix) - numPix//2)*cellSize
+
+
+
+def _phasors(baselines, l, m):
+    # exp(2pi i u l) (nb, nl) and exp(2pi i v m) (nb, nm) of a chunk
+    baselines = np.asarray(baselines, dtype=float)
+    el = np.exp(2j*np.pi*np.outer(baselines[:, 0], l))
+    em = np.exp(2j*np.pi*np.outer(baselines[:, 1], m))
+    return el, em
+
+
+
+def _chunks(numBase, chunk):
+    return [slice(i, min(i + chunk, numBase)) for i in range(0, numBase, chunk)]
+
+
+
+def fringeCube(baselines, l, m):
+    # Complex fringe maps (nb, nm, nl) of a (small) set of baselines.
+    # Real part = R_c, imaginary part = R_s.
+    el, em = _phasors(baselines, l, m)
+    return em[:, :, None]*el[:, None, :]
+
+
+
+def summedResponse(baselines, l, m, chunk=128, jobs=4):
+    # Sum of the complex fringe maps of all baselines, shape (nm, nl),
+    # without forming the cube: each chunk contributes em^T . el.
+    baselines = np.asarray(baselines, dtype=float)
+
+    def partial(sl):
+        el, em = _phasors(baselines[sl], l, m)
+        return em.T.dot(el)
+
+    sl = _chunks(len(baselines), chunk)
+    if not sl:                                   # No baselines, no fringes
+        return np.zeros((len(m), len(l)), dtype=complex)
+    if jobs > 1 and len(sl) > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            parts = pool.map(partial, sl)
+            total = next(parts)
+            for p in parts:
+                total += p
+        return total
+    total = partial(sl[0])
+    for s in sl[1:]:
+        total += partial(s)
+    return total
+
+
+
+def mapBaselines(func, baselines, l, m, chunk=16, jobs=4):
+    # Apply func(index, cube) to every chunk of per-baseline fringe maps,
+    # where index is the slice of baselines and cube is fringeCube() of
+    # that chunk, across a thread pool. Only jobs chunks are alive at a
+    # time. Returns the list of func's results in baseline order.
+    baselines = np.asarray(baselines, dtype=float)
+
+    def work(sl):
+        return func(sl, fringeCube(baselines[sl], l, m))
+
+    sl = _chunks(len(baselines), chunk)
+    if jobs > 1 and len(sl) > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            return list(pool.map(work, sl))
+    return [work(s) for s in sl]
+#=====================================================================
@@ -0,0 +1,157 @@
+#! /usr/bin/env python3
+
+import numpy as np
+
+# fringes.py computes the analytic positions of the fringes of
+# "R_c = P*cos(2pi u l)" (see 01-corr-resp.py) and the first null of
+# the finite-bandwidth sinc envelope (see 05-fin-band.py) as arrays,
+# so they can be found for baselines of 10^5 - 10^6 wavelengths and
+# over whole grids of (u, Dnu, nu) at once.
+#
+# With l = sin(theta), R_c is a maximum where u*l = n and a minimum
+# where u*l = n + 1/2, for integer n and |l| <= 1. Look at the bottom
+# of page 4 of my personal notes for details.
+#
+# The tables are numpy structured arrays: they can be sliced with
+# boolean masks (e.g. extremaWithin) and written out with saveTable.
+#
+# responseSurface builds the vertices of a 3-D view of R_c over the
+# sky, for the 'thre' option of 01-corr-resp.py.
+
+
+
+
+
+#=====================================================================
+#     Functions
+extremaDtype = np.dtype([('n',    np.int64),      # Fringe number
+                         ('kind', np.int8),       # +1 = maximum, -1 = minimum
+                         ('l',    np.float64),    # Direction cosine, sin(theta)
+                         ('rad',  np.float64),    # theta (radians)
+                         ('deg',  np.float64)])   # theta (degrees)
+
+
+
+def fringeExtrema(u, maxDeg=90.):
+    # All maxima and minima of cos(2pi u l) with |theta| <= maxDeg,
+    # sorted by theta. Only fringes inside maxDeg are generated, so a
+    # narrow window on a long baseline stays cheap.
+    u     = float(u)
+    lLim  = np.sin(np.radians(min(abs(maxDeg), 90.)))
+    nLim  = int(np.floor(u*lLim))
+    n     = np.arange(-nLim, nLim + 1)
+
+    maxL  = n/u                                  # u l = n
+    minN  = np.arange(-nLim - 1, nLim + 1)
+    minL  = (minN + 0.5)/u                       # u l = n + 1/2
+    keep  = np.abs(minL) <= lLim
+    minN, minL = minN[keep], minL[keep]
+
+    table = np.empty(len(n) + len(minN), dtype=extremaDtype)
+    table['n']    = np.concatenate((n, minN))
+    table['kind'] = np.concatenate((np.ones(len(n), np.int8), -np.ones(len(minN), np.int8)))
+    table['l']    = np.concatenate((maxL, minL))
+    table['rad']  = np.arcsin(table['l'])
+    table['deg']  = np.degrees(table['rad'])
+    return table[np.argsort(table['l'], kind='stable')]
+
+
+
+def extremaWithin(table, deg, kind=0):
+    # Rows of an extrema table within +/- deg degrees. kind = +1 or -1
+    # selects only maxima or minima.
+    mask = np.abs(table['deg']) <= deg
+    if kind:
+        mask &= table['kind'] == kind
+    return table[mask]
+
+
+
+nullDtype = np.dtype([('u',         np.float64),  # Baseline length           (wavelengths)
+                      ('Dnu',       np.float64),  # Bandwidth                          (Hz)
+                      ('nu',        np.float64),  # Observing frequency                (Hz)
+                      ('sinTheta',  np.float64),  # sin of the first null angle
+                      ('rad',       np.float64),  # First null angle (radians), nan if none
+                      ('deg',       np.float64),  # First null angle (degrees), nan if none
+                      ('numFringe', np.int64)])   # Fringes to the first null
+
+
+
+def firstNull(u, Dnu, nu):
+    # First null of sinc((Dnu/nu) u l), i.e. sin(theta) = (1/u)/(Dnu/nu),
+    # and the number of fringes to it, for every combination of the
+    # broadcast inputs. Returns a structured array with the broadcast
+    # shape. The null only exists where (1/u) <= (Dnu/nu); elsewhere
+    # rad and deg are nan.
+    u, Dnu, nu = np.broadcast_arrays(np.asarray(u, dtype=float),
+                                     np.asarray(Dnu, dtype=float),
+                                     np.asarray(nu, dtype=float))
+    sinTheta = (1./u)/(Dnu/nu)
+
+    table = np.empty(u.shape, dtype=nullDtype)
+    table['u'], table['Dnu'], table['nu'] = u, Dnu, nu
+    table['sinTheta'] = sinTheta
+    with np.errstate(invalid='ignore'):
+        table['rad'] = np.where(sinTheta <= 1., np.arcsin(np.minimum(sinTheta, 1.)), np.nan)
+    table['deg'] = np.degrees(table['rad'])
+    table['numFringe'] = np.ceil(nu/Dnu)        # As of Tuesday, 30 April 2019, this is a fudge (see 05-fin-band.py)
+    return table
+
+
+
+def firstNullGrid(u, Dnu, nu):
+    # firstNull over the full outer grid of 1-D u, Dnu and nu values,
+    # flattened to one row per (u, Dnu, nu).
+    U, D, N = np.meshgrid(u, Dnu, nu, indexing='ij', sparse=True)
+    return firstNull(U, D, N).ravel()
+
+
+
+def saveTable(table, fname):
+    # Write a structured table to .npy, or to text (.csv, .txt, ...)
+    # with the field names as the header.
+    if fname.endswith('.npy'):
+        np.save(fname, table)
+        return
+    delim = ',' if fname.endswith('.csv') else '  '
+    fmt   = ['%d' if table.dtype[k].kind in 'iu' else '%.10g' for k in table.dtype.names]
+    np.savetxt(fname, table, fmt=fmt, delimiter=delim, header=delim.join(table.dtype.names))
+
+
+
+def _ringCounts(u, rhoMax, perFringe, minRings, minPhi):
+    numRings = max(minRings, int(np.ceil(perFringe*u*rhoMax)) + 1)
+    rho      = np.linspace(0, rhoMax, numRings)
+    numPhi   = np.maximum(minPhi, np.ceil(perFringe*4*u*rho)).astype(np.int64)
+    numPhi[0] = 1                                # Single vertex at the pointing centre
+    return rho, numPhi
+
+
+
+def responseSurface(u, rfov=np.pi/2, budget=20000, perFringe=8, minRings=16, minPhi=16):
+    # Vertices (x, y, z) of R_c = cos(2pi u l) over the sky out to rfov
+    # radians from the pointing centre, for plot_trisurf. The grid is
+    # polar in (rho, phi), rho = sin(theta), (x, y) = (l, m):
+    #   - rings are evenly spaced in rho, i.e. in l, where the fringes
+    #     are evenly spaced, with perFringe rings per fringe;
+    #   - a ring of radius rho crosses about 4 u rho fringes, so its
+    #     number of vertices grows with rho (an adaptively decimated
+    #     grid rather than a full rectangular one).
+    # perFringe is lowered until the vertex count fits in budget; below
+    # 2 the fringes are undersampled, but memory stays bounded.
+    rhoMax = np.sin(min(rfov, np.pi/2))
+    rho, numPhi = _ringCounts(u, rhoMax, perFringe, minRings, minPhi)
+    while numPhi.sum() > budget and perFringe > 1e-3:
+        perFringe *= np.sqrt(budget/float(numPhi.sum()))*0.98
+        rho, numPhi = _ringCounts(u, rhoMax, perFringe, minRings, minPhi)
+
+    ring   = np.repeat(np.arange(len(rho)), numPhi)
+    starts = np.cumsum(numPhi) - numPhi
+    k      = np.arange(numPhi.sum()) - starts[ring]
+    phi    = 2*np.pi*(k + 0.5*(ring % 2))/numPhi[ring]    # Stagger alternate rings
+
+    x = rho[ring]*np.cos(phi)
+    y = rho[ring]*np.sin(phi)
+    z = np.cos(2*np.pi*u*x)
+    return x, y, z
+#=====================================================================
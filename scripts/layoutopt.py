@@ -0,0 +1,259 @@
+#! /usr/bin/env python3
+
+import os
+import json
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+import uvtracks
+import psfmetrics
+
+# layoutopt.py searches for antenna layouts with a better dirty beam
+# than the one typed into 08-dirtybeam.py, by simulated annealing:
+#
+#   1. From the current layout, propose batch candidates, each moving
+#      one random antenna by a random step (Gaussian, of size step,
+#      shrinking as the temperature falls), keeping only candidates
+#      inside the site (radius siteRadius) with every antenna at least
+#      minSpacing from the others.
+#   2. Score all candidates at once across a process pool, each with
+#      the full uvtracks.psf pipeline and an objective (lower is better):
+#        'sidelobe' : peak sidelobe of |B(l, m)| relative to its peak
+#        'filling'  : minus the fraction of uv cells sampled
+#      or any function of (uvarray, f, F) passed to anneal.
+#   3. Move to the best candidate if it is better, or with probability
+#      exp(-increase/temperature) if not.
+#
+# Given a checkpoint file (none by default), the state of the search is
+# written to it every checkpointEvery iterations (and at the end), and a
+# run given an existing checkpoint carries on from it, saying so.
+#
+#   -->$ layoutopt.py [jobs] [checkpoint]
+
+
+
+
+
+#=====================================================================
+#     User variables
+#
+hourRange  = [10, 30]       # Hour angle range of observation (degrees)
+srcDec     = 85             # Source declination              (degrees)
+steps      = 200            # Resolution for loci
+objective  = 'sidelobe'     # 'sidelobe' or 'filling'
+iterations = 200            # Annealing iterations
+batch      = 32             # Candidates per iteration
+siteRadius = 3.5            # Antennas must lie within this of the origin
+minSpacing = 0.05           # ... and this far from each other
+seed       = 2020
+checkpoint = None           # JSON file to checkpoint to and resume from
+antArray   = {'A' : [ 0.05,  0.10],  # Starting layout (08-dirtybeam.py)
+              'B' : [-0.07,  0.22],
+              'C' : [ 0.00,  0.42],
+              'D' : [ 0.02,  0.62],
+              'E' : [-0.10,  0.82],
+              'F' : [-0.20, -0.20],
+              'G' : [-0.40, -0.25],
+              'H' : [-0.60, -0.66],
+              'I' : [-0.80, -0.80],
+              'J' : [ 0.25, -0.21],
+              'K' : [ 0.50, -0.05],
+              'L' : [ 0.50, -0.41],
+              'M' : [ 0.75, -0.75],
+              'O' : [ 2.75, -1.75],
+              'N' : [ 1.00, -0.81]}
+#=====================================================================
+
+
+
+
+
+#=====================================================================
+#     Functions
+def peakSidelobe(uvarray, f, F):
+    # Peak of |B| outside the main lobe, relative to the peak (see
+    # psfmetrics.py)
+    return psfmetrics.sidelobes(np.abs(np.fft.fftshift(F)))[0][0]
+
+
+
+def uvFilling(uvarray, f, F):
+    # Minus the fraction of grid cells holding a sample
+    return -f.mean()
+
+
+
+objectives = {'sidelobe' : peakSidelobe,
+              'filling'  : uvFilling}
+
+
+
+def feasible(coords, siteRadius, minSpacing):
+    # Inside the site and no two antennas closer than minSpacing
+    if np.any(np.hypot(coords[:, 0], coords[:, 1]) > siteRadius):
+        return False
+    d = np.hypot(*(coords[:, None, :] - coords[None, :, :]).transpose(2, 0, 1))
+    d[np.diag_indices(len(coords))] = np.inf
+    return d.min() >= minSpacing
+
+
+
+def score(coords, names, obs, func):
+    # Objective of one layout; obs = (hourRange, srcDec, steps)
+    func = objectives.get(func, func)
+    return func(*uvtracks.psf(dict(zip(names, coords.tolist())), *obs))
+
+
+
+def _score(args):
+    return score(*args)
+
+
+
+def propose(coords, rng, batch, step, siteRadius, minSpacing, tries=10):
+    # Up to batch feasible single-antenna moves of coords
+    out = []
+    for i in range(tries*batch):
+        cand = coords.copy()
+        cand[rng.integers(len(coords))] += rng.normal(0, step, 2)
+        if feasible(cand, siteRadius, minSpacing):
+            out.append(cand)
+            if len(out) == batch:
+                break
+    return out
+
+
+
+def saveCheckpoint(fname, state):
+    tmp = fname + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp, fname)
+
+
+
+def anneal(antArray, hourRange, srcDec, steps, objective='sidelobe', iterations=200,
+           batch=32, siteRadius=3., minSpacing=0.05, step=None, temperature=None,
+           seed=None, jobs=1, checkpoint=None, checkpointEvery=10, verbose=False):
+    # Anneal antArray and return (bestArray, bestScore, history), where
+    # history is the best score after each iteration. The temperature
+    # falls linearly to zero; by default it starts at a tenth of the
+    # starting score and step at a twentieth of siteRadius. A resumed
+    # run takes both from the checkpoint, so it follows the same path
+    # as one that was never interrupted.
+    names  = list(antArray.keys())
+    coords = np.array([antArray[k] for k in names], dtype=float)
+    obs    = (hourRange, srcDec, steps)
+    rng    = np.random.default_rng(seed)
+    start  = 0
+    history = []
+
+    if checkpoint and os.path.exists(checkpoint):
+        with open(checkpoint) as f:
+            state = json.load(f)
+        names   = state['names']
+        coords  = np.array(state['current'], dtype=float)
+        best    = np.array(state['best'], dtype=float)
+        current, bestScore = state['currentScore'], state['bestScore']
+        initial = state['initialScore']
+        step, temperature = state['step'], state['temperature']
+        start   = state['iteration']
+        history = state['history']
+        rng.bit_generator.state = state['rng']
+        if verbose:
+            print("Resuming from %s at iteration %d of %d (best %.5f)"
+                  %(checkpoint, start, iterations, bestScore))
+    else:
+        current = bestScore = initial = score(coords, names, obs, objective)
+        best    = coords.copy()
+        step        = step or siteRadius/20.
+        temperature = abs(initial)/10. if temperature is None else temperature
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    evaluated, begin = 0, time.time()
+
+    def save(iteration):
+        if checkpoint:
+            saveCheckpoint(checkpoint, {'names' : names, 'iteration' : iteration,
+                                        'current' : coords.tolist(), 'currentScore' : current,
+                                        'best' : best.tolist(), 'bestScore' : bestScore,
+                                        'initialScore' : initial, 'step' : step,
+                                        'temperature' : temperature, 'history' : history,
+                                        'rng' : rng.bit_generator.state})
+    try:
+        for it in range(start, iterations):
+            frac  = 1. - it/float(iterations)
+            cands = propose(coords, rng, batch, step*max(frac, 0.1), siteRadius, minSpacing)
+            if not cands:
+                continue
+            tasks  = [(c, names, obs, objective) for c in cands]
+            scores = list(pool.map(_score, tasks, chunksize=max(1, len(tasks)//(4*jobs)))) if pool \
+                     else [_score(t) for t in tasks]
+            evaluated += len(scores)
+            i = int(np.argmin(scores))
+            change = scores[i] - current
+            if change < 0 or rng.random() < np.exp(-change/max(temperature*frac, 1e-12)):
+                coords, current = cands[i], scores[i]
+            if current < bestScore:
+                best, bestScore = coords.copy(), current
+            history.append(bestScore)
+            if verbose:
+                print("%5d  %10.5f  %10.5f"%(it, current, bestScore))
+            if (it + 1) % checkpointEvery == 0:
+                save(it + 1)
+        save(iterations)
+        if verbose:
+            print("%d layouts in %.1f s (%.0f per minute)"%(evaluated, time.time() - begin,
+                                                           60.*evaluated/max(time.time() - begin, 1e-9)))
+    finally:
+        if pool:
+            pool.shutdown()
+    return dict(zip(names, best.tolist())), bestScore, history
+#=====================================================================
+
+
+
+
+
+#=====================================================================
+#     Code begins here
+#
+if __name__ == '__main__':
+    import sys
+
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    checkpoint = sys.argv[2] if len(sys.argv) > 2 else checkpoint
+    bestArray, bestScore, history = anneal(antArray, hourRange, srcDec, steps, objective,
+                                           iterations, batch, siteRadius, minSpacing,
+                                           seed=seed, jobs=jobs, checkpoint=checkpoint,
+                                           verbose=True)
+    startScore = score(np.array(list(antArray.values()), dtype=float), list(antArray),
+                       (hourRange, srcDec, steps), objective)
+    print("")
+    print("%s: start %.5f, best %.5f"%(objective, startScore, bestScore))
+    for name in sorted(bestArray):
+        print("%5s  % .3f  % .3f"%(name, bestArray[name][0], bestArray[name][1]))
+
+    # A run interrupted after its first checkpoint and resumed from it
+    # ends where an uninterrupted run does
+    import tempfile
+
+    calls = [0]
+    def interrupted(uvarray, f, F):
+        calls[0] += 1
+        if calls[0] == 30:
+            raise KeyboardInterrupt
+        return peakSidelobe(uvarray, f, F)
+
+    obs  = (antArray, hourRange, srcDec, 50)
+    opts = dict(iterations=12, batch=4, siteRadius=siteRadius, minSpacing=minSpacing, seed=seed)
+    straight   = anneal(*obs, objective=peakSidelobe, **opts)
+    resumeFile = os.path.join(tempfile.mkdtemp(), 'resume.json')
+    try:
+        anneal(*obs, objective=interrupted, checkpoint=resumeFile, checkpointEvery=5, **opts)
+    except KeyboardInterrupt:
+        pass
+    resumed = anneal(*obs, objective=interrupted, checkpoint=resumeFile, checkpointEvery=5, **opts)
+    os.remove(resumeFile)
+    print("")
+    print("resumed run matches straight run:", resumed == straight)
+#=====================================================================
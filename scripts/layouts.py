@@ -0,0 +1,190 @@
+#! /usr/bin/env python3
+
+import numpy as np
+
+# layouts.py generates antenna layouts of the standard families, as
+# (numAnts, 2) arrays of coordinates, instead of typing each antArray
+# in by hand:
+#
+#   uniformRandom : uniform in a disc, no two closer than minSpacing
+#   reuleaux      : evenly spaced around a Reuleaux triangle
+#   logSpiral     : arms on which radius grows geometrically
+#   coreArms      : a random core plus logSpiral (or straight) arms
+#   grid          : square or hexagonal grid
+#
+# Minimum spacing is enforced with a spatial hash of cells of side
+# minSpacing, so a candidate is only compared with the antennas in the
+# 3x3 cells around it rather than with every antenna.
+#
+# The arrays feed snapshot.py (stacked as (numLayouts, numAnts, 2)) or
+# antarray.baselineVectors directly; toAntArray names them for
+# uvtracks, beamupdate, layoutopt and psfserver:
+#
+#   antArray = layouts.toAntArray(layouts.reuleaux(24, 1.))
+#   uvarray, f, F = uvtracks.psf(antArray, [-30, 30], 60, 200)
+
+
+
+
+
+#=====================================================================
+#     Functions
+class SpatialHash(object):
+    # Points in square cells of side cellSize, for finding any within
+    # cellSize of a point in O(1)
+    def __init__(self, cellSize):
+        self.cellSize = float(cellSize)
+        self.cells    = {}
+
+    def _cell(self, xy):
+        return int(np.floor(xy[0]/self.cellSize)), int(np.floor(xy[1]/self.cellSize))
+
+    def near(self, xy, distance=None):
+        # True if a point lies closer than distance (<= cellSize) to xy
+        distance = self.cellSize if distance is None else distance
+        cx, cy = self._cell(xy)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for px, py in self.cells.get((cx + dx, cy + dy), ()):
+                    if (px - xy[0])**2 + (py - xy[1])**2 < distance**2:
+                        return True
+        return False
+
+    def add(self, xy):
+        self.cells.setdefault(self._cell(xy), []).append((float(xy[0]), float(xy[1])))
+
+
+
+def enforceSpacing(coords, minSpacing):
+    # Keep each antenna of coords (in order) unless it lies within
+    # minSpacing of one already kept. Returns the kept coordinates.
+    coords = np.asarray(coords, dtype=float)
+    if not minSpacing:
+        return coords
+    table = SpatialHash(minSpacing)
+    keep  = np.zeros(len(coords), dtype=bool)
+    for i, xy in enumerate(coords):
+        if not table.near(xy):
+            table.add(xy)
+            keep[i] = True
+    return coords[keep]
+
+
+
+def uniformRandom(numAnts, radius=1., minSpacing=0., seed=None, maxTries=100):
+    # numAnts antennas uniform in a disc of radius, no two closer than
+    # minSpacing. Candidates are drawn in batches; raises ValueError if
+    # maxTries*numAnts candidates do not place them all.
+    rng   = np.random.default_rng(seed)
+    table = SpatialHash(minSpacing) if minSpacing else None
+    out   = []
+    for drawn in range(0, maxTries*numAnts, numAnts):
+        r     = radius*np.sqrt(rng.random(numAnts))
+        theta = 2*np.pi*rng.random(numAnts)
+        for xy in np.column_stack((r*np.cos(theta), r*np.sin(theta))):
+            if table is not None:
+                if table.near(xy):
+                    continue
+                table.add(xy)
+            out.append(xy)
+            if len(out) == numAnts:
+                return np.array(out)
+    raise ValueError('Placed only %d of %d antennas %g apart within radius %g'
+                     %(len(out), numAnts, minSpacing, radius))
+
+
+
+def reuleaux(numAnts, radius=1., rotation=0.):
+    # numAnts antennas evenly spaced (in arc length) around a Reuleaux
+    # triangle whose vertices lie at radius. Each side is an arc of
+    # radius sqrt(3)*radius about the opposite vertex, spanning 30
+    # degrees either side of the direction away from it (60 in all).
+    t     = 3.*np.arange(numAnts)/numAnts
+    side  = np.floor(t).astype(int)
+    frac  = t - side
+    vertex = np.radians(90. + 120.*side) + rotation
+    angle  = vertex + np.pi + np.radians(60.*frac - 30.)
+    width  = np.sqrt(3.)*radius
+    return np.column_stack((radius*np.cos(vertex) + width*np.cos(angle),
+                            radius*np.sin(vertex) + width*np.sin(angle)))
+
+
+
+def logSpiral(numArms, antsPerArm, rMin, rMax, pitch=None, rotation=0.):
+    # numArms arms, equally spaced in angle, of antsPerArm antennas from
+    # rMin to rMax in geometric steps. Along an arm theta grows as
+    # ln(r/rMin)/tan(pitch), pitch in degrees; pitch=None gives straight
+    # arms (pitch 90).
+    r     = rMin*(float(rMax)/rMin)**np.linspace(0, 1, antsPerArm)
+    twist = np.log(r/rMin)/np.tan(np.radians(pitch)) if pitch is not None else np.zeros(antsPerArm)
+    theta = (rotation + 2*np.pi*np.arange(numArms)[:, None]/numArms + twist[None, :]).ravel()
+    r     = np.tile(r, numArms)
+    return np.column_stack((r*np.cos(theta), r*np.sin(theta)))
+
+
+
+def coreArms(numCore, coreRadius, numArms, antsPerArm, rMax, pitch=None, minSpacing=0.,
+             seed=None, rotation=0.):
+    # A uniformRandom core of numCore antennas within coreRadius and
+    # logSpiral arms from coreRadius out to rMax. Arm antennas within
+    # minSpacing of the core (or of each other) are dropped, so fewer
+    # than numCore + numArms*antsPerArm may be returned.
+    core = uniformRandom(numCore, coreRadius, minSpacing, seed)
+    arms = logSpiral(numArms, antsPerArm, coreRadius, rMax, pitch, rotation)
+    return enforceSpacing(np.concatenate((core, arms)), minSpacing)
+
+
+
+def grid(nx, ny=None, spacing=1., shape='square'):
+    # nx by ny grid, centred on the origin; shape 'hex' offsets every
+    # other row by half a spacing and packs the rows sqrt(3)/2 apart
+    ny = nx if ny is None else ny
+    x, y = np.meshgrid(np.arange(nx, dtype=float), np.arange(ny, dtype=float))
+    if shape == 'hex':
+        x += 0.5*(y % 2)
+        y *= np.sqrt(3.)/2
+    elif shape != 'square':
+        raise ValueError("shape is 'square' or 'hex', not %r"%shape)
+    coords = spacing*np.column_stack((x.ravel(), y.ravel()))
+    return coords - coords.mean(axis=0)
+
+
+
+def minSeparation(coords):
+    # Smallest distance between two antennas of coords
+    d = np.hypot(*(coords[:, None, :] - coords[None, :, :]).transpose(2, 0, 1))
+    d[np.diag_indices(len(coords))] = np.inf
+    return d.min()
+
+
+
+def toAntArray(coords, prefix='A'):
+    # antArray dictionary {name : [x, y]} of coords, named as the
+    # MeerKAT dishes are (prefix + zero-padded index, e.g. A000)
+    width = max(3, len(str(len(coords) - 1)))
+    return dict(('%s%0*d'%(prefix, width, i), [float(x) for x in xy]) for i, xy in enumerate(coords))
+#=====================================================================
+
+
+
+
+
+#=====================================================================
+#     Code begins here
+#
+if __name__ == '__main__':
+    import snapshot
+
+    families = [('uniformRandom', uniformRandom(64, 1., 0.1, seed=2020)),
+                ('reuleaux',      reuleaux(36, 1.)),
+                ('logSpiral',     logSpiral(3, 12, 0.05, 1., pitch=60)),
+                ('coreArms',      coreArms(24, 0.2, 3, 12, 1., minSpacing=0.03, seed=2020)),
+                ('grid',          grid(8, spacing=0.25)),
+                ('hex grid',      grid(8, spacing=0.25, shape='hex'))]
+
+    print("%-14s %5s  %8s  %8s  %8s"%('layout', 'ants', 'minSep', 'angular', 'redund.'))
+    for name, coords in families:
+        row = snapshot.snapshotMetrics(coords[None, :, :])[0]
+        print("%-14s %5d  %8.3f  %8.2f  %8.2f"%(name, len(coords), minSeparation(coords),
+                                                row['angular'], row['redundancy']))
+#=====================================================================
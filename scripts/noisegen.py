@@ -0,0 +1,151 @@
+#! /usr/bin/env python3
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+# noisegen.py simulates the voltages of a multi-element interferometer
+# pointed at a noise-like source and measures how the signal-to-noise
+# ratio (SNR) of the correlated output grows with integration time.
+#
+# Each antenna sees v_a = sqrt(rho)*s + sqrt(1-rho)*n_a, where s is the
+# sky signal common to all antennas and n_a is that antenna's receiver
+# noise, so rho is the correlation coefficient of any pair.
+#
+# All random numbers come from np.random.Generator streams spawned from
+# one SeedSequence. Every realisation gets its own child sequence, and
+# every antenna (plus the sky) its own grandchild, so a run is
+# reproducible from its seed alone, whatever the number of workers.
+#
+# Usage:
+#   -->$ noisegen.py [jobs]
+
+
+
+
+
+#=====================================================================
+#     User variables
+#
+seed          = 2018        # Root seed of the SeedSequence
+numReal       = 64          # Number of Monte Carlo realisations
+numAnts       = 2           # Number of antennas
+rho           = 0.05        # Correlation coefficient of the sky signal
+integrations  = [100, 1000, 10000, 100000]    # Integration lengths (samples)
+blockLen      = 65536       # Samples generated per block
+#=====================================================================
+
+
+
+
+
+#=====================================================================
+#     Functions
+def spawnStreams(seed, numReal, numAnts):
+    # Returns a list of numReal lists of (numAnts + 1) Generators. The
+    # first Generator of each realisation is the sky, the rest are the
+    # antennas' receivers.
+    root = np.random.SeedSequence(seed)
+    return [[np.random.default_rng(s) for s in child.spawn(numAnts + 1)]
+            for child in root.spawn(numReal)]
+
+
+
+def voltageBlocks(streams, numSamples, rho, blockLen=65536, dtype=np.float32):
+    # Generator of (numAnts, n) voltage blocks, n <= blockLen, for one
+    # realisation. streams is one entry of spawnStreams().
+    sky, receivers = streams[0], streams[1:]
+    a = np.sqrt(rho)
+    b = np.sqrt(1. - rho)
+    done = 0
+    while done < numSamples:
+        n = min(blockLen, numSamples - done)
+        s = sky.standard_normal(n, dtype=dtype)
+        v = np.empty((len(receivers), n), dtype=dtype)
+        for i, r in enumerate(receivers):
+            r.standard_normal(n, dtype=dtype, out=v[i])
+        v *= b
+        v += a*s
+        done += n
+        yield v
+
+
+
+def correlateRealisation(streams, integrations, rho, blockLen=65536):
+    # Correlate every baseline of one realisation and return the
+    # normalised correlation <v_a v_b> at each integration length, as
+    # an array of shape (len(integrations), numBaselines).
+    integrations = np.sort(np.asarray(integrations, dtype=np.int64))
+    numAnts = len(streams) - 1
+    ant1, ant2 = np.triu_indices(numAnts, 1)
+
+    out   = np.empty((len(integrations), len(ant1)))
+    accum = np.zeros(len(ant1))
+    done  = 0
+    k     = 0
+    for v in voltageBlocks(streams, integrations[-1], rho, blockLen):
+        prod  = (v[ant1]*v[ant2]).astype(np.float64)
+        cumul = accum[:, None] + np.cumsum(prod, axis=1)
+        n     = v.shape[1]
+
+        # Record the running mean at every integration length in this block
+        while k < len(integrations) and integrations[k] <= done + n:
+            out[k] = cumul[:, integrations[k] - done - 1]/integrations[k]
+            k += 1
+        accum = cumul[:, -1]
+        done += n
+    return out
+
+
+
+def _realisation(args):
+    seed, index, numAnts, integrations, rho, blockLen = args
+    child   = np.random.SeedSequence(seed, spawn_key=(index,))    # == SeedSequence(seed).spawn(...)[index]
+    streams = [np.random.default_rng(s) for s in child.spawn(numAnts + 1)]
+    return correlateRealisation(streams, integrations, rho, blockLen)
+
+
+
+def monteCarlo(seed, numReal, numAnts, integrations, rho, blockLen=65536, jobs=1):
+    # Run numReal realisations, across a process pool if jobs > 1, and
+    # return a dict of SNR statistics per integration length:
+    #   'integrations' : integration lengths (samples)
+    #   'mean', 'std'  : mean and scatter of <v_a v_b> over realisations
+    #                    and baselines
+    #   'snr'          : measured mean/std
+    #   'snrTheory'    : rho*sqrt(N), the weak-source expectation
+    integrations = np.sort(np.asarray(integrations, dtype=np.int64))
+    tasks = [(seed, i, numAnts, integrations, rho, blockLen) for i in range(numReal)]
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_realisation, tasks))
+    else:
+        results = [_realisation(i) for i in tasks]
+
+    corr = np.stack(results, axis=0)             # (numReal, numInts, numBaselines)
+    corr = np.moveaxis(corr, 1, 0).reshape(len(integrations), -1)
+    mean = corr.mean(axis=1)
+    std  = corr.std(axis=1, ddof=1)
+    return {'integrations' : integrations,
+            'mean'         : mean,
+            'std'          : std,
+            'snr'          : mean/std,
+            'snrTheory'    : rho*np.sqrt(integrations)}
+#=====================================================================
+
+
+
+
+
+#=====================================================================
+#     Code begins here
+#
+if __name__ == '__main__':
+    import sys
+
+    jobs  = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    stats = monteCarlo(seed, numReal, numAnts, integrations, rho, blockLen, jobs)
+
+    print("%10s  %10s  %10s  %8s  %8s"%('N', 'mean', 'std', 'SNR', 'theory'))
+    for row in zip(*[stats[k] for k in ('integrations', 'mean', 'std', 'snr', 'snrTheory')]):
+        print("%10d  %10.5f  %10.5f  %8.2f  %8.2f"%row)
+#=====================================================================
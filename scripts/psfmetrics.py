@@ -0,0 +1,219 @@
+#! /usr/bin/env python3
+
+import numpy as np
+
+# psfmetrics.py measures the dirty beam of 08-dirtybeam.py, for a single
+# PSF or a whole (numPSF, ny, nx) stack of them at once. psf is the
+# centred |B(l, m)|, i.e. np.abs(np.fft.fftshift(F, axes=(-2, -1))),
+# with its peak at pixel (ny//2, nx//2), as uvtracks.psf and psfserver
+# give it. One pixel is cellSize in l and m (1/(2*maxax) for
+# uvtracks.psf), and the results are in those units.
+#
+#   mainLobe    : the main lobe reaches out to the last pixel radius
+#                 before the azimuthal mean of |B| first rises
+#   sidelobes   : peak and RMS of |B| outside the main lobe, relative to
+#                 the peak
+#   gaussianFit : FWHM (major, minor) and position angle of a 2-D
+#                 Gaussian fitted to the crop x crop patch about the
+#                 peak, by weighted least squares on ln|B| (a quadratic
+#                 in l, m), one 6x6 solve per PSF
+#   solidAngle  : sum of |B|/peak over the main lobe times cellSize^2
+#
+# The main lobe is found from the azimuthal profile of a small window
+# about the centre (widened only if the lobe does not end inside it),
+# and outside the window only the maximum and the sum of squares of the
+# image are needed. So the whole image is read twice, without copies,
+# and the metrics cost less than the FFT which made the PSF.
+# psfMetrics collects them into one structured array (as the tables of
+# fringes.py).
+
+
+
+
+
+#=====================================================================
+#     Functions
+def _stack(psf):
+    # psf as (numPSF, ny, nx) and the peak of each
+    psf = np.asarray(psf)
+    if np.iscomplexobj(psf):
+        psf = np.abs(psf)
+    psf = psf.reshape((-1,) + psf.shape[-2:])
+    ny, nx = psf.shape[-2:]
+    peak = psf[:, ny//2, nx//2].astype(float)
+    return psf, np.where(peak > 0, peak, 1.)
+
+
+
+def _window(B, peak, half):
+    # The normalised (numPSF, 2*half+1, 2*half+1) window about the
+    # centre and its integer pixel radii
+    ny, nx = B.shape[-2:]
+    win = B[:, ny//2 - half:ny//2 + half + 1, nx//2 - half:nx//2 + half + 1]/peak[:, None, None]
+    y, x = np.ogrid[-half:half + 1, -half:half + 1]
+    return win, np.hypot(y, x).astype(np.int64)
+
+
+
+def _lobe(B, peak, half=16):
+    # (lobe, window, radii): the main-lobe radius of each PSF and the
+    # window (as _window) it was found in. The window doubles until
+    # every lobe ends inside it, or it fills the image.
+    ny, nx = B.shape[-2:]
+    limit = min((ny - 1)//2, (nx - 1)//2)
+    while True:
+        half   = min(half, limit)
+        win, r = _window(B, peak, half)
+        inside = r <= half                       # Whole rings only
+        keys   = np.arange(len(B))[:, None]*(half + 1) + np.where(inside, r, 0).ravel()[None, :]
+        sums   = np.bincount(keys.ravel(), (win*inside).reshape(len(B), -1).ravel(),
+                             minlength=len(B)*(half + 1)).reshape(len(B), half + 1)
+        mean   = sums/np.bincount(r[inside], minlength=half + 1)
+        rising = np.diff(mean, axis=1) > 0
+        if rising.any(axis=1).all() or half == limit:
+            lobe = np.where(rising.any(axis=1), rising.argmax(axis=1), half)
+            return lobe, win, r
+        half *= 2
+
+
+
+def mainLobe(psf):
+    # Radius (pixels) of the main lobe of each PSF, (numPSF,)
+    return _lobe(*_stack(psf))[0]
+
+
+
+def _sidelobes(B, peak, lobe, win, r):
+    # (peak, rms) outside the main lobe: the window outside the lobe,
+    # and the four bands of the image around the window
+    ny, nx = B.shape[-2:]
+    half   = r.shape[0]//2
+    inLobe = r[None, :, :] <= lobe[:, None, None]
+    y0, y1, x0, x1 = ny//2 - half, ny//2 + half + 1, nx//2 - half, nx//2 + half + 1
+    high   = np.where(inLobe, 0, win).max(axis=(1, 2))
+    for band in (B[:, :y0], B[:, y1:], B[:, y0:y1, :x0], B[:, y0:y1, x1:]):
+        if band.size:
+            high = np.maximum(high, band.max(axis=(1, 2))/peak)
+
+    squares = np.einsum('nij,nij->n', B, B)/peak**2 - np.where(inLobe, win*win, 0).sum(axis=(1, 2))
+    num     = np.maximum(ny*nx - inLobe.sum(axis=(1, 2)), 1)
+    return high, np.sqrt(np.maximum(squares, 0)/num)
+
+
+
+def sidelobes(psf):
+    # (peak, rms) of |B|/peak outside the main lobe, each (numPSF,)
+    B, peak = _stack(psf)
+    return _sidelobes(B, peak, *_lobe(B, peak))
+
+
+
+def _gaussianFit(B, peak, cellSize, crop, level):
+    ny, nx = B.shape[-2:]
+    h  = min(crop//2, (ny - 1)//2, (nx - 1)//2)
+    patch = _window(B, peak, h)[0].reshape(len(B), -1)
+    y, x  = [a.ravel().astype(float) for a in np.mgrid[-h:h + 1, -h:h + 1]]
+    design = np.column_stack((np.ones_like(x), x, y, x*x, x*y, y*y))
+
+    use = (patch >= level) | ((np.abs(x) <= 1) & (np.abs(y) <= 1))[None, :]
+    w   = np.where(use & (patch > 0), patch*patch, 0.)
+    lnB = np.log(np.maximum(patch, 1e-300))
+    normal = np.einsum('pi,np,pj->nij', design, w, design)
+    coef   = np.linalg.solve(normal + 1e-12*np.eye(6),
+                             np.einsum('pi,np->ni', design, w*lnB)[:, :, None])[:, :, 0]
+
+    # ln B = ... - (1/2) [x y] C [x y]^T with C the inverse covariance
+    C = -np.stack((np.stack((2*coef[:, 3], coef[:, 4]), -1),
+                   np.stack((coef[:, 4], 2*coef[:, 5]), -1)), -2)
+    eigval, eigvec = np.linalg.eigh(C)           # Ascending: major axis first
+    sigma  = 1./np.sqrt(np.maximum(eigval, 1e-300))
+    fwhm   = 2*np.sqrt(2*np.log(2))*sigma*cellSize
+    major  = eigvec[:, :, 0]                     # (x, y) of the major axis
+    angle  = np.degrees(np.arctan2(major[:, 0], major[:, 1])) % 180.
+    return fwhm[:, 0], fwhm[:, 1], angle
+
+
+
+def gaussianFit(psf, cellSize=1., crop=5, level=0.5):
+    # (fwhmMajor, fwhmMinor, positionAngle) of each PSF, the angle in
+    # degrees from the +m (row) axis towards +l (column), in [0, 180).
+    # Pixels of the patch above level (and the 3x3 about the peak) are
+    # fitted, weighted by |B|^2.
+    B, peak = _stack(psf)
+    return _gaussianFit(B, peak, cellSize, crop, level)
+
+
+
+def _solidAngle(lobe, win, r, cellSize):
+    return np.where(r[None, :, :] <= lobe[:, None, None], win, 0).sum(axis=(1, 2))*cellSize**2
+
+
+
+def solidAngle(psf, cellSize=1.):
+    # Integral of |B|/peak over the main lobe, (numPSF,)
+    lobe, win, r = _lobe(*_stack(psf))
+    return _solidAngle(lobe, win, r, cellSize)
+
+
+
+metricsDtype = np.dtype([('fwhmMajor',     np.float64),  # Gaussian fit (cellSize units)
+                         ('fwhmMinor',     np.float64),
+                         ('positionAngle', np.float64),  # Of the major axis (degrees)
+                         ('peakSidelobe',  np.float64),  # Relative to the peak
+                         ('rmsSidelobe',   np.float64),
+                         ('solidAngle',    np.float64)]) # Of the main lobe (cellSize^2)
+
+
+
+def psfMetrics(psf, cellSize=1., crop=5, level=0.5):
+    # One row of metricsDtype per PSF: shape () for a single (ny, nx)
+    # psf, (numPSF,) for a stack
+    B, peak = _stack(psf)
+    lobe, win, r = _lobe(B, peak)
+    table = np.empty(len(B), dtype=metricsDtype)
+    table['fwhmMajor'], table['fwhmMinor'], table['positionAngle'] = _gaussianFit(B, peak, cellSize, crop, level)
+    table['peakSidelobe'], table['rmsSidelobe'] = _sidelobes(B, peak, lobe, win, r)
+    table['solidAngle'] = _solidAngle(lobe, win, r, cellSize)
+    return table.reshape(np.shape(psf)[:-2])
+#=====================================================================
+
+
+
+
+
+#=====================================================================
+#     Code begins here
+#
+if __name__ == '__main__':
+    import time
+
+    # A known elliptical Gaussian: FWHM 6 and 3 pixels, major axis 30
+    # degrees from the rows towards the columns
+    y, x  = np.mgrid[-32:32, -32:32].astype(float)
+    theta = np.radians(30.)
+    a, b  = x*np.sin(theta) + y*np.cos(theta), x*np.cos(theta) - y*np.sin(theta)
+    gauss = np.exp(-4*np.log(2)*((a/6.)**2 + (b/3.)**2))
+    print("Gaussian:  FWHM %.2f x %.2f, PA %.1f"%psfMetrics(gauss, crop=9).item()[:3])
+
+    # A stack of dirty beams of random layouts, all on one grid
+    import layouts
+    import uvtracks
+    stack = []
+    for seed in range(32):
+        antArray = layouts.toAntArray(layouts.uniformRandom(24, 1., 0.05, seed=seed))
+        uvarray  = uvtracks.uvTracks(antArray, [-30, 30], 60, 1000)
+        stack.append(np.flip(uvtracks.gridSampling(uvarray, 2., 64.), 0))
+    stack = np.array(stack)
+
+    start = time.time()
+    F     = np.abs(np.fft.fftshift(np.fft.ifft2(stack), axes=(-2, -1)))
+    spent = time.time() - start
+    start = time.time()
+    table = psfMetrics(F, cellSize=1/4.)
+    print("%d PSFs of %dx%d: ifft2 %.1f ms, metrics %.1f ms"
+          %(len(stack), F.shape[1], F.shape[2], 1e3*spent, 1e3*(time.time() - start)))
+    print("")
+    print("%4s  %8s  %8s  %6s  %8s  %8s  %8s"%('', 'major', 'minor', 'PA', 'peakSL', 'rmsSL', 'solid'))
+    for i, row in enumerate(table[:5]):
+        print("%4d  %8.4f  %8.4f  %6.1f  %8.3f  %8.4f  %8.5f"%((i,) + tuple(row)))
+#=====================================================================
@@ -0,0 +1,283 @@
+#! /usr/bin/env python3
+
+import os
+import stat
+import json
+import time
+import threading
+import socketserver
+from collections import OrderedDict
+from concurrent.futures import Future
+import numpy as np
+import uvtracks
+import beams
+
+# psfserver.py is a long-lived local worker which computes the dirty
+# beam and gridded uv coverage of 08-dirtybeam.py on request, so
+# interactive tools do not pay for starting Python and rerunning the
+# whole script for every candidate layout.
+#
+#   -->$ psfserver.py [address]              (default: the address below)
+#
+# and from Python:
+#
+#   import psfserver
+#   out = psfserver.request(antArray=..., hourRange=[10, 30], srcDec=85, steps=500)
+#   out['psf'], out['uvgrid']
+#
+# address is a Unix socket path, or host:port for a TCP port. The host
+# defaults to 127.0.0.1 (':port'), and the server refuses to listen on
+# anything but a loopback address unless allowRemote is set, as requests
+# are not authenticated. An existing Unix socket at address is replaced;
+# any other file there is left alone and the server does not start.
+# Each request is one line of JSON with the User variables of
+# 08-dirtybeam.py; the reply is one line of JSON ({"ok": true, "arrays":
+# [[name, dtype, shape], ...], "cached": ...} or {"ok": false, "error":
+# ...}) followed by the raw bytes of each array. A connection can carry
+# any number of requests.
+#
+# A request may also ask for the primary beam on the l, m grid of the
+# PSF, e.g. "beam": {"model": "airy", "freq": 1.4e9, "dishDiam": 13.5,
+# "c": 3e8}; it is returned as 'primaryBeam' (nan beyond the horizon),
+# from the cache of beams.cachedBeam.
+#
+# Results are kept in an LRU cache of cacheSize entries, keyed on the
+# request. Identical requests which arrive while the first is still
+# being computed wait for it rather than computing it again.
+
+
+
+
+
+#=====================================================================
+#     User variables
+#
+address     = '/tmp/psfserver.sock'  # Unix socket path, or 'host:port'
+allowRemote = False                  # Listen on non-loopback TCP addresses
+cacheSize   = 64                     # Results kept in memory
+defaults    = {'hourRange' : [10, 30], # As in 08-dirtybeam.py
+               'srcDec'    : 85,
+               'steps'     : 500}
+#=====================================================================
+
+
+
+
+
+#=====================================================================
+#     Functions
+def computePSF(antArray, hourRange, srcDec, steps, latitude=None, minElevation=0., dishDiameter=0.,
+               beam=None):
+    # The arrays returned for a request: the gridded sampling pattern
+    # S(u, v), the dirty beam |B(l, m)|, centred, and, if beam gives
+    # the arguments of beams.beam2D, the primary beam on the same grid
+    uvarray, f, F = uvtracks.psf(antArray, hourRange, srcDec, steps, latitude, minElevation, dishDiameter)
+    arrays = OrderedDict([('uvgrid', f),
+                          ('psf',    np.abs(np.fft.fftshift(F)))])
+    if beam:
+        cellSize = 1./(2*np.ceil(np.amax(np.abs(uvarray))))     # l, m cell of the PSF
+        arrays['primaryBeam'] = beams.beam2D(numPix=F.shape[0], cellSize=cellSize, **beam)
+    return arrays
+
+
+
+def requestKey(params):
+    # Canonical form of a request: defaults filled in, antennas sorted
+    # by name (which does not change the beam), as JSON
+    params = dict(defaults, **params)
+    unknown = set(params) - set(['antArray', 'hourRange', 'srcDec', 'steps',
+                                 'latitude', 'minElevation', 'dishDiameter', 'beam'])
+    if unknown or 'antArray' not in params:
+        raise ValueError('A request needs antArray and takes hourRange, srcDec, steps, latitude, '
+                         'minElevation, dishDiameter, beam; got %s'
+                         %', '.join(sorted(params)))
+    params['antArray'] = dict((str(k), [float(x) for x in v]) for k, v in params['antArray'].items())
+    return json.dumps(params, sort_keys=True)
+
+
+
+class ResultCache(object):
+    # LRU cache of results which coalesces concurrent requests for the
+    # same key onto a single computation.
+    def __init__(self, size):
+        self.size     = size
+        self.results  = OrderedDict()
+        self.inflight = {}
+        self.lock     = threading.Lock()
+
+    def get(self, key, compute):
+        # Returns (result, cached)
+        with self.lock:
+            if key in self.results:
+                self.results.move_to_end(key)
+                return self.results[key], True
+            future = self.inflight.get(key)
+            owner  = future is None
+            if owner:
+                future = self.inflight[key] = Future()
+
+        if not owner:
+            return future.result(), True
+        try:
+            result = compute()
+            future.set_result(result)
+        except Exception as err:
+            future.set_exception(err)
+            raise
+        finally:
+            with self.lock:
+                del self.inflight[key]
+                if future.exception() is None:
+                    self.results[key] = future.result()
+                    while len(self.results) > self.size:
+                        self.results.popitem(last=False)
+        return result, False
+
+
+
+def writeArrays(wfile, header, arrays):
+    # One reply: the header, listing the name, dtype and shape of each
+    # array, then the raw (C ordered) bytes of the arrays in turn
+    header = dict(header, arrays=[[name, a.dtype.str, a.shape] for name, a in arrays.items()])
+    wfile.write((json.dumps(header) + '\n').encode())
+    for a in arrays.values():
+        wfile.write(np.ascontiguousarray(a).data)
+    wfile.flush()
+
+
+
+def readArrays(rfile):
+    # (header, OrderedDict of arrays) of one reply
+    line = rfile.readline()
+    if not line:
+        raise ConnectionError('psfserver closed the connection')
+    header = json.loads(line.decode())
+    if not header.get('ok'):
+        raise RuntimeError(header.get('error', 'psfserver request failed'))
+    arrays = OrderedDict()
+    for name, dtype, shape in header['arrays']:
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape))
+        arrays[name] = np.frombuffer(rfile.read(count*dtype.itemsize), dtype).reshape(shape)
+    return header, arrays
+
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            start = time.time()
+            try:
+                params = json.loads(line.decode())
+                key    = requestKey(params)
+                arrays, cached = self.server.cache.get(
+                    key, lambda: computePSF(**json.loads(key)))
+                header = {'ok' : True, 'cached' : cached}
+            except Exception as err:
+                self.wfile.write((json.dumps({'ok' : False, 'error' : '%s: %s'%(type(err).__name__, err)}) + '\n').encode())
+                self.wfile.flush()
+                continue
+            header['seconds'] = time.time() - start
+            writeArrays(self.wfile, header, arrays)
+
+
+
+def _isTCP(addr):
+    return ':' in addr and not addr.startswith(('/', '.'))
+
+
+
+def _tcpAddress(addr):
+    # (host, port) of 'host:port', the host 127.0.0.1 if it is empty
+    host, port = addr.rsplit(':', 1)
+    return host.strip('[]') or '127.0.0.1', int(port)
+
+
+
+def _isLoopback(host):
+    # True if every address host resolves to is a loopback address
+    import socket
+    import ipaddress
+    infos = socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)
+    return all(ipaddress.ip_address(info[4][0].split('%')[0]).is_loopback for info in infos)
+
+
+
+def makeServer(addr=None, size=None, remote=None):
+    # A threaded server on addr (Unix socket path or host:port),
+    # not yet serving. remote (default allowRemote) allows a TCP host
+    # which is not a loopback address.
+    addr   = addr or address
+    remote = allowRemote if remote is None else remote
+    if _isTCP(addr):
+        host, port = _tcpAddress(addr)
+        if not remote and not _isLoopback(host):
+            raise ValueError("%s is not a loopback address; pass remote=True (or set allowRemote) "
+                             "to serve on it"%host)
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        server = socketserver.ThreadingTCPServer((host, port), _Handler)
+    else:
+        if os.path.lexists(addr):
+            if not stat.S_ISSOCK(os.lstat(addr).st_mode):
+                raise FileExistsError('%s exists and is not a socket'%addr)
+            os.remove(addr)
+        server = socketserver.ThreadingUnixStreamServer(addr, _Handler)
+    server.daemon_threads = True
+    server.cache = ResultCache(size or cacheSize)
+    return server
+
+
+
+def connect(addr=None):
+    # A connection to a running server, as (socket, rfile, wfile)
+    import socket
+    addr = addr or address
+    if _isTCP(addr):
+        sock = socket.create_connection(_tcpAddress(addr))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    else:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(addr)
+    return sock, sock.makefile('rb'), sock.makefile('wb')
+
+
+
+def request(conn=None, addr=None, **params):
+    # Ask the server for the PSF of params (antArray, hourRange, srcDec,
+    # steps). conn is an open connect() to reuse, else one is made for
+    # this request. Returns an OrderedDict of arrays.
+    own = conn is None
+    if own:
+        conn = connect(addr)
+    sock, rfile, wfile = conn
+    try:
+        wfile.write((json.dumps(params) + '\n').encode())
+        wfile.flush()
+        return readArrays(rfile)[1]
+    finally:
+        if own:
+            rfile.close(); wfile.close(); sock.close()
+#=====================================================================
+
+
+
+
+
+#=====================================================================
+#     Code begins here
+#
+if __name__ == '__main__':
+    import sys
+
+    addr   = sys.argv[1] if len(sys.argv) > 1 else address
+    server = makeServer(addr)
+    print('psfserver listening on %s'%addr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if not _isTCP(addr):
+            os.remove(addr)
+#=====================================================================
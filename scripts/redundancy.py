@@ -0,0 +1,130 @@
+#! /usr/bin/env python3
+
+import numpy as np
+import antarray
+import uvtracks
+
+# redundancy.py finds the redundant baselines of an array: those whose
+# vectors are equal to within tol, as on the grids of layouts.py.
+# Vectors are rounded to multiples of tol, u and -u are folded together
+# (a baseline and its conjugate sample the same uv points), and each
+# rounded vector is packed into one integer key, so grouping is a
+# single np.unique rather than a pairwise comparison. Vectors within
+# tol of each other may still round apart when they straddle a
+# multiple of tol/2; tol is best well above the scatter in positions
+# and well below the array's spacing.
+#
+#   group, flip, vectors, counts = redundancy.redundantGroups(uv)
+#   uv[i] == (-1)**flip[i] * vectors[group[i]], to within tol
+#
+# uniqueTracks then computes each distinct baseline's track once with
+# its multiplicity as a weight, and redundantSets lists the groups by
+# antenna names for redundant calibration.
+
+
+
+
+
+#=====================================================================
+#     Functions
+def baselineKeys(vectors, tol=1e-3):
+    # (keys, flip) of baseline vectors (..., dim): an int64 key of each
+    # vector rounded to tol, the same for u and -u, and True where the
+    # vector was negated to fold it (its first non-zero component was
+    # negative).
+    q    = np.rint(np.asarray(vectors, dtype=float)/tol).astype(np.int64)
+    lead = np.take_along_axis(q, np.argmax(q != 0, axis=-1)[..., None], axis=-1)[..., 0]
+    flip = lead < 0
+    q[flip] *= -1
+    half = np.abs(q).max() if q.size else 0
+    span = 2*half + 1
+    if float(span)**q.shape[-1] >= 2.**63:
+        raise ValueError('tol %g is too fine for vectors of up to %g'%(tol, half*tol))
+    keys = np.zeros(q.shape[:-1], dtype=np.int64)
+    for k in range(q.shape[-1]):
+        keys = keys*span + (q[..., k] + half)
+    return keys, flip
+
+
+
+def redundantGroups(vectors, tol=1e-3):
+    # Group (numBase, dim) baseline vectors. Returns (group, flip,
+    # unique, counts): the group of each baseline, whether it is the
+    # conjugate of its group's vector, the mean (folded) vector of each
+    # group and the number of baselines in it. Groups are ordered by
+    # key.
+    vectors = np.asarray(vectors, dtype=float)
+    keys, flip = baselineKeys(vectors, tol)
+    uniq, group, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    folded = np.where(flip[:, None], -vectors, vectors)
+    unique = np.stack([np.bincount(group, folded[:, k], minlength=len(uniq))
+                       for k in range(vectors.shape[1])], axis=1)/counts[:, None]
+    return group, flip, unique, counts
+
+
+
+def groupMembers(group):
+    # Baseline indices of each group, as a list of arrays
+    order = np.argsort(group, kind='stable')
+    return np.split(order, np.cumsum(np.bincount(group))[:-1])
+
+
+
+def redundantSets(antArray, tol=1e-3, minCount=2):
+    # Groups of at least minCount baselines as lists of (name, name)
+    # pairs, each pair ordered so that all share the same vector
+    pairs, uv = antarray.baselines(antArray)
+    group, flip, unique, counts = redundantGroups(uv, tol)
+    return [[pairs[i][::-1] if flip[i] else pairs[i] for i in members]
+            for members in groupMembers(group) if len(members) >= minCount]
+
+
+
+def uniqueTracks(antArray, hourRange, srcDec, steps, tol=1e-3):
+    # uvtracks.uvTracks of the distinct baselines only. Returns
+    # (uvarray, weight): (numUnique*steps, 2) samples, unique baseline
+    # by unique baseline, and the multiplicity of each sample's baseline.
+    pairs, uv = antarray.baselines(antArray)
+    group, flip, unique, counts = redundantGroups(uv, tol)
+    tracks = uvtracks.uvDataToTMS(unique[:, None, :], uvtracks.hourAngles(hourRange, steps)[None, :],
+                                  np.radians(float(srcDec)))
+    return tracks.reshape(-1, 2), np.repeat(counts, steps)
+#=====================================================================
+
+
+
+
+
+#=====================================================================
+#     Code begins here
+#
+if __name__ == '__main__':
+    import time
+    import layouts
+
+    for name, coords in [('square grid', layouts.grid(16, spacing=0.1)),
+                         ('hex grid',    layouts.grid(16, spacing=0.1, shape='hex')),
+                         ('random',      layouts.uniformRandom(256, 1., 0.03, seed=2020))]:
+        antArray = layouts.toAntArray(coords)
+        pairs, uv = antarray.baselines(antArray)
+        start = time.time()
+        group, flip, unique, counts = redundantGroups(uv)
+        spent = time.time() - start
+        print("%-12s %6d baselines -> %6d groups (largest %d) in %.1f ms"
+              %(name, len(uv), len(counts), counts.max(), 1e3*spent))
+
+    # Gridding the distinct tracks gives the same S(u, v)
+    antArray = layouts.toAntArray(layouts.grid(16, spacing=0.1))
+    start = time.time()
+    full  = uvtracks.uvTracks(antArray, [-30, 30], 60, 400)
+    spent = time.time() - start
+    start = time.time()
+    uniq, weight = uniqueTracks(antArray, [-30, 30], 60, 400)
+    print("")
+    print("tracks: %d samples in %.2f s, %d distinct in %.2f s"
+          %(len(full), spent, len(uniq), time.time() - start))
+    maxax = np.ceil(np.amax(np.abs(full)))
+    print("same S(u, v):", np.array_equal(uvtracks.gridSampling(full, maxax, 20.),
+                                          uvtracks.gridSampling(uniq, maxax, 20.)))
+    print("first redundant set:", redundantSets(antArray)[0][:4], '...')
+#=====================================================================
@@ -0,0 +1,79 @@
+#! /usr/bin/env python3
+
+import numpy as np
+
+# sampling.py chooses where to sample the 1-D fringe and visibility
+# curves, instead of a fixed steps = 10000 whatever the baseline:
+#
+#   1. The curve is first sampled uniformly, with oversample points
+#      per cycle of the highest spatial frequency present (fringeFreq
+#      for R_c(theta), visibilityFreq for V(u)), so long baselines
+#      are not aliased and short ones are not oversampled.
+#   2. Intervals where the curve bends away from a straight line by
+#      more than tol (relative to its full range) are then halved,
+#      for at most maxPasses passes, so sharp features are resolved
+#      without refining the whole curve.
+#
+# Used by 01-corr-resp.py, 02-vis-plot.py, 05-fin-band.py and the
+# 04-*-vis.py scripts when their steps is None.
+
+
+
+
+
+#=====================================================================
+#     Functions
+def fringeFreq(u, Dnu=0., nu=1.):
+    # Highest frequency (cycles per radian of theta) of
+    # cos(2pi u sin(theta)), or of its product with the bandwidth
+    # sinc((Dnu/nu) u l) envelope.
+    return abs(u)*(1. + 0.5*abs(Dnu/float(nu)))
+
+
+
+def visibilityFreq(offset, width=0.):
+    # Highest frequency (cycles per unit u) of V(u) = int I(l) e^{-2i u l} dl
+    # (the 2pi u l/pi convention of 03-dirac-vis.py) for a source of the
+    # given width (full extent) centred on offset.
+    return (abs(offset) + 0.5*abs(width))/np.pi
+
+
+
+def nyquistSteps(maxFreq, span, oversample=8, minSteps=64):
+    # Number of uniform samples across span giving oversample points
+    # per cycle of maxFreq
+    return max(minSteps, int(np.ceil(oversample*abs(maxFreq*span))) + 1)
+
+
+
+def adaptiveSample(func, lo, hi, maxFreq, oversample=8, tol=1e-3, maxPasses=6, minSteps=64):
+    # Sample func, which maps an array of x to an array of (real or
+    # complex) y, from lo to hi. Returns (x, y) ordered from lo to hi.
+    x = np.linspace(lo, hi, nyquistSteps(maxFreq, hi - lo, oversample, minSteps))
+    y = np.asarray(func(x))
+
+    scale = max(np.ptp(y.real), np.ptp(y.imag) if np.iscomplexobj(y) else 0.)
+    if scale == 0:
+        return x, y
+    check = np.arange(len(x) - 1)                 # Left ends of intervals to test
+
+    for p in range(maxPasses):
+        if len(check) == 0:
+            break
+        xm = 0.5*(x[check] + x[check+1])
+        ym = np.asarray(func(xm))
+        err  = np.abs(ym - 0.5*(y[check] + y[check+1]))/scale
+        bent = err > tol
+        if not bent.any():
+            break
+
+        # Insert the midpoints of bent intervals, then test both halves
+        # of each on the next pass
+        xNew, yNew = xm[bent], ym[bent]
+        at    = check[bent] + 1
+        x     = np.insert(x, at, xNew)
+        y     = np.insert(y, at, yNew)
+        left  = at + np.arange(len(at)) - 1       # Positions after insertion
+        check = np.sort(np.concatenate((left, left + 1)))
+    return x, y
+#=====================================================================
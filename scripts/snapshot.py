@@ -0,0 +1,128 @@
+#! /usr/bin/env python3
+
+import numpy as np
+import antarray
+from redundancy import baselineKeys
+
+# snapshot.py computes the instantaneous uv coverage of 06-array2uv.py
+# for many candidate layouts at once, to screen random or parametric
+# layouts before the slower track, gridding and PSF stages.
+#
+# Layouts are a (numLayouts, numAnts, 2 or 3) array of antenna
+# coordinates; snapshotBatch turns them into (numLayouts, numBase, 2
+# or 3) baseline vectors in one broadcast. The metrics reduce along
+# the baseline axis with a bincount over (layout, bin) keys, so they
+# also cost one pass over all baselines of all layouts:
+#
+#   lengthHistogram : baseline lengths per bin        (numLayouts, bins)
+#   angularCoverage : fraction of position-angle sectors with a baseline
+#   redundancy      : fraction of baselines which repeat another, to tol
+#
+# snapshotMetrics collects these into one structured array (as the
+# tables of fringes.py), a row per layout.
+
+
+
+
+
+#=====================================================================
+#     Functions
+def snapshotBatch(layouts):
+    # Baseline vectors (numLayouts, numBase, dim) of every layout,
+    # ordered as antarray.baselines (the conjugates are -uv). Baselines
+    # do not depend on the array centre, so none is subtracted.
+    return antarray.baselineVectors(layouts)
+
+
+
+def _perLayout(bins, numBins):
+    # Counts of each (layout, bin), bins being (numLayouts, numBase)
+    numLayouts = bins.shape[0]
+    keys = np.arange(numLayouts)[:, None]*numBins + bins
+    return np.bincount(keys.ravel(), minlength=numLayouts*numBins).reshape(numLayouts, numBins)
+
+
+
+def lengthHistogram(uv, bins=20, maxLength=None):
+    # Histogram of the (2-D, projected) baseline lengths of each layout
+    # over [0, maxLength] (default: the longest baseline of any layout).
+    # As np.histogram, the last bin includes maxLength and longer
+    # baselines are not counted, so histograms of batches made with the
+    # same maxLength compare bin for bin. Returns (counts, edges).
+    length = np.hypot(uv[..., 0], uv[..., 1])
+    maxLength = length.max() if maxLength is None else float(maxLength)
+    if not maxLength > 0:
+        raise ValueError('maxLength must be positive, not %g'%maxLength)
+    edges = np.linspace(0, maxLength, bins + 1)
+    idx = np.minimum((length*(bins/maxLength)).astype(np.int64), bins - 1)
+    idx[length > maxLength] = bins               # Counted in a dropped overflow bin
+    return _perLayout(idx, bins + 1)[:, :bins], edges
+
+
+
+def angularCoverage(uv, sectors=36):
+    # Fraction of the sectors of position angle in [0, pi) holding at
+    # least one baseline (with its conjugate, this covers [0, 2pi))
+    angle = np.arctan2(uv[..., 1], uv[..., 0]) % np.pi
+    idx   = np.minimum((angle*(sectors/np.pi)).astype(np.int64), sectors - 1)
+    return (_perLayout(idx, sectors) > 0).mean(axis=1)
+
+
+
+def redundancy(uv, tol=1e-3):
+    # Fraction of each layout's baselines which duplicate another of the
+    # same layout to within tol, counting u and -u as the same (the keys
+    # of redundancy.py, sorted per layout)
+    keys = np.sort(baselineKeys(uv[..., :2], tol)[0], axis=1)
+    numUnique = 1 + (np.diff(keys, axis=1) != 0).sum(axis=1)
+    return 1. - numUnique/float(keys.shape[1])
+
+
+
+metricsDtype = np.dtype([('minLength',  np.float64),  # Shortest baseline
+                         ('maxLength',  np.float64),  # Longest baseline
+                         ('meanLength', np.float64),
+                         ('angular',    np.float64),  # angularCoverage
+                         ('redundancy', np.float64)]) # redundancy
+
+
+
+def snapshotMetrics(layouts, sectors=36, tol=1e-3):
+    # One row of metricsDtype per layout of a (numLayouts, numAnts, dim)
+    # array
+    uv     = snapshotBatch(layouts)
+    length = np.hypot(uv[..., 0], uv[..., 1])
+    table  = np.empty(len(uv), dtype=metricsDtype)
+    table['minLength']  = length.min(axis=1)
+    table['maxLength']  = length.max(axis=1)
+    table['meanLength'] = length.mean(axis=1)
+    table['angular']    = angularCoverage(uv, sectors)
+    table['redundancy'] = redundancy(uv, tol)
+    return table
+#=====================================================================
+
+
+
+
+
+#=====================================================================
+#     Code begins here
+#
+if __name__ == '__main__':
+    import time
+
+    numLayouts, numAnts = 20000, 15
+    rng     = np.random.default_rng(2020)
+    layouts = rng.uniform(-1, 1, (numLayouts, numAnts, 2))
+    layouts[0] = np.array([[i % 4, i//4] for i in range(numAnts)])*0.5    # A redundant grid
+
+    start = time.time()
+    table = snapshotMetrics(layouts)
+    spent = time.time() - start
+    print("%d layouts of %d antennas in %.2f s (%.0f per second)"
+          %(numLayouts, numAnts, spent, numLayouts/spent))
+    print("")
+    print("%6s  %8s  %8s  %8s  %8s"%('layout', 'min', 'max', 'angular', 'redund.'))
+    for i in list(range(3)) + list(np.argsort(table['angular'])[-3:]):
+        print("%6d  %8.3f  %8.3f  %8.2f  %8.2f"%((i,) + tuple(table[i][['minLength', 'maxLength', 'angular', 'redundancy']])))
+#=====================================================================
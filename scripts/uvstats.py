@@ -0,0 +1,170 @@
+#! /usr/bin/env python3
+
+import numpy as np
+import density
+
+# uvstats.py summarises the uv coverage built in 07-array2uv-loci.py
+# and 08-dirtybeam.py, for comparing arrays and observing plans:
+#
+#   radial     : samples per unit area in rings out to maxLength
+#   azimuthal  : fraction of samples per sector of position angle in
+#                [0, pi) (a sample and its conjugate share a sector)
+#   fillFactor : fraction of the uv cells within maxLength holding a
+#                sample
+#   holeRadius : radius of the largest empty disc centred within the
+#                coverage (out to the furthest sample in each direction,
+#                within maxLength) and bounded by samples or the edge of
+#                the coverage, from a distance transform of the empty
+#                cells (scipy.ndimage if it is installed, else numpy),
+#                and its centre (holeU, holeV)
+#
+# Samples are taken as a (numSamples, 2) array or any iterable of them
+# (e.g. uvtracks.uvTrackChunks), a chunk at a time, so tracks of 10^8
+# samples are never held in memory: each chunk only adds to bincounts
+# of the grid cells (as density.py does), rings and sectors.
+#
+# The result is one record of statsDtype(radialBins, sectors); records
+# made with the same bins stack into a table.
+
+
+
+
+
+#=====================================================================
+#     Functions
+def statsDtype(radialBins=32, sectors=36):
+    return np.dtype([('numSamples', np.int64),    # Including conjugates if mirrored
+                     ('maxLength',  np.float64),  # Radius of the statistics
+                     ('fillFactor', np.float64),
+                     ('holeRadius', np.float64),  # uv units
+                     ('holeU',      np.float64),  # Centre of the hole
+                     ('holeV',      np.float64),
+                     ('radial',     np.float64, (radialBins,)),
+                     ('azimuthal',  np.float64, (sectors,))])
+
+
+
+def _distanceNumpy(empty):
+    # Euclidean distance (in cells) of every cell of a boolean grid to
+    # the nearest False cell, as scipy.ndimage.distance_transform_edt:
+    # the distance along each row first, then the minimum over rows of
+    # dy^2 + dx^2.
+    ny, nx = empty.shape
+    big  = ny + nx
+    cols = np.arange(nx)
+    last = np.maximum.accumulate(np.where(empty, -big, cols[None, :]), axis=1)
+    nxt  = np.minimum.accumulate(np.where(empty, 2*big, cols[None, :])[:, ::-1], axis=1)[:, ::-1]
+    dx2  = np.minimum(cols - last, nxt - cols).astype(float)**2
+    rows = np.arange(ny, dtype=float)
+    dist2 = np.empty((ny, nx))
+    for i in range(ny):
+        dist2[i] = ((rows - i)[:, None]**2 + dx2).min(axis=0)
+    return np.sqrt(dist2)
+
+
+
+def distanceTransform(empty):
+    # Distance (in cells) of each True cell to the nearest False cell
+    try:
+        from scipy.ndimage import distance_transform_edt
+    except ImportError:
+        return _distanceNumpy(empty)
+    return distance_transform_edt(empty)
+
+
+
+def uvStats(chunks, maxLength, numCells=256, radialBins=32, sectors=36, mirror=True,
+            chunkLen=1<<22):
+    # One record of statsDtype for the samples in chunks, within radius
+    # maxLength on a numCells x numCells grid. mirror also counts the
+    # conjugate samples (-u, -v).
+    if isinstance(chunks, np.ndarray):
+        arr    = chunks
+        chunks = (arr[i:i+chunkLen] for i in range(0, len(arr), chunkLen))
+    extent = [-maxLength, maxLength, -maxLength, maxLength]
+    shape  = (numCells, numCells)
+
+    cells   = np.zeros(numCells*numCells, dtype=np.int64)
+    rings   = np.zeros(radialBins, dtype=np.int64)
+    sectorN = np.zeros(sectors, dtype=np.int64)
+    for chunk in chunks:
+        u, v = np.asarray(chunk, dtype=float).T
+        idx, inside = density.binIndex(u, v, extent, shape)
+        cells += np.bincount(idx[inside], minlength=cells.size)
+
+        r = np.hypot(u, v)*(radialBins/float(maxLength))
+        r = r[r < radialBins].astype(np.int64)
+        rings += np.bincount(r, minlength=radialBins)
+        angle = np.arctan2(v, u) % np.pi
+        sectorN += np.bincount(np.minimum((angle*(sectors/np.pi)).astype(np.int64), sectors - 1),
+                               minlength=sectors)
+
+    cells = cells.reshape(shape)
+    if mirror:                                   # The grid is symmetric about the origin
+        cells = cells + cells[::-1, ::-1]
+
+    # Cells whose centres lie within maxLength
+    centre = (np.arange(numCells) + 0.5)*(2.*maxLength/numCells) - maxLength
+    radius = np.hypot(centre[None, :], centre[:, None])
+    disc   = radius <= maxLength
+    filled = cells > 0
+
+    # The coverage region: cells of the disc no further out than the
+    # furthest filled cell in their sector (of width pi/sectors). Cells
+    # outside it count as filled, so holes are measured inside the
+    # coverage rather than against its rim, which e.g. the foreshortened
+    # v extent of every array at low declination would dominate.
+    sector = ((np.arctan2(centre[:, None], centre[None, :]) % (2*np.pi))
+              *(sectors/np.pi)).astype(np.int64) % (2*sectors)
+    reach  = np.zeros(2*sectors)
+    np.maximum.at(reach, sector[filled], radius[filled])
+    region = disc & (radius <= reach[sector])
+    dist = distanceTransform(~filled & region)*(2.*maxLength/numCells)
+    dist[~region] = 0
+    hole = np.unravel_index(np.argmax(dist), dist.shape)
+
+    edges = np.linspace(0, maxLength, radialBins + 1)
+    stats = np.zeros((), dtype=statsDtype(radialBins, sectors))
+    stats['numSamples'] = sectorN.sum()*(2 if mirror else 1)
+    stats['maxLength']  = maxLength
+    stats['fillFactor'] = filled[disc].mean()
+    stats['holeRadius'] = dist[hole]
+    stats['holeU'], stats['holeV'] = centre[hole[1]], centre[hole[0]]
+    stats['radial']     = rings*(2 if mirror else 1)/(np.pi*np.diff(edges**2))
+    stats['azimuthal']  = sectorN/float(max(sectorN.sum(), 1))
+    return stats
+#=====================================================================
+
+
+
+
+
+#=====================================================================
+#     Code begins here
+#
+if __name__ == '__main__':
+    import time
+    import layouts
+    import uvtracks
+
+    coreArms = layouts.coreArms(32, 0.15, 3, 11, 1., minSpacing=0.02, seed=2020)
+    plans = [('core + arms, 30 deg', coreArms, [0, 30]),
+             ('core + arms, 90 deg', coreArms, [0, 90]),
+             ('reuleaux,    90 deg', layouts.reuleaux(64, 1.), [0, 90])]
+    steps  = 5000
+    table  = []
+    for name, coords, hourRange in plans:
+        antArray  = layouts.toAntArray(coords)
+        maxLength = np.amax(np.hypot(*uvtracks.snapshotUV(antArray)[1].T))
+        start = time.time()
+        stats = uvStats(uvtracks.uvTrackChunks(antArray, hourRange, 60, steps), maxLength)
+        print("%-20s %.1e samples in %.1f s"%(name + ':', stats['numSamples'], time.time() - start))
+        table.append(stats)
+    table = np.array(table)
+
+    print("")
+    print("%-20s %8s  %8s  %8s"%('', 'filling', 'hole', 'min/max sector'))
+    for (name, coords, hourRange), row in zip(plans, table):
+        print("%-20s %8.3f  %8.3f  %8.3f"%(name, row['fillFactor'], row['holeRadius'],
+                                          row['azimuthal'].min()/row['azimuthal'].max()))
+#=====================================================================
@@ -0,0 +1,258 @@
+#! /usr/bin/env python3
+
+import numpy as np
+import antarray
+
+# uvtracks.py holds the computation behind 06-array2uv.py,
+# 07-array2uv-loci.py and 08-dirtybeam.py, without any plotting, so it
+# can be imported by batch jobs that never load matplotlib:
+#
+#   antArray --> baselines --> uv tracks --> gridded S(u, v) --> B(l, m)
+#
+# Every stage works on whole numpy arrays: the tracks of all baselines
+# over all hour angles are one broadcast of uvDataToTMS, and gridding
+# is a single fancy-indexed assignment.
+#
+# Given a site latitude, samples taken while the source is below
+# minElevation are dropped before gridding, and given a dishDiameter so
+# are samples of any antenna shadowed by another (projected separation
+# under dishDiameter, the other nearer the source). As in uvDataToTMS,
+# antenna (x, y) are the equatorial X and Y components of position
+# (Z = 0), in wavelengths, as is dishDiameter.
+#
+# uvTracks gives every baseline the same steps hour angles, so short
+# baselines are sampled far more finely than gridding can use.
+# adaptiveTracks instead gives each baseline as many samples as its uv
+# arc length spans grid cells, spaced evenly along the arc, and returns
+# them as one ragged array: the samples of baseline i are
+# uvarray[offsets[i]:offsets[i+1]].
+
+
+
+
+
+#=====================================================================
+#     Functions
+def uvDataToTMS(uvdatapoint, hourangle, declinationRadians):
+    # Perform the coordinate rotation based on Thompson, Moran &
+    # Swenson (2017) equation 4.1. uvdatapoint is (..., 2) and
+    # hourangle broadcasts against its leading axes; returns (..., 2).
+    uvdatapoint = np.asarray(uvdatapoint, dtype=float)
+    x, y = uvdatapoint[..., 0], uvdatapoint[..., 1]
+    us = x*np.sin(hourangle) + y*np.cos(hourangle)
+    vs = -x*np.cos(hourangle)*np.sin(declinationRadians) \
+         + y*np.sin(hourangle)*np.sin(declinationRadians)
+    return np.stack((us, vs), axis=-1)
+
+
+
+def wTMS(uvdatapoint, hourangle, declinationRadians):
+    # w of Thompson, Moran & Swenson (2017) equation 4.1, the component
+    # of (x, y, 0) towards the source; broadcasts as uvDataToTMS
+    uvdatapoint = np.asarray(uvdatapoint, dtype=float)
+    x, y = uvdatapoint[..., 0], uvdatapoint[..., 1]
+    return np.cos(declinationRadians)*(x*np.cos(hourangle) - y*np.sin(hourangle))
+
+
+
+def uvSpeed(uvdatapoint, hourangle, declinationRadians):
+    # |d(u, v)/dH| (wavelengths per radian of hour angle) of the
+    # rotation in uvDataToTMS; broadcasts as uvDataToTMS
+    uvdatapoint = np.asarray(uvdatapoint, dtype=float)
+    x, y = uvdatapoint[..., 0], uvdatapoint[..., 1]
+    du = x*np.cos(hourangle) - y*np.sin(hourangle)
+    dv = (x*np.sin(hourangle) + y*np.cos(hourangle))*np.sin(declinationRadians)
+    return np.hypot(du, dv)
+
+
+
+def hourAngles(hourRange, steps):
+    # steps hour angles (radians) across hourRange (degrees), which may
+    # be negative (east of the meridian)
+    return np.linspace(np.radians(float(hourRange[0])), np.radians(float(hourRange[1])), steps)
+
+
+
+def elevation(hourangle, declinationRadians, latitudeRadians):
+    # Elevation (radians) of the source at each hour angle
+    return np.arcsin(np.sin(latitudeRadians)*np.sin(declinationRadians)
+                     + np.cos(latitudeRadians)*np.cos(declinationRadians)*np.cos(hourangle))
+
+
+
+def shadowedAntennas(coords, hourangle, declinationRadians, dishDiameter):
+    # (numAnts, numAngles) True where an antenna is shadowed. A baseline
+    # projects to |uv| >= |xy| |sin(dec)|, so only pairs which can come
+    # within dishDiameter are projected.
+    hourangle  = np.atleast_1d(hourangle)
+    shadow     = np.zeros((len(coords), len(hourangle)), dtype=bool)
+    ant1, ant2 = antarray.baselinePairs(len(coords))
+    vec  = antarray.baselineVectors(coords)
+    near = np.hypot(vec[:, 0], vec[:, 1])*abs(np.sin(declinationRadians)) < dishDiameter
+    if not near.any():
+        return shadow
+    ant1, ant2, vec = ant1[near], ant2[near], vec[near]
+    uv = uvDataToTMS(vec[:, None, :], hourangle[None, :], declinationRadians)
+    blocked = np.hypot(uv[..., 0], uv[..., 1]) < dishDiameter
+    front   = wTMS(vec[:, None, :], hourangle[None, :], declinationRadians) > 0    # ant2 nearer the source
+    for ants, which in ((ant1, blocked & front), (ant2, blocked & ~front)):
+        pair, col = np.nonzero(which)
+        shadow[ants[pair], col] = True
+    return shadow
+
+
+
+def _masks(coords, angles, decRad, latitude, minElevation, dishDiameter):
+    # (up, shadow): up (numAngles,) is False below minElevation and
+    # shadow as shadowedAntennas, each None where not applied
+    up = shadow = None
+    if latitude is not None:
+        up = elevation(angles, decRad, np.radians(float(latitude))) >= np.radians(float(minElevation))
+    if dishDiameter:
+        shadow = shadowedAntennas(coords, angles, decRad, dishDiameter)
+    return up, shadow
+
+
+
+def _keep(ant1, ant2, up, shadow, steps):
+    # (numBase, steps) mask of the samples kept, or None for all
+    if up is None and shadow is None:
+        return None
+    keep = np.ones((len(ant1), steps), dtype=bool)
+    if up is not None:
+        keep &= up[None, :]
+    if shadow is not None:
+        keep &= ~(shadow[ant1] | shadow[ant2])
+    return keep
+
+
+
+def snapshotUV(antArray):
+    # Instantaneous uv points: (pairs, uv) with uv of shape (numBase, 2).
+    # The conjugate points are -uv.
+    return antarray.baselines(antArray)
+
+
+
+def uvTracks(antArray, hourRange, srcDec, steps, latitude=None, minElevation=0., dishDiameter=0.):
+    # uv loci of every baseline, shape (numBase*steps, 2), baseline by
+    # baseline. The conjugate loci are -uvarray. With latitude (degrees)
+    # and/or dishDiameter, samples below minElevation (degrees) or of a
+    # shadowed antenna are left out, so there may be fewer.
+    names, coords = antarray.antennaCoords(antArray)
+    ant1, ant2 = antarray.baselinePairs(len(names))
+    angles = hourAngles(hourRange, steps)
+    decRad = np.radians(float(srcDec))
+    tracks = uvDataToTMS(antarray.baselineVectors(coords)[:, None, :], angles[None, :], decRad)
+    keep   = _keep(ant1, ant2, *_masks(coords, angles, decRad, latitude, minElevation, dishDiameter),
+                   steps=steps)
+    return tracks.reshape(-1, 2) if keep is None else tracks[keep]
+
+
+
+def uvTrackChunks(antArray, hourRange, srcDec, steps, chunkLen=1<<22, latitude=None,
+                  minElevation=0., dishDiameter=0.):
+    # uvTracks a few whole baselines (about chunkLen samples) at a time,
+    # for tracks too long to hold at once. Concatenated, the chunks are
+    # uvTracks(antArray, hourRange, srcDec, steps, ...).
+    names, coords = antarray.antennaCoords(antArray)
+    ant1, ant2 = antarray.baselinePairs(len(names))
+    uv     = antarray.baselineVectors(coords)
+    angles = hourAngles(hourRange, steps)
+    decRad = np.radians(float(srcDec))
+    up, shadow = _masks(coords, angles, decRad, latitude, minElevation, dishDiameter)
+    perChunk = max(1, chunkLen//steps)
+    for i in range(0, len(uv), perChunk):
+        tracks = uvDataToTMS(uv[i:i+perChunk, None, :], angles[None, :], decRad)
+        keep   = _keep(ant1[i:i+perChunk], ant2[i:i+perChunk], up, shadow, steps)
+        yield tracks.reshape(-1, 2) if keep is None else tracks[keep]
+
+
+
+def adaptiveTracks(antArray, hourRange, srcDec, numCells, cellsPerSample=1., refSteps=256,
+                   latitude=None, minElevation=0., dishDiameter=0.):
+    # uv loci with each baseline sampled about every cellsPerSample grid
+    # cells (of 1/numCells) along its arc. Returns (uvarray, offsets,
+    # hourangle): the (numSamples, 2) samples baseline by baseline, the
+    # (numBase + 1,) offsets of each baseline's samples and the hour
+    # angle (radians) of each sample. Every baseline keeps both ends of
+    # its track.
+    #
+    # Arc length is integrated over refSteps hour angles and inverted
+    # with a single np.interp over all baselines, each shifted past the
+    # last. Horizon and shadowing are applied as in uvTracks, shadowing
+    # at the nearest of the refSteps hour angles.
+    names, coords = antarray.antennaCoords(antArray)
+    ant1, ant2 = antarray.baselinePairs(len(names))
+    vec    = antarray.baselineVectors(coords)
+    decRad = np.radians(float(srcDec))
+    ref    = hourAngles(hourRange, refSteps)
+    speed  = uvSpeed(vec[:, None, :], ref[None, :], decRad)
+    arc    = np.concatenate((np.zeros((len(vec), 1)),
+                             np.cumsum(0.5*(speed[:, 1:] + speed[:, :-1])*np.diff(ref), axis=1)), axis=1)
+    arc   += 1e-12*np.arange(refSteps)           # Strictly increasing for np.interp
+    length = arc[:, -1]
+
+    counts  = np.maximum(np.ceil(length*numCells/cellsPerSample).astype(np.int64) + 1, 2)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    base    = np.repeat(np.arange(len(vec)), counts)
+    frac    = (np.arange(offsets[-1]) - offsets[base])/(counts[base] - 1.)
+    shift   = np.concatenate(([0.], np.cumsum(length + 1.)[:-1]))
+    angle   = np.interp(frac*length[base] + shift[base], (arc + shift[:, None]).ravel(),
+                        np.tile(ref, len(vec)))
+    uvarray = uvDataToTMS(vec[base], angle, decRad)
+
+    up, shadow = _masks(coords, ref, decRad, latitude, minElevation, dishDiameter)
+    if up is None and shadow is None:
+        return uvarray, offsets, angle
+    keep = np.ones(len(angle), dtype=bool)
+    if up is not None:
+        keep &= elevation(angle, decRad, np.radians(float(latitude))) >= np.radians(float(minElevation))
+    if shadow is not None:
+        span = ref[-1] - ref[0]
+        near = np.rint((angle - ref[0])*((refSteps - 1)/span)).astype(np.int64) if span else np.zeros(len(angle), np.int64)
+        near = np.clip(near, 0, refSteps - 1)
+        keep &= ~(shadow[ant1[base], near] | shadow[ant2[base], near])
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(base[keep], minlength=len(vec)))))
+    return uvarray[keep], offsets, angle[keep]
+
+
+
+def gridSampling(uvarray, maxax, numCells, mirror=True):
+    # Grid uv points (and their conjugates) onto a (2*maxax*numCells)^2
+    # grid spanning [-maxax, maxax]. Cells holding a sample are 1, the
+    # rest 0. Row 0 is at -v, as in 08-dirtybeam.py before its flip.
+    size = int(2*maxax*numCells)
+    sky  = np.zeros((size, size))
+    pts  = np.concatenate((uvarray, -uvarray)) if mirror else np.asarray(uvarray)
+    idx  = np.clip((pts*numCells + numCells*maxax).astype(np.int64), 0, size - 1)
+    sky[idx[:, 1], idx[:, 0]] = 1
+    return sky
+
+
+
+def dirtyBeam(f):
+    # B(l, m) of a gridded sampling pattern f = S(u, v), unshifted
+    return np.fft.ifft2(f)
+
+
+
+def psf(antArray, hourRange, srcDec, steps, latitude=None, minElevation=0., dishDiameter=0.,
+        adaptive=False):
+    # The whole of 08-dirtybeam.py: returns (uvarray, f, F) where f is
+    # the gridded S(u, v) (flipped to v up) and F = B(l, m). adaptive
+    # samples each baseline about once per grid cell (adaptiveTracks)
+    # rather than steps times.
+    numCells = np.sqrt(steps)                    # Balance the gridsize by adopting the user's resolution
+    if adaptive:
+        uvarray = adaptiveTracks(antArray, hourRange, srcDec, numCells, latitude=latitude,
+                                 minElevation=minElevation, dishDiameter=dishDiameter)[0]
+    else:
+        uvarray = uvTracks(antArray, hourRange, srcDec, steps, latitude, minElevation, dishDiameter)
+    if len(uvarray) == 0:
+        raise ValueError('No samples left: the source is never above %g deg elevation, or always shadowed'
+                         %minElevation)
+    maxax    = np.ceil(np.amax(np.abs(uvarray)))
+    f = np.flip(gridSampling(uvarray, maxax, numCells), 0)
+    return uvarray, f, dirtyBeam(f)
+#=====================================================================